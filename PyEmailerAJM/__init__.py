@@ -1,4 +1,5 @@
 from importlib import import_module
+from typing import TYPE_CHECKING
 
 
 def is_instance_of_dynamic(obj: object, base_class_path: str) -> bool:
@@ -14,15 +15,51 @@ def is_instance_of_dynamic(obj: object, base_class_path: str) -> bool:
         return False
 
 
+def lazy_getattr(module_globals: dict, lazy_attrs: dict, name: str):
+    """
+    Implements a package's module level __getattr__: imports the module lazy_attrs maps name to,
+    caches the attribute in module_globals and returns it.
+
+    :param module_globals: globals() of the package.
+    :param lazy_attrs: {attribute name: module path}.
+    :param name: The attribute being looked up.
+    :raises AttributeError: If name is not one of lazy_attrs.
+    """
+    module_path = lazy_attrs.get(name, None)
+    if module_path is None:
+        raise AttributeError(f"module {module_globals['__name__']!r} has no attribute {name!r}")
+    value = getattr(import_module(module_path), name)
+    module_globals[name] = value
+    return value
+
+
 from PyEmailerAJM.backend import deprecated
 from PyEmailerAJM.backend.errs import EmailerNotSetupError, DisplayManualQuit
-from PyEmailerAJM.msg import Msg, FailedMsg
-from PyEmailerAJM.searchers import SearcherFactory
-from PyEmailerAJM.py_emailer_ajm import PyEmailer, EmailerInitializer
-from PyEmailerAJM.continuous_monitor.continuous_monitor import ContinuousMonitor
+
+# name -> module; these (and win32com, extract_msg, questionary etc. behind them) are only imported on first use
+_LAZY_ATTRS = {'Msg': 'PyEmailerAJM.msg',
+               'FailedMsg': 'PyEmailerAJM.msg',
+               'SearcherFactory': 'PyEmailerAJM.searchers',
+               'PyEmailer': 'PyEmailerAJM.py_emailer_ajm',
+               'EmailerInitializer': 'PyEmailerAJM.py_emailer_ajm',
+               'ContinuousMonitor': 'PyEmailerAJM.continuous_monitor.continuous_monitor'}
+
+if TYPE_CHECKING:
+    from PyEmailerAJM.msg import Msg, FailedMsg
+    from PyEmailerAJM.searchers import SearcherFactory
+    from PyEmailerAJM.py_emailer_ajm import PyEmailer, EmailerInitializer
+    from PyEmailerAJM.continuous_monitor.continuous_monitor import ContinuousMonitor
+
+
+def __getattr__(name: str):
+    return lazy_getattr(globals(), _LAZY_ATTRS, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = ['EmailerNotSetupError', 'DisplayManualQuit', 'deprecated',
            'Msg', 'FailedMsg', 'PyEmailer', 'EmailerInitializer',
            'SearcherFactory', 'ContinuousMonitor',
            'is_instance_of_dynamic']
-
@@ -1,9 +1,21 @@
 from PyEmailerAJM.backend.errs import *
 from PyEmailerAJM.backend.enums import BasicEmailFolderChoices, AlertTypes, EmailMsgImportanceLevel
-from PyEmailerAJM.backend.the_sandman import TheSandman
-from PyEmailerAJM.backend.logger import PyEmailerLogger
 import warnings
 import functools
+from typing import TYPE_CHECKING
+
+# TheSandman needs tqdm and PyEmailerLogger needs EasyLoggerAJM/pythoncom, so both are imported on first use
+_LAZY_ATTRS = {'TheSandman': 'PyEmailerAJM.backend.the_sandman',
+               'PyEmailerLogger': 'PyEmailerAJM.backend.logger',
+               'SessionRegistry': 'PyEmailerAJM.backend.session_registry',
+               'OutlookSession': 'PyEmailerAJM.backend.session_registry',
+               'FolderResolver': 'PyEmailerAJM.backend.folder_resolver'}
+
+if TYPE_CHECKING:
+    from PyEmailerAJM.backend.the_sandman import TheSandman
+    from PyEmailerAJM.backend.logger import PyEmailerLogger
+    from PyEmailerAJM.backend.session_registry import SessionRegistry, OutlookSession
+    from PyEmailerAJM.backend.folder_resolver import FolderResolver
 
 
 def deprecated(reason: str = ""):
@@ -28,7 +40,31 @@ def deprecated(reason: str = ""):
     return decorator
 
 
-__all__ = ['deprecated', 'EmailerNotSetupError', 'InvalidAlertLevel',
-           'DisplayManualQuit', 'NoMessagesFetched',
+def folder_key(folder) -> tuple:
+    """
+    :param folder: An Outlook folder.
+    :return: (StoreID, EntryID) of the folder, the key the per-folder caches (FolderSync, ChangeProbe,
+        MailIndex) keep their state under. Falls back to the object's id if the folder has neither.
+    :rtype: tuple
+    """
+    store_id = getattr(folder, 'StoreID', None)
+    entry_id = getattr(folder, 'EntryID', None)
+    if store_id is None and entry_id is None:
+        return 'id', id(folder)
+    return store_id, entry_id
+
+
+def __getattr__(name: str):
+    from PyEmailerAJM import lazy_getattr
+    return lazy_getattr(globals(), _LAZY_ATTRS, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
+__all__ = ['deprecated', 'folder_key', 'EmailerNotSetupError', 'InvalidAlertLevel',
+           'DisplayManualQuit', 'NoMessagesFetched', 'FolderNotFoundError',
            'UnrecognizedEmailError', 'BasicEmailFolderChoices',
-           'AlertTypes', 'EmailMsgImportanceLevel','TheSandman', 'PyEmailerLogger']
\ No newline at end of file
+           'AlertTypes', 'EmailMsgImportanceLevel','TheSandman', 'PyEmailerLogger',
+           'SessionRegistry', 'OutlookSession', 'FolderResolver']
\ No newline at end of file
@@ -25,6 +25,12 @@ class NoMessagesFetched(Exception):
     ...
 
 
+# a com_error, as a missing folder was before the folders were resolved through FolderResolver,
+# so callers catching com_error keep working
+class FolderNotFoundError(com_error):
+    ...
+
+
 class UnrecognizedEmailError(com_error):
     def __init__(self, err_msg: Optional[str] = None, **kwargs):
         self.err_msg = err_msg
@@ -0,0 +1,193 @@
+from logging import Logger, getLogger
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+# noinspection PyUnresolvedReferences
+from pywintypes import com_error
+
+from PyEmailerAJM.backend.errs import FolderNotFoundError
+
+
+class CachedFolder(NamedTuple):
+    """
+    A resolved folder handle together with the ids it had when it was resolved.
+
+    Attributes:
+        folder: The Outlook folder (MAPIFolder) COM object.
+        entry_id (Optional[str]): EntryID of the folder.
+        store_id (Optional[str]): StoreID of the folder.
+    """
+    folder: object
+    entry_id: Optional[str]
+    store_id: Optional[str]
+
+
+class FolderResolver:
+    """
+    Resolves Outlook folders (default folders by index, other folders by path) and caches the handles,
+    so that GetMessages/_GetReadFolder do not walk namespace.Folders or call GetDefaultFolder every time.
+
+    Default folders are cached by (store, default folder index), other folders by their path,
+    e.g. "Shared Mailbox/Inbox/Alerts" ('/' or '\\' separated, compared case-insensitively like Outlook does).
+    Every parent folder of a path is cached as well, so paths sharing a parent only walk the rest.
+
+    A cached handle is checked before it is handed out by reading its EntryID (one COM property read).
+    If that fails or the id changed, the folder is re-opened with namespace.GetFolderFromID(EntryID, StoreID),
+    and if that fails too (the folder was deleted or moved) it is resolved from scratch.
+
+    Attributes:
+        PATH_SEPARATORS (Tuple[str, ...]): Characters a folder path is split on.
+
+    Methods:
+        default_folder(index, store_name=None):
+            Returns the default folder (BasicEmailFolderChoices) of the default store or of store_name.
+
+        resolve_path(path):
+            Returns the folder at path, the first part being the store (e.g. the mailbox display name).
+
+        invalidate(path_or_index=None):
+            Drops one cached folder (and the folders below it), or all of them.
+    """
+    PATH_SEPARATORS = ('/', '\\')
+
+    def __init__(self, get_namespace: Callable, **kwargs):
+        """
+        :param get_namespace: Returns the namespace to resolve folders in; called on every resolve,
+            so a namespace that is created on first use (or replaced) is picked up.
+        :type get_namespace: Callable
+        :param kwargs: Accepts 'logger'.
+        """
+        self.get_namespace = get_namespace
+        self.logger: Logger = kwargs.get('logger', getLogger(__name__))
+        self._cache: Dict[tuple, CachedFolder] = {}
+
+    @property
+    def cached_keys(self):
+        return list(self._cache)
+
+    @classmethod
+    def split_path(cls, path: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+        """
+        :param path: "Store/Folder/Subfolder" (or backslash separated), or the parts of a path.
+        :type path: Union[str, Sequence[str]]
+        :return: The non-empty parts of the path.
+        :rtype: Tuple[str, ...]
+        """
+        if isinstance(path, str):
+            for separator in cls.PATH_SEPARATORS[1:]:
+                path = path.replace(separator, cls.PATH_SEPARATORS[0])
+            path = path.split(cls.PATH_SEPARATORS[0])
+        return tuple(str(p).strip() for p in path if p and str(p).strip())
+
+    @classmethod
+    def is_path(cls, value) -> bool:
+        return isinstance(value, str) and any(s in value for s in cls.PATH_SEPARATORS)
+
+    @staticmethod
+    def _path_key(parts: Sequence[str]) -> tuple:
+        return ('path',) + tuple(p.casefold() for p in parts)
+
+    @staticmethod
+    def _default_key(index: int, store_name: Optional[str] = None) -> tuple:
+        return 'default', store_name.casefold() if store_name else None, int(index)
+
+    @staticmethod
+    def _to_cached(folder) -> CachedFolder:
+        return CachedFolder(folder, getattr(folder, 'EntryID', None), getattr(folder, 'StoreID', None))
+
+    def _is_valid(self, cached: CachedFolder) -> bool:
+        try:
+            return cached.folder.EntryID == cached.entry_id
+        except (com_error, AttributeError) as e:
+            self.logger.debug(f"cached folder handle is stale ({e})")
+            return False
+
+    def _reopen(self, cached: CachedFolder):
+        if not cached.entry_id:
+            return None
+        try:
+            if cached.store_id:
+                return self.get_namespace().GetFolderFromID(cached.entry_id, cached.store_id)
+            return self.get_namespace().GetFolderFromID(cached.entry_id)
+        except (com_error, AttributeError) as e:
+            self.logger.debug(f"could not re-open folder {cached.entry_id} by id ({e})")
+            return None
+
+    def _get(self, key: tuple, resolve: Callable):
+        cached = self._cache.get(key, None)
+        if cached is not None:
+            if self._is_valid(cached):
+                return cached.folder
+            folder = self._reopen(cached)
+            if folder is not None:
+                self.logger.debug(f"stale folder handle for {key} re-opened by EntryID")
+                self._cache[key] = self._to_cached(folder)
+                return folder
+            self.logger.debug(f"stale folder handle for {key} dropped, resolving again")
+            self.invalidate_key(key)
+
+        folder = resolve()
+        self._cache[key] = self._to_cached(folder)
+        return folder
+
+    def default_folder(self, index: int, store_name: Optional[str] = None):
+        """
+        :param index: The default folder index (see BasicEmailFolderChoices).
+        :type index: int
+        :param store_name: The store (mailbox display name) to get the folder of, defaults to the default store.
+        :type store_name: str, optional
+        :return: The default folder.
+        :raises FolderNotFoundError: If the store does not exist or has no such default folder.
+        """
+        def resolve():
+            try:
+                if store_name:
+                    return self.resolve_path((store_name,)).Store.GetDefaultFolder(index)
+                return self.get_namespace().GetDefaultFolder(index)
+            except com_error as e:
+                raise FolderNotFoundError(f"default folder {index} not found"
+                                          f"{' in ' + store_name if store_name else ''}") from e
+
+        return self._get(self._default_key(index, store_name), resolve)
+
+    def resolve_path(self, path: Union[str, Sequence[str]]):
+        """
+        :param path: The folder path, e.g. "Shared Mailbox/Inbox/Alerts", or its parts.
+            The first part is a top level folder of the namespace (a store).
+        :type path: Union[str, Sequence[str]]
+        :return: The folder at path.
+        :raises FolderNotFoundError: If path is empty or a part of it does not exist.
+        """
+        parts = self.split_path(path)
+        if not parts:
+            raise FolderNotFoundError(f"invalid folder path {path!r}")
+
+        def resolve():
+            try:
+                if len(parts) == 1:
+                    return self.get_namespace().Folders[parts[0]]
+                return self.resolve_path(parts[:-1]).Folders[parts[-1]]
+            except FolderNotFoundError:
+                # a parent is missing, already reported by its own lookup
+                raise
+            except com_error as e:
+                raise FolderNotFoundError(f"folder {'/'.join(parts)!r} not found") from e
+
+        return self._get(self._path_key(parts), resolve)
+
+    def invalidate_key(self, key: tuple) -> None:
+        # a path key also drops the paths below it
+        for k in [k for k in self._cache if k[:len(key)] == key]:
+            del self._cache[k]
+
+    def invalidate(self, path_or_index: Union[str, Sequence[str], int, None] = None) -> None:
+        """
+        :param path_or_index: A folder path, a default folder index (of the default store) or None for everything.
+        :return: None
+        :rtype: None
+        """
+        if path_or_index is None:
+            self._cache.clear()
+        elif isinstance(path_or_index, int):
+            self.invalidate_key(self._default_key(path_or_index))
+        else:
+            self.invalidate_key(self._path_key(self.split_path(path_or_index)))
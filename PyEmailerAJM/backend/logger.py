@@ -1,41 +1,380 @@
-from logging import Filter, DEBUG, ERROR, Handler, FileHandler, StreamHandler, Logger, WARNING
-from typing import Union
+import atexit
+from collections import OrderedDict
+from logging import Filter, DEBUG, ERROR, Handler, FileHandler, StreamHandler, Logger, WARNING, getLogger
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+from queue import SimpleQueue
+from threading import Event, RLock, Thread, local
+from time import time
+from typing import Any, Dict, List, Optional, Union
+
+# noinspection PyUnresolvedReferences
+import pythoncom
 
 from EasyLoggerAJM import EasyLogger
 from EasyLoggerAJM.logger_parts import OutlookEmailHandler, StreamHandlerIgnoreExecInfo
 from PyEmailerAJM.msg import Msg
 
 
+class DedupeCache:
+    """
+    Bounded LRU of recently logged messages, shared by the DupeDebugFilters of one logger.
+
+    Lookups are O(1) (an OrderedDict). Entries older than ttl_seconds are logged again, and once
+    capacity is reached the least recently seen message is dropped. Suppressed duplicates are
+    counted; take_summary returns (and resets) the count once every summary_interval_seconds.
+    Times are LogRecord.created values.
+    """
+    def __init__(self, capacity: int, ttl_seconds: Optional[float], summary_interval_seconds: Optional[float]):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.summary_interval_seconds = summary_interval_seconds
+        self._seen: 'OrderedDict[str, float]' = OrderedDict()
+        self._lock = RLock()
+        self.suppressed = 0
+        self.total_suppressed = 0
+        self._last_summary: Optional[float] = None
+
+    def __len__(self):
+        return len(self._seen)
+
+    def check(self, message: str, created: float) -> bool:
+        """
+        :return: True if the message should be logged, False if it is a duplicate.
+        :rtype: bool
+        """
+        with self._lock:
+            if self._last_summary is None:
+                self._last_summary = created
+            first_seen = self._seen.get(message, None)
+            if first_seen is not None and (self.ttl_seconds is None or created - first_seen < self.ttl_seconds):
+                self._seen.move_to_end(message)
+                self.suppressed += 1
+                self.total_suppressed += 1
+                return False
+            self._seen[message] = created
+            self._seen.move_to_end(message)
+            while len(self._seen) > self.capacity:
+                self._seen.popitem(last=False)
+            return True
+
+    def take_summary(self, created: float) -> int:
+        """
+        :return: The number of duplicates suppressed since the last summary if a summary is due, otherwise 0.
+        :rtype: int
+        """
+        with self._lock:
+            if (not self.suppressed or self.summary_interval_seconds is None
+                    or created - self._last_summary < self.summary_interval_seconds):
+                return 0
+            suppressed, self.suppressed = self.suppressed, 0
+            self._last_summary = created
+            return suppressed
+
+
 class DupeDebugFilter(Filter):
+    """
+    Drops DEBUG records whose message (ignoring FW:/RE: prefixes) was already logged recently.
+
+    Filters given the same cache (or the same shared_cache_key) share one DedupeCache, so the handlers
+    of a logger keep a single bounded set of messages (PyEmailerLogger passes its dedupe_cache); without
+    either, a filter has a cache of its own. The decision is stored on the record, so a record is only
+    checked once no matter how many handlers it goes through. Every summary_interval_seconds
+    an "N duplicate debug messages suppressed" INFO record is logged to the record's logger.
+    """
     PREFIXES_TO_IGNORE = ["FW:", "RE:"]
+    DEFAULT_CAPACITY = 10000
+    DEFAULT_TTL_SECONDS = 3600
+    DEFAULT_SUMMARY_INTERVAL_SECONDS = 300
+    _RECORD_ATTR = '_dupe_debug_result'
 
-    def __init__(self, name="DebugDedupeFilter"):
+    _shared_caches: Dict[str, DedupeCache] = {}
+    _shared_caches_lock = RLock()
+
+    def __init__(self, name="DebugDedupeFilter", cache: Optional[DedupeCache] = None,
+                 shared_cache_key: Optional[str] = None, **kwargs):
         super().__init__(name)
-        self.logged_messages = set()
+        if cache is not None:
+            self.cache = cache
+        elif shared_cache_key is not None:
+            self.cache = self.get_shared_cache(shared_cache_key, **kwargs)
+        else:
+            self.cache = self.new_cache(**kwargs)
+
+    @classmethod
+    def new_cache(cls, **kwargs) -> DedupeCache:
+        """
+        :param kwargs: capacity, ttl_seconds and summary_interval_seconds, the class defaults otherwise.
+        :return: A new DedupeCache.
+        :rtype: DedupeCache
+        """
+        return DedupeCache(capacity=kwargs.get('capacity', cls.DEFAULT_CAPACITY),
+                           ttl_seconds=kwargs.get('ttl_seconds', cls.DEFAULT_TTL_SECONDS),
+                           summary_interval_seconds=kwargs.get('summary_interval_seconds',
+                                                               cls.DEFAULT_SUMMARY_INTERVAL_SECONDS))
+
+    @classmethod
+    def get_shared_cache(cls, shared_cache_key: str, **kwargs) -> DedupeCache:
+        """
+        :param shared_cache_key: Filters with the same key share a cache.
+        :param kwargs: capacity, ttl_seconds and summary_interval_seconds of the cache.
+        :return: The DedupeCache for the given key.
+        :rtype: DedupeCache
+        :raises ValueError: If the cache already exists with other settings than the ones passed.
+        """
+        with cls._shared_caches_lock:
+            cache = cls._shared_caches.get(shared_cache_key, None)
+            if cache is None:
+                cache = cls._shared_caches[shared_cache_key] = cls.new_cache(**kwargs)
+            conflicts = {k: v for k, v in kwargs.items()
+                         if k in ('capacity', 'ttl_seconds', 'summary_interval_seconds') and getattr(cache, k) != v}
+            if conflicts:
+                raise ValueError(f"dedupe cache {shared_cache_key!r} already exists with other settings "
+                                 f"than {conflicts}")
+            return cache
 
     def _clean_str(self, in_str):
         for x in self.__class__.PREFIXES_TO_IGNORE:
             in_str = in_str.replace(x, '')
         return in_str
 
+    def _log_summary(self, record, suppressed: int):
+        getLogger(record.name).info(f"{suppressed} duplicate debug messages suppressed "
+                                    f"({self.cache.total_suppressed} in total)")
+
     def filter(self, record):
-        # We only log the message if it has not been logged before
+        # We only log the message if it has not been logged recently
         if record.levelno != DEBUG:
             return True
-        clean_msg = self._clean_str(record.msg)
-        if clean_msg not in list(self.logged_messages):
-            self.logged_messages.add(clean_msg)
-            return True
-        return False
+        result = getattr(record, self.__class__._RECORD_ATTR, None)
+        if result is not None and result[0] is self.cache:
+            return result[1]
+
+        should_log = self.cache.check(self._clean_str(str(record.msg)), record.created)
+        setattr(record, self.__class__._RECORD_ATTR, (self.cache, should_log))
+        suppressed = self.cache.take_summary(record.created)
+        if suppressed:
+            self._log_summary(record, suppressed)
+        return should_log
+
+
+class MetricsQueueHandler(QueueHandler):
+    """ QueueHandler that keeps count of the records it queued and of the deepest the queue has been. """
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.enqueued = 0
+        self.max_depth = 0
+
+    def enqueue(self, record):
+        super().enqueue(record)
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+
+class BufferedHandler(MemoryHandler):
+    """
+    MemoryHandler that writes its buffer to the target when it is full, when an ERROR (or worse)
+    comes in, or when the oldest buffered record is more than flush_interval_seconds old. A daemon
+    thread also flushes every flush_interval_seconds, so the records of a logger that went quiet
+    still reach the target.
+    """
+    def __init__(self, capacity: int, target: Handler, flush_interval_seconds: float, flushLevel=ERROR):
+        super().__init__(capacity, flushLevel=flushLevel, target=target, flushOnClose=True)
+        # target.handle does not check the level on flush, so it is checked here
+        self.setLevel(target.level)
+        self.flush_interval_seconds = flush_interval_seconds
+        self._last_flush = time()
+        self._closed = Event()
+        self._flusher: Optional[Thread] = None
+        if flush_interval_seconds:
+            self._flusher = Thread(target=self._flush_periodically, name=f"{self.__class__.__name__}-flush",
+                                   daemon=True)
+            self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval_seconds):
+            if self.buffer:
+                self.flush()
+
+    def shouldFlush(self, record):
+        return (super().shouldFlush(record)
+                or record.created - self._last_flush >= self.flush_interval_seconds)
+
+    def flush(self):
+        super().flush()
+        self._last_flush = time()
+
+    def close(self):
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        super().close()
+
+
+class ComThreadHandler(Handler):
+    """
+    Runs another handler with COM initialized on the calling thread (once per thread), so an
+    OutlookEmailHandler can send from the QueueListener thread.
+    """
+    def __init__(self, target: Handler):
+        super().__init__(target.level)
+        self.target = target
+        self._com_threads = local()
+
+    def handle(self, record):
+        if not getattr(self._com_threads, 'initialized', False):
+            # COM is released with the thread when the listener stops
+            pythoncom.CoInitialize()
+            self._com_threads.initialized = True
+        return self.target.handle(record)
+
+    def emit(self, record):
+        self.target.emit(record)
+
+    def flush(self):
+        self.target.flush()
 
 
 class PyEmailerLogger(EasyLogger):
+    """
+    EasyLogger set up for PyEmailer (dedupe filters on the file/stream handlers, Outlook email handler).
+
+    With async_logging=True (or after enable_async_logging()) the logger only has a QueueHandler and
+    the real handlers run on a background listener thread, so an ERROR that has Outlook build and
+    send an email does not block the caller. File handlers are buffered (see BufferedHandler) and
+    flushed on ERROR. queue_metrics reports the queue depth, and stop_async_logging (also registered
+    with atexit) drains the queue, flushes the buffers and puts the original handlers back.
+
+    LOGGER_KWARGS lists the kwargs the logger is configured with; logger_kwargs() picks them out of the
+    kwargs of an owner (e.g. a searcher), so only they are used to create or share a logger.
+    """
+    DEFAULT_ASYNC_LOGGING = False
+    DEFAULT_BUFFER_CAPACITY = 100
+    DEFAULT_BUFFER_FLUSH_INTERVAL_SECONDS = 5
+    # EasyLogger's own kwargs, then PyEmailerLogger's
+    LOGGER_KWARGS = ('project_name', 'chosen_format', 'root_log_location', 'file_logger_levels', 'formatter',
+                     'internal_verbose', 'log_spec', 'logger_name', 'logging_level', 'no_stream_color',
+                     'propagate', 'show_warning_logs_in_console', 'stream_formatter', 'stream_handler_instance',
+                     'timestamp', 'verbose', 'file_handler_class', 'use_one_time_filter',
+                     'async_logging', 'buffer_capacity', 'buffer_flush_interval_seconds')
+
+    def __init__(self, *args, **kwargs):
+        self.queue_handler: Optional[MetricsQueueHandler] = None
+        self.queue_listener: Optional[QueueListener] = None
+        self._sync_handlers: List[Handler] = []
+        self.buffer_capacity = kwargs.get('buffer_capacity', self.__class__.DEFAULT_BUFFER_CAPACITY)
+        self.buffer_flush_interval_seconds = kwargs.get('buffer_flush_interval_seconds',
+                                                        self.__class__.DEFAULT_BUFFER_FLUSH_INTERVAL_SECONDS)
+        # shared by the dedupe filters of this logger's handlers only
+        self.dedupe_cache = DupeDebugFilter.new_cache()
+        super().__init__(*args, **kwargs)
+        if kwargs.get('async_logging', self.__class__.DEFAULT_ASYNC_LOGGING):
+            self.enable_async_logging()
+
+    @classmethod
+    def logger_kwargs(cls, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :param kwargs: The kwargs of the logger's owner.
+        :return: Only the kwargs in LOGGER_KWARGS.
+        :rtype: Dict[str, Any]
+        """
+        return {k: v for k, v in kwargs.items() if k in cls.LOGGER_KWARGS}
+
     def __call__(self):
         return self.logger
 
-    @staticmethod
-    def _add_dupe_debug_to_handler(handler: Handler):
-        dupe_debug_filter = DupeDebugFilter()
+    @property
+    def async_logging(self) -> bool:
+        return self.queue_listener is not None
+
+    @property
+    def queue_metrics(self) -> Dict[str, int]:
+        """
+        :return: The current queue depth, the deepest it has been and the number of records queued
+            (all 0 if async logging was never enabled).
+        :rtype: Dict[str, int]
+        """
+        if self.queue_handler is None:
+            return {'depth': 0, 'max_depth': 0, 'enqueued': 0}
+        return {'depth': self.queue_handler.queue.qsize(),
+                'max_depth': self.queue_handler.max_depth,
+                'enqueued': self.queue_handler.enqueued}
+
+    def _wrap_for_listener(self, handler: Handler) -> Handler:
+        if isinstance(handler, FileHandler):
+            return BufferedHandler(self.buffer_capacity, target=handler,
+                                   flush_interval_seconds=self.buffer_flush_interval_seconds)
+        if not isinstance(handler, StreamHandler):
+            # e.g. the OutlookEmailHandler, which needs COM on the listener thread
+            return ComThreadHandler(handler)
+        return handler
+
+    def enable_async_logging(self) -> MetricsQueueHandler:
+        """
+        Moves the logger's handlers behind a QueueHandler and starts the listener thread.
+
+        :return: The QueueHandler now attached to the logger.
+        :rtype: MetricsQueueHandler
+        """
+        if self.queue_listener is not None:
+            return self.queue_handler
+        self._sync_handlers = list(self.logger.handlers)
+        for handler in self._sync_handlers:
+            self.logger.removeHandler(handler)
+        self.queue_handler = MetricsQueueHandler(SimpleQueue())
+        self.queue_listener = QueueListener(self.queue_handler.queue,
+                                            *[self._wrap_for_listener(h) for h in self._sync_handlers],
+                                            respect_handler_level=True)
+        self.queue_listener.start()
+        self.logger.addHandler(self.queue_handler)
+        atexit.register(self.stop_async_logging)
+        self.logger.debug(f"async logging enabled for {len(self._sync_handlers)} handler(s)")
+        return self.queue_handler
+
+    def stop_async_logging(self) -> None:
+        """
+        Drains the queue, flushes the buffered handlers and moves the handlers back onto the logger.
+
+        :return: None
+        :rtype: None
+        """
+        if self.queue_listener is None:
+            return
+        listener, queue_handler = self.queue_listener, self.queue_handler
+        self.logger.removeHandler(queue_handler)
+        for handler in self._sync_handlers:
+            self.logger.addHandler(handler)
+        # stop() processes everything that is still queued before it returns
+        listener.stop()
+        for handler in listener.handlers:
+            if isinstance(handler, BufferedHandler):
+                handler.close()
+        self.queue_listener = None
+        atexit.unregister(self.stop_async_logging)
+
+    def flush(self) -> None:
+        """ Writes out anything the buffered handlers are holding (records still queued are not waited for). """
+        if self.queue_listener is not None:
+            for handler in self.queue_listener.handlers:
+                handler.flush()
+
+    def add_handler(self, handler: Handler) -> None:
+        """
+        Adds a handler to the logger, or to the listener thread if async logging is on.
+
+        :param handler: The handler to add.
+        :type handler: Handler
+        :return: None
+        :rtype: None
+        """
+        if self.queue_listener is None:
+            self.logger.addHandler(handler)
+            return
+        self._sync_handlers.append(handler)
+        # the listener thread reads this tuple for every record, so swapping it is enough
+        self.queue_listener.handlers = self.queue_listener.handlers + (self._wrap_for_listener(handler),)
+
+    def _add_dupe_debug_to_handler(self, handler: Handler):
+        dupe_debug_filter = DupeDebugFilter(cache=self.dedupe_cache)
         handler.addFilter(dupe_debug_filter)
 
     def initialize_logger(self, logger=None, **kwargs) -> Union[Logger, '_EasyLoggerCustomLogger']:
@@ -68,7 +407,7 @@ class PyEmailerLogger(EasyLogger):
 
         email_handler.setLevel(ERROR)
         email_handler.setFormatter(self.formatter)
-        self.logger.addHandler(email_handler)
+        self.add_handler(email_handler)
 
     def _add_filter_to_file_handler(self, handler: FileHandler):
         self._add_dupe_debug_to_handler(handler)
@@ -0,0 +1,179 @@
+import atexit
+from logging import Logger, getLogger
+from threading import RLock, get_ident
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import win32com.client as win32
+
+
+class OutlookSession:
+    """
+    A shared email application/namespace pair handed out by SessionRegistry.
+
+    Attributes:
+        key (Tuple[str, str, int]): (email_app_name, namespace_name, thread id).
+        email_app: The Dispatch-ed email application.
+        namespace: The namespace (e.g. MAPI) of email_app.
+        ref_count (int): How many owners currently hold the session.
+    """
+    def __init__(self, key: Tuple[str, str, int], email_app, namespace):
+        self.key = key
+        self.email_app = email_app
+        self.namespace = namespace
+        self.ref_count = 0
+
+    @property
+    def closed(self) -> bool:
+        return self.email_app is None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(key={self.key}, ref_count={self.ref_count})"
+
+
+class SessionRegistry:
+    """
+    Process wide registry of Outlook sessions and loggers, so that every PyEmailer, ContinuousMonitor
+    and searcher in a process does not Dispatch its own application or build its own PyEmailerLogger.
+
+    Sessions are keyed by (email_app_name, namespace_name, thread), because COM objects belong to the
+    apartment (thread) that created them. Loggers are keyed by the logger kwargs they were created with (a
+    logger is only shared by owners that asked for the same project name and settings; any other kwargs of
+    the owner are ignored, see PyEmailerLogger.LOGGER_KWARGS). Both are reference counted:
+    acquire_* hands out the shared object (creating it the first time), release_* drops a reference and
+    tears the object down once nobody holds it anymore. close_all runs at exit.
+
+    Methods:
+        default():
+            The registry used by EmailerInitializer and BaseSearcher unless one is passed in.
+
+        acquire_session(email_app_name, namespace_name) / release_session(session):
+            Hands out / gives back a shared OutlookSession for the calling thread.
+
+        acquire_logger(**kwargs) / release_logger(py_emailer_logger):
+            Hands out / gives back a shared PyEmailerLogger.
+
+        close_all():
+            Drops every session and stops every logger, whatever their reference counts.
+    """
+    _default: Optional['SessionRegistry'] = None
+    _default_lock = RLock()
+    DEFAULT_LOGGER_KEY = 'default'
+
+    def __init__(self, dispatch: Callable = None, logger: Logger = None):
+        # None means win32.Dispatch, looked up on every call
+        self.dispatch = dispatch
+        self.logger = logger or getLogger(__name__)
+        self._lock = RLock()
+        self._sessions: Dict[Tuple[str, str, int], OutlookSession] = {}
+        # [kwargs, PyEmailerLogger, ref_count]; kwargs may hold unhashable values, so they are compared
+        self._loggers: List[list] = []
+
+    @classmethod
+    def default(cls) -> 'SessionRegistry':
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                atexit.register(cls._default.close_all)
+            return cls._default
+
+    @property
+    def sessions(self) -> Dict[Tuple[str, str, int], OutlookSession]:
+        return dict(self._sessions)
+
+    def acquire_session(self, email_app_name: str, namespace_name: str) -> OutlookSession:
+        """
+        :param email_app_name: The COM name of the email application (e.g. 'outlook.application').
+        :type email_app_name: str
+        :param namespace_name: The namespace to get from it (e.g. 'MAPI').
+        :type namespace_name: str
+        :return: The calling thread's shared session, Dispatch-ed on first acquire.
+        :rtype: OutlookSession
+        """
+        key = (email_app_name.lower(), namespace_name.upper(), get_ident())
+        with self._lock:
+            session = self._sessions.get(key, None)
+            if session is None:
+                email_app = (self.dispatch or win32.Dispatch)(email_app_name)
+                session = OutlookSession(key, email_app, email_app.GetNamespace(namespace_name))
+                self._sessions[key] = session
+                self.logger.debug(f"new session {session}")
+            session.ref_count += 1
+            return session
+
+    def release_session(self, session: OutlookSession) -> None:
+        """
+        Drops a reference to session; the COM references are let go once the last one is released
+        (the application itself is not quit, other processes may be using it).
+
+        :param session: A session returned by acquire_session.
+        :type session: OutlookSession
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            if session.closed:
+                return
+            session.ref_count -= 1
+            if session.ref_count <= 0:
+                self._sessions.pop(session.key, None)
+                session.email_app = session.namespace = None
+                self.logger.debug(f"session {session.key} closed")
+
+    def acquire_logger(self, **kwargs):
+        """
+        :param kwargs: The owner's kwargs; the logger kwargs among them are passed to PyEmailerLogger
+            when no logger was created with the same ones yet.
+        :return: The shared PyEmailerLogger for these kwargs.
+        :rtype: PyEmailerLogger
+        """
+        from PyEmailerAJM.backend.logger import PyEmailerLogger
+        kwargs = PyEmailerLogger.logger_kwargs(kwargs)
+        key = self._logger_key(kwargs)
+        with self._lock:
+            entry = next((e for e in self._loggers if e[0] == key), None)
+            if entry is None:
+                entry = [key, PyEmailerLogger(**kwargs), 0]
+                self._loggers.append(entry)
+            entry[2] += 1
+            return entry[1]
+
+    @classmethod
+    def _logger_key(cls, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        key = dict(kwargs)
+        key['project_name'] = key.get('project_name', None) or cls.DEFAULT_LOGGER_KEY
+        return key
+
+    def release_logger(self, py_emailer_logger) -> None:
+        """
+        Drops a reference to a logger from acquire_logger; once the last one is released the logger
+        stops async logging (draining its queue) and flushes its handlers.
+
+        :param py_emailer_logger: A logger returned by acquire_logger.
+        :return: None
+        :rtype: None
+        """
+        with self._lock:
+            for entry in self._loggers:
+                if entry[1] is py_emailer_logger:
+                    entry[2] -= 1
+                    if entry[2] <= 0:
+                        self._loggers.remove(entry)
+                        self._close_logger(py_emailer_logger)
+                    return
+
+    @staticmethod
+    def _close_logger(py_emailer_logger) -> None:
+        stop_async_logging = getattr(py_emailer_logger, 'stop_async_logging', None)
+        if stop_async_logging is not None:
+            stop_async_logging()
+        for handler in getattr(py_emailer_logger(), 'handlers', []):
+            handler.flush()
+
+    def close_all(self) -> None:
+        with self._lock:
+            for session in list(self._sessions.values()):
+                session.ref_count = 0
+                self.release_session(session)
+            for _, py_emailer_logger, _ in self._loggers:
+                self._close_logger(py_emailer_logger)
+            self._loggers.clear()
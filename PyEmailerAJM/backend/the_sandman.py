@@ -1,10 +1,14 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from logging import getLogger, Logger
-from time import sleep
-from typing import Union, Optional
+from random import Random
+from threading import Event
+from time import monotonic
+from typing import Union, Optional, Callable, Iterable, List
 
 from tqdm import tqdm
 
+from PyEmailerAJM.backend.enums import AlertTypes
+
 
 # TODO: extract into separate project and make it a dependency
 class TheSandman:
@@ -23,12 +27,49 @@ class TheSandman:
 
             sleep_round():
                 Splits the sleep duration into two equal parts. It logs and prints messages depicting the current sleep state, including the remaining time, and sleeps for the given durations.
+
+            wait(sleep_time_seconds, deadline=None, on_progress=None):
+                Interruptible sleep backed by a threading.Event. Returns early on request_stop(), wake()/notify_new_mail()
+                or once the optional deadline is reached, and returns the reason it woke up (one of the WAKE_* values).
+
+            wake(reason), notify_new_mail(), request_stop():
+                Thread safe ways to end the current (or next) wait early.
+
+            pump:
+                Optional callable run every pump_interval seconds while waiting, for event sources that only
+                deliver events while the waiting thread pumps messages (see MailEventSource.pump).
+
+            next_threshold_crossing(received_times, thresholds_hours=None):
+                Returns when the first of the given (unread) messages will cross an AlertTypes age threshold.
+
+            record_activity(active), next_wake_seconds(deadlines=(), received_times=(), thresholds_hours=None):
+                Adaptive scheduling: the idle interval backs off while nothing happens, deadlines and threshold
+                crossings pull the next wake forward, and the result is bounded by min/max_sleep_time.
+
+            adaptive_sleep(deadlines=(), received_times=(), thresholds_hours=None, **kwargs):
+                Sleeps until the scheduled next wake.
     """
     # default 600 secs = 10 minutes
     DEFAULT_SLEEP_TIME_SECONDS = 600
     DEFAULT_SNOOZE_EXPIRATION_LIMIT_HOURS = 24
     SECONDS_IN_HOUR = 3600
     DEFAULT_USE_VISUAL_SLEEP = True
+    # how often (in seconds) the visual sleep progress bar is updated
+    DEFAULT_PROGRESS_INTERVAL_SECONDS = 10
+    # how often (in seconds) pump is called while waiting
+    DEFAULT_PUMP_INTERVAL_SECONDS = 0.25
+
+    # adaptive scheduling (see next_wake_seconds)
+    DEFAULT_USE_ADAPTIVE_SLEEP = False
+    DEFAULT_MIN_SLEEP_TIME_SECONDS = 60
+    DEFAULT_MAX_SLEEP_TIME_SECONDS = 3600
+    DEFAULT_IDLE_BACKOFF_FACTOR = 2
+    DEFAULT_JITTER_FRACTION = 0.1
+
+    WAKE_TIMEOUT = 'timeout'
+    WAKE_DEADLINE = 'deadline'
+    WAKE_NEW_MAIL = 'new_mail'
+    WAKE_STOP = 'stop'
 
     def __init__(self, sleep_time_seconds=None, **kwargs):
         self.sleep_time_start = None
@@ -39,6 +80,21 @@ class TheSandman:
         self.sleep_time: int = sleep_time_seconds or self.__class__.DEFAULT_SLEEP_TIME_SECONDS
         self._is_time_remaining = False
         self._sleep_time_string = None
+        self.progress_interval = kwargs.get('progress_interval', self.__class__.DEFAULT_PROGRESS_INTERVAL_SECONDS)
+        self.pump: Optional[Callable[[], None]] = kwargs.get('pump', None)
+        self.pump_interval = kwargs.get('pump_interval', self.__class__.DEFAULT_PUMP_INTERVAL_SECONDS)
+
+        self.use_adaptive_sleep = kwargs.get('use_adaptive_sleep', self.__class__.DEFAULT_USE_ADAPTIVE_SLEEP)
+        self.min_sleep_time = kwargs.get('min_sleep_time_seconds', self.__class__.DEFAULT_MIN_SLEEP_TIME_SECONDS)
+        self.max_sleep_time = kwargs.get('max_sleep_time_seconds', self.__class__.DEFAULT_MAX_SLEEP_TIME_SECONDS)
+        self.idle_backoff_factor = kwargs.get('idle_backoff_factor', self.__class__.DEFAULT_IDLE_BACKOFF_FACTOR)
+        self.jitter_fraction = kwargs.get('jitter_fraction', self.__class__.DEFAULT_JITTER_FRACTION)
+        self._idle_interval: float = self.sleep_time
+        self._random = Random(kwargs.get('jitter_seed', None))
+
+        self._wake_event = Event()
+        self._wake_reason: Optional[str] = None
+        self._stop_requested = False
 
         self.logger: Logger = kwargs.get('logger', getLogger(__name__))
         self.sleep_time_string = self.sleep_time
@@ -62,6 +118,74 @@ class TheSandman:
         str_parts = [self._sleep_time_string, f'(started at {self.sleep_time_start})']
         self._sleep_time_string = ' '.join(str_parts)
 
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_requested
+
+    def wake(self, reason: str = WAKE_NEW_MAIL) -> None:
+        """
+        Ends the current wait early (or the next one, if nothing is waiting right now). Thread safe.
+
+        :param reason: Returned by the interrupted wait.
+        :type reason: str
+        """
+        self._wake_reason = reason
+        self._wake_event.set()
+
+    def notify_new_mail(self) -> None:
+        self.wake(self.__class__.WAKE_NEW_MAIL)
+
+    def request_stop(self) -> None:
+        """ Ends the current wait and makes every later wait return WAKE_STOP right away. """
+        self._stop_requested = True
+        self.wake(self.__class__.WAKE_STOP)
+
+    def clear_stop(self) -> None:
+        self._stop_requested = False
+
+    def _consume_wake(self) -> str:
+        self._wake_event.clear()
+        reason = self._wake_reason or self.__class__.WAKE_NEW_MAIL
+        self._wake_reason = None
+        return self.__class__.WAKE_STOP if self._stop_requested else reason
+
+    def wait(self, sleep_time_seconds: float, deadline: Optional[datetime] = None,
+             on_progress: Optional[Callable[[float], None]] = None) -> str:
+        """
+        :param sleep_time_seconds: The maximum number of seconds to wait.
+        :type sleep_time_seconds: float
+        :param deadline: Stop waiting at this point in time if it comes before the sleep time is up
+            (e.g. the next snooze expiry).
+        :type deadline: Optional[datetime]
+        :param on_progress: Called with the number of seconds waited so far, every progress_interval seconds.
+        :type on_progress: Optional[Callable[[float], None]]
+        :return: Why the wait ended, one of WAKE_TIMEOUT, WAKE_DEADLINE, WAKE_NEW_MAIL or WAKE_STOP.
+        :rtype: str
+        """
+        if self._stop_requested:
+            return self.__class__.WAKE_STOP
+
+        timeout, reason = sleep_time_seconds, self.__class__.WAKE_TIMEOUT
+        if deadline is not None:
+            seconds_to_deadline = (deadline - datetime.now()).total_seconds()
+            if seconds_to_deadline < timeout:
+                timeout, reason = max(seconds_to_deadline, 0), self.__class__.WAKE_DEADLINE
+
+        start = monotonic()
+        end = start + timeout
+        while True:
+            remaining = end - monotonic()
+            if remaining <= 0:
+                return reason
+            step = min(remaining, self.progress_interval) if on_progress else remaining
+            if self.pump is not None:
+                self.pump()
+                step = min(step, self.pump_interval)
+            if self._wake_event.wait(step):
+                return self._consume_wake()
+            if on_progress:
+                on_progress(monotonic() - start)
+
     def _setup_sleep_in_rounds(self, **kwargs):
         self.sleep_time_start = datetime.now().strftime('%m/%d/%Y %H:%M')
         if self.use_visual_sleep:
@@ -69,53 +193,148 @@ class TheSandman:
         self._is_time_remaining = False
         return kwargs
 
-    def _sleep_round(self, curr_sleep_round: int, total_rounds: int, print_msg: bool, **kwargs):
+    def _sleep_round(self, curr_sleep_round: int, total_rounds: int, print_msg: bool = True, **kwargs):
         if curr_sleep_round == total_rounds - 1:
             self._is_time_remaining = True
         sleep_time_seconds = (self.sleep_time // total_rounds)
-        self.sleep(sleep_time_seconds, print_msg=print_msg, **kwargs)
+        return self.sleep(sleep_time_seconds, print_msg=print_msg, **kwargs)
 
-    def sleep_in_rounds(self, rounds=2, **kwargs):
+    def sleep_in_rounds(self, rounds=2, deadline: Optional[datetime] = None, **kwargs) -> str:
+        """
+        :param rounds: The number of rounds the sleep time is split into.
+        :param deadline: Wake up at this point in time if it comes first (see wait).
+        :return: Why the sleep ended, see wait. Later rounds are skipped once a round is woken up early.
+        :rtype: str
+        """
         kwargs = self._setup_sleep_in_rounds(**kwargs)
 
+        reason = self.__class__.WAKE_TIMEOUT
         for sleep_round in range(rounds):
-            self._sleep_round(sleep_round, rounds, **kwargs)
+            reason = self._sleep_round(sleep_round, rounds, deadline=deadline, **kwargs)
+            if reason != self.__class__.WAKE_TIMEOUT:
+                self.logger.info(f"woken up early ({reason})")
+                break
+        return reason
 
-    def visual_sleep(self, sleep_time_seconds: int) -> None:
+    def visual_sleep(self, sleep_time_seconds: int, deadline: Optional[datetime] = None) -> str:
         try:
-            for _ in tqdm(range(sleep_time_seconds),
-                          desc=f"{self.sleep_time_string}",
-                          unit="second"):
-                sleep(1)
+            with tqdm(total=sleep_time_seconds,
+                      desc=f"{self.sleep_time_string}",
+                      unit="second") as progress:
+                return self.wait(sleep_time_seconds, deadline=deadline,
+                                 on_progress=lambda waited: progress.update(int(waited) - progress.n))
         except Exception as e:
             if e.__class__.__name__ != 'KeyboardInterrupt':
                 self.logger.error(f"visual_sleep failed: {e}, turning off visual sleep and trying again...")
                 self.use_visual_sleep = False
-                self.sleep(sleep_time_seconds)
+                return self.sleep(sleep_time_seconds, deadline=deadline)
             else:
                 raise
 
-    def sleep(self, sleep_time_seconds: int, **kwargs):
+    def sleep(self, sleep_time_seconds: int, deadline: Optional[datetime] = None, **kwargs) -> str:
         """
         :param sleep_time_seconds: The number of seconds the function should pause execution.
         :type sleep_time_seconds: int
-        :return: None
-        :rtype: None
+        :param deadline: Wake up at this point in time if it comes first (see wait).
+        :type deadline: Optional[datetime]
+        :return: Why the sleep ended, see wait.
+        :rtype: str
         """
 
         self.sleep_time_string = self.sleep_time if not self._is_time_remaining else sleep_time_seconds
+        return self._log_and_sleep(sleep_time_seconds, deadline=deadline, **kwargs)
+
+    def _log_and_sleep(self, sleep_time_seconds: int, deadline: Optional[datetime] = None, **kwargs) -> str:
         self.logger.info(self.sleep_time_string, **kwargs)
         if self.use_visual_sleep:
-            self.visual_sleep(sleep_time_seconds)
+            return self.visual_sleep(sleep_time_seconds, deadline=deadline)
+        return self.wait(sleep_time_seconds, deadline=deadline)
+
+    @classmethod
+    def next_threshold_crossing(cls, received_times: Iterable[datetime],
+                                thresholds_hours: Optional[Iterable[float]] = None) -> Optional[datetime]:
+        """
+        :param received_times: ReceivedTime of each unread message.
+        :type received_times: Iterable[datetime]
+        :param thresholds_hours: The alert thresholds in hours, defaults to the AlertTypes values.
+        :type thresholds_hours: Optional[Iterable[float]]
+        :return: When (in naive local time) the first message will be past its next threshold,
+            or None if all of them are past every threshold.
+        :rtype: Optional[datetime]
+        """
+        thresholds = [timedelta(hours=x) for x in sorted(thresholds_hours or [a.value for a in AlertTypes])]
+        time_left = []
+        for received_time in received_times:
+            if received_time is None:
+                continue
+            # the same reference time as MsgFactory.get_msg_age_hours uses to classify
+            item_now = datetime.now(tz=received_time.tzinfo)
+            age = item_now - received_time
+            next_threshold = next((x for x in thresholds if age <= x), None)
+            if next_threshold is not None:
+                time_left.append(next_threshold - age)
+        return datetime.now() + min(time_left) if time_left else None
+
+    def record_activity(self, active: bool) -> None:
+        """
+        Resets the idle interval to sleep_time after a cycle with activity, otherwise backs it off
+        by idle_backoff_factor (up to max_sleep_time).
+
+        :param active: Whether the last cycle saw any activity (new/changed messages or alerts).
+        :type active: bool
+        """
+        if active:
+            self._idle_interval = self.sleep_time
         else:
-            sleep(sleep_time_seconds)
+            self._idle_interval = min(self._idle_interval * self.idle_backoff_factor, self.max_sleep_time)
+
+    def next_wake_seconds(self, deadlines: Iterable[Optional[datetime]] = (),
+                          received_times: Iterable[datetime] = (),
+                          thresholds_hours: Optional[Iterable[float]] = None, now: datetime = None) -> float:
+        """
+        :param deadlines: Other points in time to wake up at (e.g. snooze expiries).
+        :param received_times: ReceivedTime of unread messages that can still cross a threshold.
+        :param thresholds_hours: The alert thresholds in hours, defaults to the AlertTypes values.
+        :param now: The reference time, defaults to now.
+        :return: The number of seconds until the next wake: the (jittered) idle interval, or less if a
+            deadline or threshold crossing comes first, bounded by min_sleep_time and max_sleep_time.
+        :rtype: float
+        """
+        now = now or datetime.now()
+        interval = self._idle_interval * (1 + self._random.uniform(-self.jitter_fraction, self.jitter_fraction))
+
+        upcoming = [x for x in deadlines if x is not None]
+        crossing = self.next_threshold_crossing(received_times, thresholds_hours)
+        if crossing is not None:
+            upcoming.append(crossing)
+        if upcoming:
+            # deadlines are not jittered, alerts should fire right when they are due
+            interval = min(interval, min((x - now).total_seconds() for x in upcoming))
+        return max(self.min_sleep_time, min(interval, self.max_sleep_time))
+
+    def adaptive_sleep(self, deadlines: Iterable[Optional[datetime]] = (), received_times: Iterable[datetime] = (),
+                       thresholds_hours: Optional[Iterable[float]] = None, **kwargs) -> str:
+        """
+        Sleeps for next_wake_seconds (still interruptible, see wait).
+
+        :return: Why the sleep ended, see wait.
+        :rtype: str
+        """
+        sleep_time_seconds = int(round(self.next_wake_seconds(deadlines, received_times, thresholds_hours)))
+        kwargs = self._setup_sleep_in_rounds(**kwargs)
+        self.logger.debug(f"adaptive sleep: idle interval {self._idle_interval:.0f}s, "
+                          f"next wake in {sleep_time_seconds}s")
+        self.sleep_time_string = sleep_time_seconds
+        return self._log_and_sleep(sleep_time_seconds, **kwargs)
 
     @classmethod
-    def is_snooze_expired(cls, snoozed_at: datetime, snooze_expiration_limit_hours: Optional[int] = None):
+    def is_snooze_expired(cls, snoozed_at: datetime, snooze_expiration_limit_hours: Optional[int] = None,
+                          reference_time: Optional[datetime] = None):
         if not snooze_expiration_limit_hours:
             snooze_expiration_limit_hours = cls.DEFAULT_SNOOZE_EXPIRATION_LIMIT_HOURS
         snooze_expiration_limit_seconds = snooze_expiration_limit_hours * cls.SECONDS_IN_HOUR
-        time_since_snooze = (datetime.now() - snoozed_at)
+        # reference_time lets a whole monitor cycle share one "now"
+        time_since_snooze = ((reference_time or datetime.now()) - snoozed_at)
         if time_since_snooze.total_seconds() >= snooze_expiration_limit_seconds:
             #print('msg_snoozed expired! Unsnoozing now!')
             return True
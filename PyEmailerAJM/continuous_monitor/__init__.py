@@ -1,4 +1,20 @@
-from PyEmailerAJM.continuous_monitor.continuous_monitor import ContinuousMonitor
-from PyEmailerAJM.continuous_monitor.continuous_monitor_alert_send import ContinuousMonitorAlertSend
+from typing import TYPE_CHECKING
+
+_LAZY_ATTRS = {'ContinuousMonitor': 'PyEmailerAJM.continuous_monitor.continuous_monitor',
+               'ContinuousMonitorAlertSend': 'PyEmailerAJM.continuous_monitor.continuous_monitor_alert_send'}
+
+if TYPE_CHECKING:
+    from PyEmailerAJM.continuous_monitor.continuous_monitor import ContinuousMonitor
+    from PyEmailerAJM.continuous_monitor.continuous_monitor_alert_send import ContinuousMonitorAlertSend
+
+
+def __getattr__(name: str):
+    from PyEmailerAJM import lazy_getattr
+    return lazy_getattr(globals(), _LAZY_ATTRS, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = ['ContinuousMonitor', 'ContinuousMonitorAlertSend']
\ No newline at end of file
@@ -1,6 +1,14 @@
 from PyEmailerAJM.continuous_monitor.backend.email_state import EmailState
 from PyEmailerAJM.continuous_monitor.backend.continuous_colorizer import ContinuousColorizer
 from PyEmailerAJM.continuous_monitor.backend.snooze_tracking import SnoozeTracking
+from PyEmailerAJM.continuous_monitor.backend.sqlite_snooze_tracking import SqliteSnoozeTracking
+from PyEmailerAJM.continuous_monitor.backend.shared_snooze_tracking import SharedSnoozeTracking
+from PyEmailerAJM.continuous_monitor.backend.folder_sync import FolderSync, SyncDiff
+from PyEmailerAJM.continuous_monitor.backend.change_probe import ChangeProbe, FolderFingerprint
+from PyEmailerAJM.continuous_monitor.backend.mail_events import (MailEventSource, LocalEventSource,
+                                                                 OutlookMailEventSource)
 from PyEmailerAJM.continuous_monitor.backend.continuous_monitor_base import ContinuousMonitorBase
 
-__all__ = ['EmailState','ContinuousColorizer', 'SnoozeTracking', 'ContinuousMonitorBase']
\ No newline at end of file
+__all__ = ['EmailState','ContinuousColorizer', 'SnoozeTracking', 'SqliteSnoozeTracking', 'SharedSnoozeTracking',
+           'FolderSync', 'SyncDiff', 'ChangeProbe', 'FolderFingerprint', 'MailEventSource', 'LocalEventSource',
+           'OutlookMailEventSource', 'ContinuousMonitorBase']
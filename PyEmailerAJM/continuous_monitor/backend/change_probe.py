@@ -0,0 +1,147 @@
+from datetime import datetime
+from logging import Logger, getLogger
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+# noinspection PyUnresolvedReferences
+from pywintypes import com_error
+
+from PyEmailerAJM.backend import folder_key
+
+
+class FolderFingerprint(NamedTuple):
+    """
+    A cheap summary of a folder's state, read without enumerating its items.
+
+    Attributes:
+        item_count (int): Items.Count of the folder.
+        unread_count (int): UnReadItemCount of the folder.
+        newest_received (Optional[datetime]): ReceivedTime of the most recently received item.
+        newest_modified (Optional[datetime]): LastModificationTime of the most recently modified item.
+    """
+    item_count: Optional[int]
+    unread_count: Optional[int]
+    newest_received: Optional[datetime]
+    newest_modified: Optional[datetime]
+
+    def __str__(self):
+        return (f"{self.item_count} items, {self.unread_count} unread, "
+                f"newest received {self.newest_received}, newest modified {self.newest_modified}")
+
+
+class ChangeProbe:
+    """
+    Decides if a monitor cycle has to run the full refresh/classify pipeline.
+
+    Before each cycle the folder is fingerprinted (Items.Count, UnReadItemCount and the newest
+    ReceivedTime/LastModificationTime via Sort + GetFirst). The full pipeline only runs when the
+    fingerprint differs from the one of the last full run, or when a deadline (a snooze expiring,
+    an unread message crossing an alert threshold) has passed since the last full run.
+
+    should_run only holds on to the fingerprint it took; commit() records it (and the run time) once
+    the full pipeline succeeded, so a cycle that fails is run again by the next one.
+    """
+
+    def __init__(self, **kwargs):
+        self.logger: Logger = kwargs.get('logger', getLogger(__name__))
+        self._fingerprints: Dict[tuple, FolderFingerprint] = {}
+        self._last_run: Dict[tuple, datetime] = {}
+        # taken by should_run, recorded by commit
+        self._pending: Dict[tuple, Tuple[FolderFingerprint, datetime]] = {}
+
+    folder_key = staticmethod(folder_key)
+
+    @staticmethod
+    def _newest(items, property_name: str) -> Optional[datetime]:
+        try:
+            items.Sort(f'[{property_name}]', True)
+            newest = items.GetFirst()
+            return getattr(newest, property_name) if newest is not None else None
+        except (AttributeError, com_error):
+            return None
+
+    def fingerprint(self, folder) -> FolderFingerprint:
+        """
+        :param folder: The Outlook folder to fingerprint.
+        :return: The folder's current fingerprint.
+        :rtype: FolderFingerprint
+        """
+        items = folder.Items
+        return FolderFingerprint(item_count=items.Count,
+                                 unread_count=getattr(folder, 'UnReadItemCount', None),
+                                 newest_received=self._newest(items, 'ReceivedTime'),
+                                 newest_modified=self._newest(folder.Items, 'LastModificationTime'))
+
+    def last_fingerprint(self, folder) -> Optional[FolderFingerprint]:
+        return self._fingerprints.get(self.folder_key(folder))
+
+    def last_run(self, folder) -> Optional[datetime]:
+        """ When the full pipeline last ran for the given folder (None if it never did). """
+        return self._last_run.get(self.folder_key(folder))
+
+    def reset(self, folder=None) -> None:
+        """ Forgets the fingerprint of the given folder (or all folders) so the next cycle runs in full. """
+        if folder is None:
+            self._fingerprints.clear()
+            self._last_run.clear()
+            self._pending.clear()
+        else:
+            self._fingerprints.pop(self.folder_key(folder), None)
+            self._last_run.pop(self.folder_key(folder), None)
+            self._pending.pop(self.folder_key(folder), None)
+
+    @staticmethod
+    def _passed_deadline(deadlines: Iterable[Optional[datetime]], last_run: datetime,
+                         now: datetime) -> Optional[datetime]:
+        for deadline in deadlines:
+            if deadline is not None and last_run < deadline <= now:
+                return deadline
+        return None
+
+    def should_run(self, folder, deadlines: Iterable[Optional[datetime]] = (), now: datetime = None) -> bool:
+        """
+        Fingerprints ``folder`` and decides if the full pipeline has to run. The probe result
+        and the decision are logged every time. If it has to run, call commit() once it succeeded.
+
+        :param folder: The monitored Outlook folder.
+        :param deadlines: Points in time that force a full run once they have passed.
+        :type deadlines: Iterable[Optional[datetime]]
+        :param now: The reference time, defaults to now.
+        :type now: datetime, optional
+        :return: True if the full pipeline should run, False if the cycle can be skipped.
+        :rtype: bool
+        """
+        now = now or datetime.now()
+        key = self.folder_key(folder)
+        fingerprint = self.fingerprint(folder)
+        previous = self._fingerprints.get(key)
+        self.logger.info(f"change probe: {fingerprint}")
+
+        if previous is None:
+            reason = "no previous fingerprint"
+        elif fingerprint != previous:
+            reason = "folder changed"
+        else:
+            deadline = self._passed_deadline(deadlines, self._last_run[key], now)
+            reason = f"deadline {deadline} passed" if deadline is not None else None
+
+        if reason is None:
+            self.logger.info("change probe: folder unchanged and no deadline passed, skipping cycle")
+            return False
+
+        self.logger.info(f"change probe: running full cycle ({reason})")
+        self._pending[key] = (fingerprint, now)
+        return True
+
+    def commit(self, folder) -> None:
+        """
+        Records the fingerprint and time of the last should_run that returned True for ``folder`` as
+        the last full run; called once the full pipeline succeeded. Does nothing if there is none.
+
+        :param folder: The monitored Outlook folder.
+        :return: None
+        :rtype: None
+        """
+        key = self.folder_key(folder)
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            self._fingerprints[key], self._last_run[key] = pending
@@ -1,14 +1,18 @@
 from abc import abstractmethod
+from datetime import datetime
+from logging import Logger
 from os import getenv
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, List
+from typing import TYPE_CHECKING, Dict, Optional, List
 
 from PyEmailerAJM import PyEmailer, is_instance_of_dynamic
 from PyEmailerAJM.backend import TheSandman
-from . import ContinuousColorizer, SnoozeTracking, EmailState
+from . import (ContinuousColorizer, SnoozeTracking, EmailState, FolderSync, ChangeProbe,
+               MailEventSource, OutlookMailEventSource)
 
 if TYPE_CHECKING:
     from PyEmailerAJM.backend import AlertTypes
+    from PyEmailerAJM.msg import Msg
 
 
 class ContinuousMonitorBase(PyEmailer, EmailState):
@@ -38,7 +42,26 @@ class ContinuousMonitorBase(PyEmailer, EmailState):
 
         initialize_helper_classes(self, **kwargs):
             Sets up and returns instances of helper classes including ContinuousColorizer, SnoozeTracking,
-            and TheSandman, each initialized with parameters from **kwargs.
+            and TheSandman, each initialized with parameters from **kwargs. Called on first use of
+            colorizer, snooze_tracker or sleep_timer (or by warm_up).
+
+        initialize_folder_sync(self, **kwargs):
+            Sets up the optional FolderSync engine used by refresh_messages when incremental_sync is True.
+
+        sync_folder(self), sync_candidates(self):
+            Syncs the read folder and keeps its unread messages (the only ones that can alert),
+            each snapshotted once per change, as the candidates classified by the synced path.
+
+        initialize_change_probe(self, **kwargs):
+            Sets up the optional ChangeProbe used by should_refresh when change_probe is True.
+
+        should_refresh(self), commit_refresh(self):
+            Probes the read folder and returns False if the cycle can be skipped; commit_refresh
+            records the probe once the full cycle succeeded.
+
+        next_wake_deadline(self), stop(self):
+            Used to wake the sleep between cycles early, on a deadline or on request
+            (new mail wakes it through the event_source when wake_on_new_mail is True).
 
         log_dev_mode_warnings(self):
             Logs warnings if the `dev_mode` attribute is set to True.
@@ -50,17 +73,100 @@ class ContinuousMonitorBase(PyEmailer, EmailState):
     ADMIN_EMAIL_LOGGER: List[str] = []
     ADMIN_EMAIL: List[str] = []
     ATTRS_TO_CHECK: List[str] = []
+    DEFAULT_USE_INCREMENTAL_SYNC = False
+    DEFAULT_SNAPSHOT_MSGS = False
+    DEFAULT_RELEASE_COM_ITEMS = False
+    DEFAULT_USE_RESTRICT_PREFILTER = True
+    DEFAULT_USE_KEYWORD_PREFILTER = False
+    DEFAULT_USE_CHANGE_PROBE = False
+    DEFAULT_RECONCILE_INTERVAL_SECONDS = 3600
+    DEFAULT_WAKE_ON_NEW_MAIL = True
 
     def __init__(self, display_window: bool, send_emails: bool, **kwargs):
         # Let EmailerInitializer handle logger factory vs instance normalization
         super().__init__(display_window, send_emails, **kwargs)
 
         self.dev_mode = kwargs.get('dev_mode', False)
-        self.colorizer, self.snooze_tracker, self.sleep_timer = self.initialize_helper_classes(**kwargs)
+        # colorizer, snooze_tracker and sleep_timer are created on first use
+        self._helper_kwargs = kwargs
+        self._colorizer = None
+        self._snooze_tracker = None
+        self._sleep_timer = None
+        self.folder_sync = self.initialize_folder_sync(**kwargs)
+        self.last_sync_diff = None
+        # unread messages of each synced folder by EntryID, see sync_folder
+        self._sync_candidates: Dict[tuple, Dict[str, 'Msg']] = {}
+
+        # property snapshots taken once per cycle (see Msg.refresh)
+        self.snapshot_msgs = kwargs.get('snapshot_msgs', self.__class__.DEFAULT_SNAPSHOT_MSGS)
+        self.snapshot_fields = kwargs.get('snapshot_fields', None)
+        self.release_com_items = kwargs.get('release_com_items', self.__class__.DEFAULT_RELEASE_COM_ITEMS)
+
+        # server side (Items.Restrict) pre-filtering of alert candidates
+        self.restrict_prefilter = kwargs.get('restrict_prefilter', self.__class__.DEFAULT_USE_RESTRICT_PREFILTER)
+        self.keyword_prefilter = kwargs.get('keyword_prefilter', self.__class__.DEFAULT_USE_KEYWORD_PREFILTER)
+        self.change_probe = self.initialize_change_probe(**kwargs)
+        # recorded after every full cycle, see ContinuousMonitor.record_full_cycle
+        self.pending_received_times: List[datetime] = []
+        self.threshold_deadline: Optional[datetime] = None
+
+        # event driven watch mode (see ContinuousMonitor.event_watch)
+        self._event_source: Optional[MailEventSource] = kwargs.get('event_source', None)
+        self.reconcile_interval_seconds = kwargs.get('reconcile_interval_seconds',
+                                                     self.__class__.DEFAULT_RECONCILE_INTERVAL_SECONDS)
+        self._event_watching = False
+        # endless_watch wakes up early when the event source reports new mail
+        self.wake_on_new_mail = kwargs.get('wake_on_new_mail', self.__class__.DEFAULT_WAKE_ON_NEW_MAIL)
 
         self.log_dev_mode_warnings()
         self.email_handler_init()
 
+    def _initialize_helpers(self):
+        colorizer, snooze_tracker, sleep_timer = self.initialize_helper_classes(**self._helper_kwargs)
+        # keep any helper that was set explicitly in the meantime
+        if self._colorizer is None:
+            self._colorizer = colorizer
+        if self._snooze_tracker is None:
+            self._snooze_tracker = snooze_tracker
+        if self._sleep_timer is None:
+            self._sleep_timer = sleep_timer
+
+    @property
+    def colorizer(self) -> ContinuousColorizer:
+        if self._colorizer is None:
+            self._initialize_helpers()
+        return self._colorizer
+
+    @colorizer.setter
+    def colorizer(self, value):
+        self._colorizer = value
+
+    @property
+    def snooze_tracker(self) -> SnoozeTracking:
+        if self._snooze_tracker is None:
+            self._initialize_helpers()
+        return self._snooze_tracker
+
+    @snooze_tracker.setter
+    def snooze_tracker(self, value):
+        self._snooze_tracker = value
+
+    @property
+    def sleep_timer(self) -> TheSandman:
+        if self._sleep_timer is None:
+            self._initialize_helpers()
+        return self._sleep_timer
+
+    @sleep_timer.setter
+    def sleep_timer(self, value):
+        self._sleep_timer = value
+
+    def warm_up(self):
+        super().warm_up()
+        if None in (self._colorizer, self._snooze_tracker, self._sleep_timer):
+            self._initialize_helpers()
+        return self
+
     @property
     def num_snoozed_msgs(self):
         if (self.snooze_tracker.json_loaded and
@@ -69,6 +175,21 @@ class ContinuousMonitorBase(PyEmailer, EmailState):
         else:
             return 0
 
+    @property
+    def event_source(self) -> MailEventSource:
+        """
+        :return: The new mail event source used by event_watch; an OutlookMailEventSource
+            is created on first use if none was passed in with the 'event_source' kwarg.
+        :rtype: MailEventSource
+        """
+        if self._event_source is None:
+            self._event_source = OutlookMailEventSource(logger=self.logger)
+        return self._event_source
+
+    @event_source.setter
+    def event_source(self, value: MailEventSource):
+        self._event_source = value
+
     @classmethod
     def check_for_class_attrs(cls, class_attrs_to_check):
         for c in class_attrs_to_check:
@@ -122,6 +243,144 @@ class ContinuousMonitorBase(PyEmailer, EmailState):
 
         return colorizer, snooze_tracker, sleep_timer
 
+    def initialize_folder_sync(self, **kwargs) -> Optional[FolderSync]:
+        """
+        :param kwargs: Accepts 'incremental_sync' (bool) to turn the sync engine on
+            and 'folder_sync' to override the FolderSync class.
+        :type kwargs: dict
+        :return: A FolderSync instance if incremental sync is enabled, otherwise None.
+        :rtype: Optional[FolderSync]
+        """
+        if not kwargs.get('incremental_sync', self.__class__.DEFAULT_USE_INCREMENTAL_SYNC):
+            return None
+        folder_sync_class = kwargs.get('folder_sync', FolderSync)
+        self.logger.info("incremental folder sync enabled")
+        return folder_sync_class(logger=self._normalize_logger(**kwargs))
+
+    def initialize_change_probe(self, **kwargs) -> Optional[ChangeProbe]:
+        """
+        :param kwargs: Accepts 'change_probe' (bool) to turn the probe on
+            and 'change_probe_class' to override the ChangeProbe class.
+        :type kwargs: dict
+        :return: A ChangeProbe instance if the change probe is enabled, otherwise None.
+        :rtype: Optional[ChangeProbe]
+        """
+        if not kwargs.get('change_probe', self.__class__.DEFAULT_USE_CHANGE_PROBE):
+            return None
+        change_probe_class = kwargs.get('change_probe_class', ChangeProbe)
+        self.logger.info("change probe enabled")
+        return change_probe_class(logger=self._normalize_logger(**kwargs))
+
+    def next_snooze_expiry(self, after: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        :param after: Only consider expiries later than this point in time.
+        :type after: Optional[datetime]
+        :return: The next point in time a snooze entry expires, or None.
+        :rtype: Optional[datetime]
+        """
+        # the tracker's own expiration_limit, the one its eviction and the alerts use
+        return self.snooze_tracker.next_expiry(after=after)
+
+    def cycle_deadlines(self) -> List[Optional[datetime]]:
+        """
+        :return: Points in time that force a full cycle once passed: the next snooze expiry
+            and the next alert threshold crossing recorded after the last full cycle.
+        :rtype: List[Optional[datetime]]
+        """
+        # expiries before the last full run were already handled by it
+        return [self.next_snooze_expiry(after=self.change_probe.last_run(self.read_folder)),
+                self.threshold_deadline]
+
+    def next_wake_deadline(self) -> Optional[datetime]:
+        """
+        :return: The next point in time the monitor should wake up at even if the sleep time
+            is not up yet (the next snooze expiry or alert threshold crossing), or None.
+        :rtype: Optional[datetime]
+        """
+        now = datetime.now()
+        deadlines = [self.next_snooze_expiry(after=now), self.threshold_deadline]
+        return min((x for x in deadlines if x is not None and x > now), default=None)
+
+    def stop(self) -> None:
+        """ Asks a running endless_watch/event_watch to stop, interrupting its current sleep. Thread safe. """
+        self.logger.info("stop requested")
+        self.sleep_timer.request_stop()
+        if self._event_source is not None:
+            self._event_source.interrupt()
+
+    def should_refresh(self) -> bool:
+        """
+        :return: True if the full refresh/classify pipeline should run this cycle. Always True
+            when the change probe is disabled.
+        :rtype: bool
+        """
+        if self.change_probe is None:
+            return True
+        self._set_read_folder()
+        return self.change_probe.should_run(self.read_folder, self.cycle_deadlines())
+
+    def commit_refresh(self) -> None:
+        """ Tells the change probe (if enabled) that the full cycle should_refresh asked for succeeded. """
+        if self.change_probe is not None:
+            self.change_probe.commit(self.read_folder)
+
+    def sync_folder(self):
+        """
+        Syncs the read folder and updates its candidates from the diff: added and changed messages
+        get a new snapshot (see Msg.refresh) and are kept if unread, removed ones are dropped.
+        Unchanged messages keep their snapshot, so classifying them reads no COM properties.
+
+        :return: The diff produced by the sync.
+        :rtype: SyncDiff
+        """
+        self._set_read_folder()
+        key = self.folder_sync.folder_key(self.read_folder)
+        if not self.folder_sync.has_synced(self.read_folder):
+            # a full sync reports the whole folder as added
+            self._sync_candidates.pop(key, None)
+        diff = self.folder_sync.sync(self.read_folder)
+        candidates = self._sync_candidates.setdefault(key, {})
+        for entry_id in diff.removed:
+            candidates.pop(entry_id, None)
+        for msg in diff.added + diff.changed:
+            msg.refresh(fields=self.snapshot_fields, release_item=self.release_com_items)
+            # marking a message read changes its LastModificationTime, so it shows up in a later diff
+            if msg.unread:
+                candidates[msg.entry_id] = msg
+            else:
+                candidates.pop(msg.entry_id, None)
+        return diff
+
+    def sync_candidates(self) -> List['Msg']:
+        """
+        :return: The unread messages of the synced read folder, as kept by sync_folder.
+        :rtype: List[Msg]
+        """
+        candidates = self._sync_candidates.get(self.folder_sync.folder_key(self.read_folder), {})
+        return list(candidates.values())
+
+    def get_synced_messages(self):
+        return self.sync_candidates()
+
+    def _uses_synced_messages(self, folder_index=None) -> bool:
+        return (self.folder_sync is not None and not folder_index
+                and self.folder_sync.has_synced(self.read_folder))
+
+    def GetMessages(self, folder_index=None, bulk_mode: bool = False, **kwargs):
+        """
+        Returns the sync candidates when incremental sync is enabled and the read folder
+        has been synced, otherwise defers to PyEmailer.GetMessages.
+        """
+        if not bulk_mode and self._uses_synced_messages(folder_index):
+            return self.sync_candidates()
+        return super().GetMessages(folder_index, bulk_mode=bulk_mode, **kwargs)
+
+    def iter_messages(self, folder_index=None, item_filter: Optional[str] = None, **kwargs):
+        """ Streaming counterpart of GetMessages (the sync candidates are already in memory). """
+        if self._uses_synced_messages(folder_index):
+            return iter(self.sync_candidates())
+        return super().iter_messages(folder_index, item_filter=item_filter, **kwargs)
+
     def log_dev_mode_warnings(self):
         if self.dev_mode:
             self.logger.warning("DEV MODE ACTIVATED!")
@@ -166,6 +425,11 @@ class ContinuousMonitorBase(PyEmailer, EmailState):
             self.logger.error(f"email handler not initialized because {e}")
             pass
 
+    def initialize_emailer_logger(self, logger: Logger = None, **kwargs):
+        # email_handler_init adds an email handler to the logger, so it is never shared with other emailers
+        kwargs['share_logger'] = False
+        return super().initialize_emailer_logger(logger, **kwargs)
+
     def _print_and_postprocess(self, alert_level):
         """
         :param alert_level: The level of alert to be logged and potentially emailed.
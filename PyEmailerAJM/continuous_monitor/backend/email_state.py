@@ -52,6 +52,8 @@ class BaseEmailState(metaclass=ABCMeta):
         self.logger: Optional[Logger] = None
         self.all_messages = None
         self._was_refreshed = False
+        self.folder_sync = None
+        self.last_sync_diff = None
 
     @abstractmethod
     def GetMessages(self):
@@ -67,6 +69,27 @@ class BaseEmailState(metaclass=ABCMeta):
     def SetupEmail(self):
         ...
 
+    @abstractmethod
+    def sync_folder(self):
+        """
+        Runs one incremental sync of the monitored folder through ``folder_sync``.
+
+        :return: The diff produced by the sync.
+        :rtype: SyncDiff
+        """
+        ...
+
+    @abstractmethod
+    def get_synced_messages(self):
+        """
+        Builds all_messages from the state kept by the last ``sync_folder()`` call, without
+        enumerating the folder again.
+
+        :return: Messages of the synced folder.
+        :rtype: list
+        """
+        ...
+
     def _raise_no_messages(self):
         """
         Raises a NoMessagesFetched exception, indicating that the `all_messages` attribute has not been populated.
@@ -79,12 +102,18 @@ class BaseEmailState(metaclass=ABCMeta):
     def refresh_messages(self):
         """
         Refreshes the messages by retrieving them from the email folder.
+        If ``folder_sync`` is set, the folder is incrementally synced instead, the diff
+        is stored in ``last_sync_diff`` and the messages come from ``get_synced_messages()``.
 
         :return: None
         :rtype: None
         """
         self.logger.info("Refreshing messages from email folder...")
-        self.all_messages = self.GetMessages()
+        if self.folder_sync is not None:
+            self.last_sync_diff = self.sync_folder()
+            self.all_messages = self.get_synced_messages()
+        else:
+            self.all_messages = self.GetMessages()
         self._was_refreshed = True
         self.logger.info("Successfully refreshed messages from email folder.")
 
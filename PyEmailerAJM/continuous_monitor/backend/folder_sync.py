@@ -0,0 +1,187 @@
+from datetime import datetime
+from logging import Logger, getLogger
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+# noinspection PyUnresolvedReferences
+from pywintypes import com_error
+
+from PyEmailerAJM.backend import folder_key
+from PyEmailerAJM.msg import Msg, MsgRow
+
+
+class SyncDiff(NamedTuple):
+    """
+    The result of a single FolderSync.sync() call.
+
+    Attributes:
+        added (List[Msg]): Messages that were not in the working set before this sync.
+        changed (List[Msg]): Messages whose LastModificationTime changed since the last sync.
+        removed (List[str]): EntryIDs that are no longer in the folder.
+    """
+    added: List[Msg]
+    changed: List[Msg]
+    removed: List[str]
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self):
+        return f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed"
+
+
+class _FolderSyncState:
+    """ Per-folder watermark plus the EntryID keyed working set. """
+    __slots__ = ('watermark', 'messages', 'modified_times')
+
+    def __init__(self):
+        self.watermark: Optional[datetime] = None
+        self.messages: Dict[str, Msg] = {}
+        self.modified_times: Dict[str, datetime] = {}
+
+
+class FolderSync:
+    """
+    Incremental folder sync engine.
+
+    The first sync of a folder enumerates every item; after that only items with a
+    LastModificationTime at or after the folder's watermark are fetched (through Items.Restrict),
+    so the cost of a sync tracks the rate of change instead of the size of the folder.
+    Removals are detected by comparing Items.Count to the working set, and only when the counts
+    disagree is the (EntryID only) folder table read.
+
+    Subscribers registered with subscribe() are called with the SyncDiff of every sync that found changes.
+
+    Attributes:
+        RESTRICT_DATE_FORMAT (str): Date format used in the Items.Restrict watermark filter.
+        WATERMARK_FILTER (str): The Items.Restrict filter used for incremental syncs.
+            Restrict only has minute granularity, so >= is used and unchanged items are skipped
+            by comparing their LastModificationTime to the stored one.
+    """
+    RESTRICT_DATE_FORMAT = '%m/%d/%Y %I:%M %p'
+    WATERMARK_FILTER = "[LastModificationTime] >= '{watermark}'"
+
+    def __init__(self, **kwargs):
+        self.logger: Logger = kwargs.get('logger', getLogger(__name__))
+        self._states: Dict[tuple, _FolderSyncState] = {}
+        self._subscribers: List[Callable[[SyncDiff], None]] = []
+
+    def subscribe(self, callback: Callable[[SyncDiff], None]) -> None:
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[SyncDiff], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    folder_key = staticmethod(folder_key)
+
+    def has_synced(self, folder) -> bool:
+        state = self._states.get(self.folder_key(folder))
+        return state is not None and state.watermark is not None
+
+    def watermark(self, folder) -> Optional[datetime]:
+        state = self._states.get(self.folder_key(folder))
+        return state.watermark if state else None
+
+    def messages(self, folder) -> List[Msg]:
+        """ Returns the working set of the given folder as a list of Msg objects. """
+        state = self._states.get(self.folder_key(folder))
+        return list(state.messages.values()) if state else []
+
+    def reset(self, folder=None) -> None:
+        """ Drops the watermark and working set of the given folder (or all folders) forcing a full sync. """
+        if folder is None:
+            self._states.clear()
+        else:
+            self._states.pop(self.folder_key(folder), None)
+
+    def _restrict_to_watermark(self, items, watermark: datetime):
+        sql = self.__class__.WATERMARK_FILTER.format(
+            watermark=watermark.strftime(self.__class__.RESTRICT_DATE_FORMAT))
+        try:
+            restricted = items.Restrict(sql)
+            self.logger.debug(f"incremental sync filter: {sql}")
+            return restricted
+        except com_error as e:
+            self.logger.warning(f"Restrict failed ({e}), falling back to full folder sync.")
+            return None
+
+    def _current_entry_ids(self, folder) -> Set[str]:
+        try:
+            table = folder.GetTable()
+            table.Columns.RemoveAll()
+            table.Columns.Add('EntryID')
+            return {row.entry_id for row in MsgRow.from_table(table, ('EntryID',))}
+        except (AttributeError, com_error):
+            return {item.EntryID for item in folder.Items}
+
+    def _apply_items(self, state: _FolderSyncState, items, seen_ids: Optional[Set[str]] = None):
+        added, changed = [], []
+        for item in items:
+            entry_id = item.EntryID
+            modified = item.LastModificationTime
+            if seen_ids is not None:
+                seen_ids.add(entry_id)
+
+            previous = state.modified_times.get(entry_id)
+            if previous is None:
+                added_or_changed = added
+            elif previous != modified:
+                added_or_changed = changed
+            else:
+                continue
+
+            msg = Msg(item, logger=self.logger)
+            state.messages[entry_id] = msg
+            state.modified_times[entry_id] = modified
+            added_or_changed.append(msg)
+            if state.watermark is None or modified > state.watermark:
+                state.watermark = modified
+        return added, changed
+
+    def _remove(self, state: _FolderSyncState, entry_ids) -> List[str]:
+        removed = []
+        for entry_id in entry_ids:
+            state.messages.pop(entry_id, None)
+            state.modified_times.pop(entry_id, None)
+            removed.append(entry_id)
+        return removed
+
+    def _notify(self, diff: SyncDiff):
+        for callback in list(self._subscribers):
+            try:
+                callback(diff)
+            except Exception as e:
+                self.logger.error(f"sync subscriber {callback} failed: {e}", exc_info=True)
+
+    def sync(self, folder) -> SyncDiff:
+        """
+        Brings the working set of ``folder`` up to date and returns what changed.
+
+        :param folder: An Outlook folder (must expose Items; GetTable is used when available).
+        :return: The added/changed/removed diff since the previous sync.
+        :rtype: SyncDiff
+        """
+        state = self._states.setdefault(self.folder_key(folder), _FolderSyncState())
+        items = None
+        if state.watermark is not None:
+            items = self._restrict_to_watermark(folder.Items, state.watermark)
+
+        if items is None:
+            # first sync (or Restrict is unavailable), enumerate everything
+            seen_ids = set()
+            added, changed = self._apply_items(state, folder.Items, seen_ids)
+            removed = self._remove(state, [x for x in state.messages if x not in seen_ids])
+        else:
+            added, changed = self._apply_items(state, items)
+            removed = []
+            if folder.Items.Count != len(state.messages):
+                current_ids = self._current_entry_ids(folder)
+                removed = self._remove(state, [x for x in state.messages if x not in current_ids])
+
+        diff = SyncDiff(added, changed, removed)
+        self.logger.info(f"folder sync complete: {diff} ({len(state.messages)} in working set)")
+        if diff.has_changes:
+            self._notify(diff)
+        return diff
@@ -0,0 +1,182 @@
+from logging import Logger, getLogger
+from queue import Queue, Empty
+from time import monotonic
+from typing import Callable, List, Optional
+
+# noinspection PyUnresolvedReferences
+import pythoncom
+import win32com.client as win32
+
+
+class MailEventSource:
+    """
+    Base class of the new-mail event sources used by ContinuousMonitor.event_watch
+    (and by endless_watch, to wake its sleep between cycles).
+
+    Event sources queue the EntryIDs of newly arrived items; event_watch drains them with wait().
+    Subclasses hook up the actual notification mechanism in start()/stop().
+
+    Methods:
+        start(folder, email_app=None):
+            Starts delivering events for the given folder.
+
+        stop():
+            Stops delivering events.
+
+        notify(*entry_ids):
+            Queues the EntryIDs of new items (called by the event handlers) and calls the subscribers with them.
+
+        subscribe(callback), unsubscribe(callback):
+            Registers callbacks called with the EntryIDs of every notification, e.g. to wake a sleeping monitor.
+
+        pump():
+            Delivers pending events; sources that need it are pumped by wait() and by TheSandman while it sleeps.
+
+        clear():
+            Drops the queued EntryIDs.
+
+        interrupt():
+            Makes the current (or next) wait() return right away, without any EntryIDs.
+
+        wait(timeout):
+            Blocks for up to timeout seconds and returns the EntryIDs that arrived (possibly an empty list).
+    """
+    DEFAULT_POLL_INTERVAL_SECONDS = 0.25
+
+    def __init__(self, **kwargs):
+        self.logger: Logger = kwargs.get('logger', getLogger(__name__))
+        self.poll_interval = kwargs.get('poll_interval', self.__class__.DEFAULT_POLL_INTERVAL_SECONDS)
+        self._queue: Queue = Queue()
+        self._subscribers: List[Callable[..., None]] = []
+        self.started = False
+
+    def start(self, folder, email_app=None) -> None:
+        self.started = True
+
+    def stop(self) -> None:
+        self.started = False
+
+    def subscribe(self, callback: Callable[..., None]) -> None:
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[..., None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def notify(self, *entry_ids: str) -> None:
+        entry_ids = [x for x in entry_ids if x]
+        for entry_id in entry_ids:
+            self._queue.put(entry_id)
+        if entry_ids:
+            for callback in list(self._subscribers):
+                callback(*entry_ids)
+
+    def interrupt(self) -> None:
+        self._queue.put(None)
+
+    def clear(self) -> None:
+        self._drain()
+
+    def pump(self) -> None:
+        """ Hook for sources that have to pump messages for their events to be delivered. """
+        pass
+
+    def _drain(self) -> List[str]:
+        entry_ids = []
+        while True:
+            try:
+                entry_ids.append(self._queue.get_nowait())
+            except Empty:
+                return entry_ids
+
+    def wait(self, timeout: float) -> List[str]:
+        """
+        :param timeout: The maximum number of seconds to wait for new items.
+        :type timeout: float
+        :return: The EntryIDs of all items that arrived, an empty list if the timeout passed first.
+        :rtype: List[str]
+        """
+        deadline = monotonic() + max(timeout, 0)
+        while True:
+            self.pump()
+            try:
+                first = self._queue.get(timeout=max(0, min(self.poll_interval, deadline - monotonic())))
+                # None is queued by interrupt()
+                return [x for x in [first] + self._drain() if x is not None]
+            except Empty:
+                if monotonic() >= deadline:
+                    return []
+
+
+class LocalEventSource(MailEventSource):
+    """
+    In-process event source; emit() stands in for Outlook raising ItemAdd/NewMailEx.
+    Used to drive event_watch in tests and latency benchmarks.
+    """
+
+    def emit(self, *entry_ids: str) -> None:
+        self.notify(*entry_ids)
+
+
+class _ItemsEventHandler:
+    """ win32com event sink for Items.ItemAdd """
+    source: Optional['OutlookMailEventSource'] = None
+
+    # noinspection PyPep8Naming
+    def OnItemAdd(self, item):
+        self.source.notify(getattr(item, 'EntryID', None))
+
+
+class _ApplicationEventHandler:
+    """ win32com event sink for Application.NewMailEx """
+    source: Optional['OutlookMailEventSource'] = None
+
+    # noinspection PyPep8Naming
+    def OnNewMailEx(self, entry_id_collection):
+        self.source.notify(*str(entry_id_collection).split(','))
+
+
+class OutlookMailEventSource(MailEventSource):
+    """
+    Outlook backed event source.
+
+    Subscribes to Items.ItemAdd of the monitored folder (this covers items that are moved
+    into the folder by rules) and, if use_new_mail_ex is True, to Application.NewMailEx
+    (which only fires for the default Inbox). COM events are only delivered while the
+    thread pumps messages, so wait() calls pythoncom.PumpWaitingMessages every poll_interval
+    (endless_watch has the sleep timer call pump() while it sleeps).
+    The same EntryID may be reported by both events; event_watch de-duplicates them.
+    """
+    DEFAULT_USE_NEW_MAIL_EX = False
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.use_new_mail_ex = kwargs.get('use_new_mail_ex', self.__class__.DEFAULT_USE_NEW_MAIL_EX)
+        self._items = None
+        self._items_events = None
+        self._app_events = None
+
+    def start(self, folder, email_app=None) -> None:
+        # the Items collection has to stay referenced or its events stop firing
+        self._items = folder.Items
+        self._items_events = win32.WithEvents(self._items, _ItemsEventHandler)
+        self._items_events.source = self
+        if self.use_new_mail_ex and email_app is not None:
+            self._app_events = win32.WithEvents(email_app, _ApplicationEventHandler)
+            self._app_events.source = self
+        self.logger.info(f"subscribed to new mail events for {folder}")
+        super().start(folder, email_app)
+
+    def stop(self) -> None:
+        for events in (self._items_events, self._app_events):
+            if events is not None:
+                events.source = None
+                # noinspection PyUnresolvedReferences
+                events.close()
+        self._items = self._items_events = self._app_events = None
+        self.logger.info("unsubscribed from new mail events")
+        super().stop()
+
+    def pump(self) -> None:
+        pythoncom.PumpWaitingMessages()
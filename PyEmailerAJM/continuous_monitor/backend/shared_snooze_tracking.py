@@ -0,0 +1,140 @@
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from PyEmailerAJM.continuous_monitor.backend.sqlite_snooze_tracking import SqliteSnoozeTracking
+
+
+class SharedSnoozeTracking(SqliteSnoozeTracking):
+    """
+    SqliteSnoozeTracking for several monitor processes on one host sharing one snooze database
+    (pass the same file_name/db_path to each of them).
+
+    SQLite (WAL mode, busy timeout) serializes the writers, and the upsert keeps the newest snooze
+    time, so processes no longer overwrite each other's entries. Every write stamps its row with an
+    increasing seq number. Before each cycle (begin_cycle) and each batch of writes (snooze_msgs),
+    refresh() checks PRAGMA data_version, which only changes when another connection has committed.
+    If it has, only the rows with a seq above the last one seen are read. Deletes (prune_expired)
+    bump a prune generation counter instead, which makes the other processes reload everything.
+
+    All processes sharing a database have to use this class; writes made through
+    SqliteSnoozeTracking do not get a seq and are only seen on a full reload.
+
+    Attributes:
+        DEFAULT_BUSY_TIMEOUT_SECONDS (float): How long a write waits for another process' transaction.
+    """
+    DEFAULT_BUSY_TIMEOUT_SECONDS = 30
+
+    _SHARED_SCHEMA = ("CREATE INDEX IF NOT EXISTS snooze_seq ON snooze (seq)",
+                      "CREATE TABLE IF NOT EXISTS snooze_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+                      "INSERT OR IGNORE INTO snooze_meta (key, value) VALUES ('prune_generation', 0)")
+    _UPSERT = ("INSERT INTO snooze (subject, snoozed_at, seq) "
+               "VALUES (?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM snooze)) "
+               "ON CONFLICT(subject) DO UPDATE SET snoozed_at = excluded.snoozed_at, seq = excluded.seq "
+               "WHERE excluded.snoozed_at > snooze.snoozed_at")
+
+    def __init__(self, file_path: Path, **kwargs):
+        # _connect (called by super().__init__) needs these
+        self.busy_timeout_seconds = kwargs.get('busy_timeout_seconds', self.__class__.DEFAULT_BUSY_TIMEOUT_SECONDS)
+        self._data_version: Optional[int] = None
+        self._prune_generation: Optional[int] = None
+        self._last_seq = 0
+        super().__init__(file_path, **kwargs)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = super()._connect()
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_seconds * 1000)}")
+        # IMMEDIATE so two processes opening an old database do not both add the column
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if 'seq' not in [r[1] for r in connection.execute("PRAGMA table_info(snooze)")]:
+                connection.execute("ALTER TABLE snooze ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+            for statement in self.__class__._SHARED_SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        return connection
+
+    def _read_data_version(self) -> int:
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_prune_generation(self) -> int:
+        return self.connection.execute("SELECT value FROM snooze_meta WHERE key = 'prune_generation'").fetchone()[0]
+
+    @property
+    def json_loaded(self):
+        """
+        :return: An in-memory copy of the snooze table ({subject: ISO 8601 snooze time}), kept up to date by refresh.
+        :rtype: dict
+        """
+        if self._json_loaded is None:
+            self._data_version = self._read_data_version()
+            self._prune_generation = self._read_prune_generation()
+            rows = self.connection.execute("SELECT subject, snoozed_at, seq FROM snooze").fetchall()
+            self._json_loaded = {subject: snoozed_at for subject, snoozed_at, _ in rows}
+            self._last_seq = max((seq for _, _, seq in rows), default=0)
+            self.logger.info(f"{len(self._json_loaded)} snooze entries loaded from {self.db_path}")
+        return self._json_loaded
+
+    def refresh(self) -> int:
+        """
+        Picks up the entries other processes have written since the last refresh.
+
+        :return: The number of entries read (0 if nothing changed).
+        :rtype: int
+        """
+        data_version = self._read_data_version()
+        if self._json_loaded is None or data_version == self._data_version:
+            return 0
+        self._data_version = data_version
+
+        if self._read_prune_generation() != self._prune_generation:
+            self.logger.info("snooze entries were pruned by another process, reloading all of them")
+            self._json_loaded = None
+            return len(self.json_loaded)
+
+        rows = self.connection.execute("SELECT subject, snoozed_at, seq FROM snooze WHERE seq > ? ORDER BY seq",
+                                       (self._last_seq,)).fetchall()
+        for subject, snoozed_at, seq in rows:
+            self._json_loaded[subject] = snoozed_at
+            self._index_entry(subject, datetime.fromisoformat(snoozed_at))
+            self._last_seq = seq
+        if rows:
+            self.logger.info(f"{len(rows)} snooze entries written by other processes loaded")
+        return len(rows)
+
+    def begin_cycle(self, reference_time: Optional[datetime] = None) -> datetime:
+        self.refresh()
+        return super().begin_cycle(reference_time)
+
+    @contextmanager
+    def batch(self):
+        """
+        Same as SqliteSnoozeTracking.batch, but refreshes first so writes are checked against
+        the entries of the other processes.
+
+        :return: None
+        :rtype: None
+        """
+        if not self._batch_depth:
+            self.refresh()
+        with super().batch():
+            yield self
+
+    def prune_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        :param now: The reference time, defaults to the cycle reference time or now.
+        :type now: Optional[datetime]
+        :return: The number of entries removed.
+        :rtype: int
+        """
+        with self.batch():
+            removed = super().prune_expired(now)
+            if removed:
+                self.connection.execute("UPDATE snooze_meta SET value = value + 1 WHERE key = 'prune_generation'")
+                self._prune_generation = self._read_prune_generation()
+        return removed
@@ -1,9 +1,13 @@
+import heapq
 import json
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, List
+from typing import TYPE_CHECKING, Optional, List, Dict, Tuple
 from logging import getLogger, basicConfig, getLevelName, INFO, DEBUG
 
+from PyEmailerAJM.backend import TheSandman
+
 
 if TYPE_CHECKING:
     from logging import Logger
@@ -35,13 +39,40 @@ class SnoozeTracking:
         read_entry(email_subject):
             Retrieves and returns the snooze time for the provided email subject as a datetime object. Returns None if no entry exists.
 
+        batch():
+            Context manager that defers saving until the end of the block, so several writes cost a single save.
+
+        prune_expired(now=None):
+            Removes entries whose snooze has expired. Runs after every snooze_msgs call if auto_prune is True.
+
+        begin_cycle(reference_time=None), is_snoozed(email_subject, reference_time=None), evict_expired(reference_time):
+            Entries are kept parsed in an in-memory index with a min-heap of expiry times, so a monitor cycle can
+            fix one reference time, evict expired entries in O(log n) each and answer "is snoozed" without parsing.
+
+        next_expiry(expiration_limit_hours=None, after=None):
+            Returns the earliest point in time (after `after`, if given) at which a snooze entry expires.
+
         snooze_msgs(msg_list):
             Processes a list of messages, marking non-snoozed messages as snoozed and writing entries for them. Raises an exception if a message doesn’t have the required properties.
     """
+    DEFAULT_AUTO_PRUNE = False
+
     def __init__(self, file_path: Path, **kwargs):
         self.logger = self.init_logger(**kwargs)
         self.file_path = file_path
         self._json_loaded = None
+        self._batch_depth = 0
+        self._unsaved_changes = False
+        self.auto_prune = kwargs.get('auto_prune', self.__class__.DEFAULT_AUTO_PRUNE)
+        self.snooze_expiration_limit_hours = kwargs.get('snooze_expiration_limit_hours', None)
+        self.reference_time: Optional[datetime] = None
+        # reference_time - expiration_limit, set by begin_cycle
+        self._cycle_cutoff: Optional[datetime] = None
+
+        # parsed index of json_loaded, rebuilt whenever json_loaded is replaced
+        self._indexed_source = None
+        self._entries: Dict[str, datetime] = {}
+        self._expiry_heap: List[Tuple[datetime, str]] = []
         self.logger.info(f"{self.__class__.__name__} loaded")
 
     @property
@@ -98,14 +129,138 @@ class SnoozeTracking:
         :return: None
         :rtype: None
         """
-        if (self.json_loaded.get(email_subject, None) is not None
-                and snooze_time < datetime.fromisoformat(self.json_loaded[email_subject])):
+        if self._is_older_than_entry(email_subject, snooze_time):
             self.logger.warning(f"entry already exists, (snoozed at {snooze_time}) skipping write...")
             return
         self.json_loaded.update({email_subject: snooze_time})
+        self._index_entry(email_subject, snooze_time)
         self.logger.debug(f'email_subject ({email_subject}) '
                           f'written with a snooze time of {snooze_time}')
-        self.save_json()
+        self._changed()
+
+    @property
+    def expiration_limit(self) -> timedelta:
+        return timedelta(hours=self.snooze_expiration_limit_hours
+                         or TheSandman.DEFAULT_SNOOZE_EXPIRATION_LIMIT_HOURS)
+
+    @property
+    def snooze_index(self) -> Dict[str, datetime]:
+        """
+        :return: {subject: snooze time} with the times already parsed. Built once per json_loaded
+            (so O(n) parsing happens on load, not on every read) together with the expiry heap.
+        :rtype: Dict[str, datetime]
+        """
+        json_loaded = self.json_loaded
+        if self._indexed_source is not json_loaded:
+            self._entries = {k: datetime.fromisoformat(str(v)) for k, v in json_loaded.items()}
+            limit = self.expiration_limit
+            self._expiry_heap = [(v + limit, k) for k, v in self._entries.items()]
+            heapq.heapify(self._expiry_heap)
+            self._indexed_source = json_loaded
+        return self._entries
+
+    def _index_entry(self, email_subject: str, snooze_time: datetime):
+        entries = self.snooze_index
+        entries[email_subject] = snooze_time
+        # the previous heap item of this subject goes stale and is skipped by evict_expired
+        heapq.heappush(self._expiry_heap, (snooze_time + self.expiration_limit, email_subject))
+
+    def _is_older_than_entry(self, email_subject: str, snooze_time: datetime) -> bool:
+        existing = self.snooze_index.get(email_subject, None)
+        return existing is not None and snooze_time < existing
+
+    def evict_expired(self, reference_time: Optional[datetime] = None) -> List[str]:
+        """
+        Drops entries that are expired at reference_time from the in-memory index (json_loaded,
+        and so the file, are left alone; see prune_expired).
+
+        :param reference_time: defaults to the cycle reference time or now.
+        :type reference_time: Optional[datetime]
+        :return: The subjects that were evicted.
+        :rtype: List[str]
+        """
+        reference_time = reference_time or self.reference_time or datetime.now()
+        entries = self.snooze_index
+        limit = self.expiration_limit
+        evicted = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= reference_time:
+            expiry, subject = heapq.heappop(self._expiry_heap)
+            snooze_time = entries.get(subject, None)
+            if snooze_time is not None and snooze_time + limit == expiry:
+                del entries[subject]
+                evicted.append(subject)
+        return evicted
+
+    def begin_cycle(self, reference_time: Optional[datetime] = None) -> datetime:
+        """
+        Fixes the reference time used by is_snoozed (and by the alert classes through it) for a monitor
+        cycle and evicts the entries that are expired at that time.
+
+        :param reference_time: defaults to now.
+        :type reference_time: Optional[datetime]
+        :return: The reference time of the cycle.
+        :rtype: datetime
+        """
+        self.reference_time = reference_time or datetime.now()
+        self._cycle_cutoff = self.reference_time - self.expiration_limit
+        evicted = self.evict_expired(self.reference_time)
+        if evicted:
+            self.logger.debug(f"{len(evicted)} expired snooze entries evicted")
+        return self.reference_time
+
+    def is_snoozed(self, email_subject: str, reference_time: Optional[datetime] = None) -> bool:
+        """
+        :param email_subject: The subject to check.
+        :type email_subject: str
+        :param reference_time: defaults to the cycle reference time or now.
+        :type reference_time: Optional[datetime]
+        :return: True if the subject has a snooze entry that has not expired at reference_time.
+        :rtype: bool
+        """
+        snooze_time = self.snooze_index.get(email_subject, None)
+        if snooze_time is None:
+            return False
+        if reference_time is None and self._cycle_cutoff is not None:
+            return snooze_time > self._cycle_cutoff
+        return (reference_time or datetime.now()) - snooze_time < self.expiration_limit
+
+    def _changed(self):
+        if self._batch_depth:
+            self._unsaved_changes = True
+        else:
+            self.save_json()
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers save_json until the outermost batch block ends (and only saves if something changed).
+
+        :return: None
+        :rtype: None
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._unsaved_changes:
+                self._unsaved_changes = False
+                self.save_json()
+
+    def prune_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        :param now: The reference time, defaults to the cycle reference time or now.
+        :type now: Optional[datetime]
+        :return: The number of entries removed.
+        :rtype: int
+        """
+        expired = self.evict_expired(now)
+        for k in expired:
+            self.json_loaded.pop(k, None)
+        if expired:
+            self.logger.info(f"pruned {len(expired)} expired snooze entries")
+            self._changed()
+        return len(expired)
 
     @staticmethod
     def _convert_datetime(value) -> str:
@@ -143,12 +298,29 @@ class SnoozeTracking:
         :return: A datetime object parsed from the entry corresponding to the email subject or None if the entry does not exist.
         :rtype: Optional[datetime]
         """
-        entry: Optional[str] = self.json_loaded.get(email_subject, None)
+        entry: Optional[datetime] = self.snooze_index.get(email_subject, None)
         if entry is None:
             self.logger.debug(f"no entry for {email_subject}")
             return None
         self.logger.debug(f"{email_subject} retrieved")
-        return datetime.fromisoformat(str(entry))
+        return entry
+
+    def next_expiry(self, expiration_limit_hours: Optional[float] = None,
+                    after: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        :param expiration_limit_hours: How long a snooze lasts in hours, defaults to this tracker's expiration_limit.
+        :type expiration_limit_hours: Optional[float]
+        :param after: Only consider expiries later than this point in time.
+        :type after: Optional[datetime]
+        :return: The earliest expiry time of all snooze entries (later than `after`), or None if there is none.
+        :rtype: Optional[datetime]
+        """
+        limit = (timedelta(hours=expiration_limit_hours) if expiration_limit_hours is not None
+                 else self.expiration_limit)
+        expiries = [v + limit for v in self.snooze_index.values()]
+        if after is not None:
+            expiries = [x for x in expiries if x > after]
+        return min(expiries, default=None)
 
     def snooze_msgs(self, msg_list: List['_AlertMsgBase']):
         """
@@ -157,16 +329,20 @@ class SnoozeTracking:
         :return: Returns the updated list of messages after processing snooze operations.
         :rtype: List[_AlertMsgBase]
         """
-        for m in msg_list:
-            if not hasattr(m, 'msg_snoozed'):
-                try:
-                    raise AttributeError(f"msg_snoozed not found in {m}")
-                except AttributeError as e:
-                    self.logger.error(e, exc_info=True)
-                    raise e
-            if not m.msg_snoozed:
-                m.msg_snoozed = True
-                self.write_entry(m.subject, m.msg_snoozed_time)
-            else:
-                print(f"{m.subject} already marked as snoozed")
+        # one save (or transaction) for the whole list
+        with self.batch():
+            for m in msg_list:
+                if not hasattr(m, 'msg_snoozed'):
+                    try:
+                        raise AttributeError(f"msg_snoozed not found in {m}")
+                    except AttributeError as e:
+                        self.logger.error(e, exc_info=True)
+                        raise e
+                if not m.msg_snoozed:
+                    m.msg_snoozed = True
+                    self.write_entry(m.subject, m.msg_snoozed_time)
+                else:
+                    print(f"{m.subject} already marked as snoozed")
+            if self.auto_prune:
+                self.prune_expired()
         return msg_list
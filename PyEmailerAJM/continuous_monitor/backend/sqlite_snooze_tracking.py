@@ -0,0 +1,164 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from PyEmailerAJM.continuous_monitor.backend.snooze_tracking import SnoozeTracking
+
+
+class SqliteSnoozeTracking(SnoozeTracking):
+    """
+    Drop-in SnoozeTracking backend that stores entries in a SQLite database (WAL mode) instead of
+    rewriting the whole JSON file on every write.
+
+    Entries are upserted one row at a time and snooze_msgs commits the whole cycle in a single
+    transaction. Expired entries are pruned after every snooze_msgs call (auto_prune defaults to True).
+    If file_path points at a JSON file, the database is kept next to it (same name, DB_SUFFIX) and the
+    JSON entries are migrated into it once; the JSON file is then renamed to <name>.json.migrated.
+
+    Reads are answered from an in-memory copy of the table (json_loaded), so read_entry and
+    num_snoozed_msgs work exactly as they do with SnoozeTracking.
+
+    Attributes:
+        DB_SUFFIX (str): Suffix of the database file derived from a JSON file_path.
+        MIGRATED_SUFFIX (str): Suffix appended to the JSON file once it has been migrated.
+    """
+    DEFAULT_AUTO_PRUNE = True
+    DB_SUFFIX = '.sqlite3'
+    MIGRATED_SUFFIX = '.migrated'
+
+    _SCHEMA = ("CREATE TABLE IF NOT EXISTS snooze ("
+               "subject TEXT PRIMARY KEY, "
+               "snoozed_at TEXT NOT NULL)",
+               "CREATE INDEX IF NOT EXISTS snooze_snoozed_at ON snooze (snoozed_at)")
+    # keeps the newest snooze time if the subject is already there
+    _UPSERT = ("INSERT INTO snooze (subject, snoozed_at) VALUES (?, ?) "
+               "ON CONFLICT(subject) DO UPDATE SET snoozed_at = excluded.snoozed_at "
+               "WHERE excluded.snoozed_at > snooze.snoozed_at")
+
+    def __init__(self, file_path: Path, **kwargs):
+        super().__init__(file_path, **kwargs)
+        self.json_path = self.file_path if self.file_path.suffix.lower() == '.json' else None
+        self.db_path = Path(kwargs.get('db_path', None) or self.file_path.with_suffix(self.__class__.DB_SUFFIX))
+        self.connection = self._connect()
+        self._migrate_json()
+        if self.auto_prune:
+            self.prune_expired()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(self.db_path))
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            for statement in self.__class__._SCHEMA:
+                connection.execute(statement)
+        self.logger.info(f"snooze database opened at {self.db_path}")
+        return connection
+
+    def _migrate_json(self) -> int:
+        """
+        Imports the entries of the JSON file at json_path (if there is one) and renames it.
+
+        :return: The number of entries migrated.
+        :rtype: int
+        """
+        if self.json_path is None or not self.json_path.is_file():
+            return 0
+        with open(self.json_path, 'r') as f:
+            entries = json.load(f)
+        with self.connection:
+            self.connection.executemany(self.__class__._UPSERT,
+                                        [(k, self._convert_datetime(v)) for k, v in entries.items()])
+        migrated_path = self.json_path.with_name(self.json_path.name + self.__class__.MIGRATED_SUFFIX)
+        self.json_path.replace(migrated_path)
+        self._json_loaded = None
+        self.logger.info(f"migrated {len(entries)} snooze entries from {self.json_path} (renamed to {migrated_path})")
+        return len(entries)
+
+    @property
+    def json_loaded(self):
+        """
+        :return: An in-memory copy of the snooze table ({subject: ISO 8601 snooze time}).
+        :rtype: dict
+        """
+        if self._json_loaded is None:
+            self._json_loaded = dict(self.connection.execute("SELECT subject, snoozed_at FROM snooze"))
+            self.logger.info(f"{len(self._json_loaded)} snooze entries loaded from {self.db_path}")
+        return self._json_loaded
+
+    def write_entry(self, email_subject: str, snooze_time: datetime):
+        """
+        :param email_subject: The subject of the email to be logged or updated.
+        :type email_subject: str
+        :param snooze_time: The datetime until which the email is snoozed.
+        :type snooze_time: datetime
+        :return: None
+        :rtype: None
+        """
+        if self._is_older_than_entry(email_subject, snooze_time):
+            self.logger.warning(f"entry already exists, (snoozed at {snooze_time}) skipping write...")
+            return
+        snoozed_at = self._convert_datetime(snooze_time)
+        self.connection.execute(self.__class__._UPSERT, (email_subject, snoozed_at))
+        self.json_loaded[email_subject] = snoozed_at
+        self._index_entry(email_subject, snooze_time)
+        self.logger.debug(f'email_subject ({email_subject}) '
+                          f'written with a snooze time of {snooze_time}')
+        self._changed()
+
+    @contextmanager
+    def batch(self):
+        """
+        Runs the block in a single transaction, committed when the outermost batch ends
+        and rolled back (along with the in-memory copy) if it raises.
+
+        :return: None
+        :rtype: None
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            if self._batch_depth == 1:
+                self.connection.rollback()
+                self._json_loaded = None
+                self._unsaved_changes = False
+            raise
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth and self._unsaved_changes:
+            self._unsaved_changes = False
+            self.save_json()
+
+    def prune_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        :param now: The reference time, defaults to the cycle reference time or now.
+        :type now: Optional[datetime]
+        :return: The number of entries removed.
+        :rtype: int
+        """
+        cutoff = (now or self.reference_time or datetime.now()) - self.expiration_limit
+        removed = self.connection.execute("DELETE FROM snooze WHERE snoozed_at <= ?",
+                                          (self._convert_datetime(cutoff),)).rowcount
+        if removed:
+            self.evict_expired(now)
+            for subject in [k for k in self.json_loaded if k not in self.snooze_index]:
+                del self.json_loaded[subject]
+            self.logger.info(f"pruned {removed} expired snooze entries")
+        self._changed()
+        return removed
+
+    def save_json(self):
+        """
+        Commits pending writes. Kept under this name so SnoozeTracking callers keep working.
+
+        :return: None
+        :rtype: None
+        """
+        self.connection.commit()
+        self.logger.debug(f"snooze entries committed to {self.db_path}")
+
+    def close(self) -> None:
+        self.connection.close()
@@ -1,9 +1,15 @@
 from abc import abstractmethod
-from typing import Callable
+from datetime import datetime
+from time import monotonic
+from typing import Callable, Iterable, Optional, List
+
+# noinspection PyUnresolvedReferences
+from pywintypes import com_error
 
 from PyEmailerAJM.backend import AlertTypes
 from PyEmailerAJM.continuous_monitor.backend.continuous_monitor_base import ContinuousMonitorBase
-from PyEmailerAJM.msg import MsgFactory
+from PyEmailerAJM.continuous_monitor.backend import MailEventSource
+from PyEmailerAJM.msg import Msg, MsgFactory
 
 
 class ContinuousMonitor(ContinuousMonitorBase):
@@ -11,6 +17,20 @@ class ContinuousMonitor(ContinuousMonitorBase):
     MSG_FACTORY_CLASS: MsgFactory = MsgFactory
     ALERT_CHECK_STR = "Checking for emails with an alert..."
     NO_ALERTS_STR = "No emails with an alert detected in {read_folder} ({num_snoozed} snoozed)."
+    NO_CHANGES_STR = "No changes in {read_folder} since the last check, skipping."
+    NEW_ITEMS_STR = "{num_new} new item(s) in {read_folder}, checking for alerts..."
+    # how often event_watch re-checks stop_condition while waiting for events
+    EVENT_WAIT_SECONDS = 1
+
+    @property
+    def candidate_filter(self) -> Optional[str]:
+        """
+        :return: The Items.Restrict filter for alert candidates if restrict_prefilter is on, otherwise None.
+        :rtype: Optional[str]
+        """
+        if not self.restrict_prefilter:
+            return None
+        return self.__class__.MSG_FACTORY_CLASS.build_candidate_filter(include_keywords=self.keyword_prefilter)
 
     def GetMessages(self, folder_index=None):
         """
@@ -19,12 +39,51 @@ class ContinuousMonitor(ContinuousMonitorBase):
         :return: A list of sorted and filtered message objects, each containing an alert.
         :rtype: list
         """
-        msgs = super().GetMessages(folder_index)
-        sorted_msgs = [
-            self.__class__.MSG_FACTORY_CLASS.get_msg(x, logger=self.logger, snooze_checker=self.snooze_tracker) for x in
-            msgs]
-        alert_messages = [x for x in sorted_msgs if x is not None and x.msg_alert]
-        return alert_messages
+        return list(self.iter_messages(folder_index))
+
+    def iter_messages(self, folder_index=None, **kwargs):
+        """
+        Streaming version of GetMessages: each message is classified as soon as it is read from the
+        folder, and the alert messages are yielded one at a time, so a consumer can stop early.
+
+        :param folder_index: Index of the folder from which messages are retrieved. Defaults to None if not specified.
+        :type folder_index: int, optional
+        :return: An iterator of the messages containing an alert.
+        :rtype: Iterator
+        """
+        if self._uses_synced_messages(folder_index):
+            # snapshotted by sync_folder when they last changed
+            return self._iter_alert_messages(self.sync_candidates())
+        msgs = super().iter_messages(folder_index, item_filter=self.candidate_filter)
+        if self.snapshot_msgs:
+            msgs = self._iter_refreshed(msgs)
+        return self._iter_alert_messages(msgs)
+
+    def get_synced_messages(self):
+        """
+        :return: The alert messages among the sync candidates. Only these are classified: read messages
+            can not alert, and unchanged ones are classified from the snapshot taken by sync_folder.
+        :rtype: list
+        """
+        return self._get_alert_messages(self.sync_candidates())
+
+    def _iter_refreshed(self, msgs):
+        for m in msgs:
+            m.refresh(fields=self.snapshot_fields, release_item=self.release_com_items)
+            yield m
+
+    def _iter_alert_messages(self, msgs):
+        # one reference time for the whole cycle, expired snoozes are evicted up front
+        reference_time = self.snooze_tracker.begin_cycle()
+        for x in msgs:
+            alert_msg = self.__class__.MSG_FACTORY_CLASS.get_msg(x, logger=self.logger,
+                                                                 snooze_checker=self.snooze_tracker,
+                                                                 now=reference_time)
+            if alert_msg is not None and alert_msg.msg_alert:
+                yield alert_msg
+
+    def _get_alert_messages(self, msgs):
+        return list(self._iter_alert_messages(msgs))
 
     def _set_args_for_endless_watch(self):
         """
@@ -77,12 +136,18 @@ class ContinuousMonitor(ContinuousMonitorBase):
         """
         Checks for emails in the specified folder and identifies if there are any alerts. Alerts,
         if present, are categorized as overdue, warning, or critical warning, and are processed accordingly.
-        Then logs the result of the check.
+        Then logs the result of the check. If the change probe is enabled and reports no changes
+        (and no passed deadlines) the cycle is skipped.
 
         :return: None
         :rtype: None
 
         """
+        if not self.should_refresh():
+            self.logger.info(self.__class__.NO_CHANGES_STR.format(read_folder=self.read_folder), print_msg=True)
+            self.sleep_timer.record_activity(False)
+            return
+
         alert_check_string = kwargs.get('alert_check_string', self.__class__.ALERT_CHECK_STR)
         self.logger.info(alert_check_string, print_msg=True)
         self.refresh_messages()
@@ -90,6 +155,197 @@ class ContinuousMonitor(ContinuousMonitorBase):
         self._classify_and_process(**kwargs)
 
         self.snooze_tracker.snooze_msgs(self.all_messages)
+        self.record_full_cycle()
+        self.commit_refresh()
+
+    def _get_pending_received_times(self) -> List[datetime]:
+        items = self._get_folder_items(self.read_folder, self.__class__.MSG_FACTORY_CLASS.build_pending_filter())
+        return [item.ReceivedTime for item in items
+                if getattr(item, 'UnRead', False) and getattr(item, 'ReceivedTime', None) is not None]
+
+    def record_full_cycle(self):
+        """
+        Records the ReceivedTime of unread messages that can still cross an alert threshold (only these are
+        read, through MsgFactory.build_pending_filter) and the resulting threshold_deadline, which the change
+        probe and the adaptive sleep schedule use. Also tells the sleep timer if the cycle saw any activity.
+        Does nothing unless tracks_thresholds.
+
+        :return: None
+        :rtype: None
+        """
+        if not self.tracks_thresholds:
+            return
+        received_times = self._get_pending_received_times()
+        active = bool(self.all_messages) or sorted(received_times) != sorted(self.pending_received_times)
+
+        self._record_pending_received_times(received_times)
+        self.sleep_timer.record_activity(active)
+
+    def _record_pending_received_times(self, received_times: List[datetime]):
+        self.pending_received_times = received_times
+        self.threshold_deadline = self.sleep_timer.next_threshold_crossing(received_times, self.alert_thresholds_hours)
+        self.logger.debug(f"next alert threshold crossing: {self.threshold_deadline}")
+
+    @property
+    def tracks_thresholds(self) -> bool:
+        """
+        :return: True if the next alert threshold crossing is recorded, i.e. if the change probe,
+            the adaptive sleep schedule or a running event_watch uses it.
+        :rtype: bool
+        """
+        return self.change_probe is not None or self.sleep_timer.use_adaptive_sleep or self._event_watching
+
+    @property
+    def alert_thresholds_hours(self) -> List[float]:
+        return [hours for hours, _ in self.__class__.MSG_FACTORY_CLASS.alert_thresholds()]
+
+    def _in_read_folder(self, item) -> bool:
+        folder_id = getattr(self.read_folder, 'EntryID', None)
+        try:
+            parent_id = getattr(item.Parent, 'EntryID', None)
+        except (AttributeError, com_error):
+            parent_id = None
+        return folder_id is None or parent_id is None or parent_id == folder_id
+
+    def _open_new_items(self, entry_ids: Iterable[str]):
+        item_opener = self._get_item_opener(self.read_folder)
+        msgs = []
+        # ItemAdd and NewMailEx can both report the same item
+        for entry_id in dict.fromkeys(entry_ids):
+            # NewMailEx reports new mail of every store and inbox, so no StoreID is passed
+            # and the items outside the read folder are skipped
+            try:
+                item = self._open_item_by_entry_id(entry_id)
+            except com_error as e:
+                self.logger.warning(f"could not open new item {entry_id}: {e}")
+                continue
+            if not self._in_read_folder(item):
+                self.logger.debug(f"new item {entry_id} is not in {self.read_folder}, skipping")
+                continue
+            msgs.append(Msg(item, logger=self.logger, item_opener=item_opener))
+        return msgs
+
+    def _record_new_items(self, msgs: List[Msg]):
+        # new unread items can cross an alert threshold before the next full cycle
+        received_times = [m.received_time for m in msgs if m.unread and m.received_time is not None]
+        if received_times and self.tracks_thresholds:
+            self._record_pending_received_times(self.pending_received_times + received_times)
+
+    def check_new_items(self, entry_ids: Iterable[str], **kwargs):
+        """
+        Classifies and processes only the given (newly arrived) items of the read folder instead of the
+        whole folder. Their ReceivedTime is added to pending_received_times, so the threshold_deadline
+        also covers them.
+
+        :param entry_ids: EntryIDs of the new items, as delivered by the event source.
+        :type entry_ids: Iterable[str]
+        :return: None
+        :rtype: None
+        """
+        msgs = self._open_new_items(entry_ids)
+        self.logger.info(self.__class__.NEW_ITEMS_STR.format(num_new=len(msgs), read_folder=self.read_folder),
+                         print_msg=True)
+        self.all_messages = self._get_alert_messages(msgs)
+        self._was_refreshed = True
+
+        self._classify_and_process(**kwargs)
+
+        self.snooze_tracker.snooze_msgs(self.all_messages)
+        self._record_new_items(msgs)
+        self._was_refreshed = False
+
+    def event_watch(self, stop_condition: Callable[[], bool] = None, event_source: MailEventSource = None,
+                    reconcile_interval_seconds: float = None):
+        """
+        Event driven alternative to endless_watch. New items are classified as soon as the event
+        source reports them, and a full check_for_alerts reconcile runs at start up and then every
+        reconcile_interval_seconds. The reconcile also runs as soon as the threshold_deadline passes,
+        so messages that age past an alert threshold are not left waiting for the interval.
+
+        :param stop_condition: Checked between events, the watch ends once it returns True.
+        :type stop_condition: Callable[[], bool], optional
+        :param event_source: Overrides self.event_source (e.g. a LocalEventSource in tests).
+        :type event_source: MailEventSource, optional
+        :param reconcile_interval_seconds: Overrides self.reconcile_interval_seconds.
+        :type reconcile_interval_seconds: float, optional
+        :return: None
+        :rtype: None
+        """
+        if not self.dev_mode:
+            self._set_args_for_endless_watch()
+
+        stop_condition = stop_condition or (lambda: False)
+        event_source = event_source or self.event_source
+        reconcile_interval = reconcile_interval_seconds or self.reconcile_interval_seconds
+
+        self._set_read_folder()
+        self.logger.info(self.__class__.TITLE_STRING.format(getattr(self.read_folder, 'name', None)), print_msg=True)
+        event_source.start(self.read_folder, self.email_app)
+        next_reconcile = monotonic()
+        self._event_watching = True
+        try:
+            while not stop_condition() and not self.sleep_timer.stop_requested:
+                wake_at = self._threshold_wake_time(next_reconcile)
+                if monotonic() >= wake_at:
+                    self.check_for_alerts()
+                    self._was_refreshed = False
+                    next_reconcile = monotonic() + reconcile_interval
+                    continue
+                entry_ids = event_source.wait(min(self.__class__.EVENT_WAIT_SECONDS, wake_at - monotonic()))
+                if entry_ids:
+                    self.check_new_items(entry_ids)
+        except KeyboardInterrupt:
+            self.logger.error("KeyboardInterrupt detected, exiting program.")
+        finally:
+            self._event_watching = False
+            event_source.stop()
+
+    def _threshold_wake_time(self, next_reconcile: float) -> float:
+        # the threshold_deadline as a monotonic() time, if it comes before the next reconcile
+        if self.threshold_deadline is None:
+            return next_reconcile
+        seconds_left = (self.threshold_deadline - datetime.now()).total_seconds()
+        return min(next_reconcile, monotonic() + seconds_left)
+
+    def _sleep_until_next_cycle(self):
+        # both wake up early on stop() and new mail notifications
+        if self.sleep_timer.use_adaptive_sleep:
+            return self.sleep_timer.adaptive_sleep(deadlines=[self.next_snooze_expiry(after=datetime.now())],
+                                                   received_times=self.pending_received_times,
+                                                   thresholds_hours=self.alert_thresholds_hours)
+        return self.sleep_timer.sleep_in_rounds(deadline=self.next_wake_deadline())
+
+    def _on_new_mail(self, *entry_ids: str):
+        self.logger.debug(f"new mail notification for {len(entry_ids)} item(s)")
+        self.sleep_timer.notify_new_mail()
+
+    def _start_new_mail_wake(self) -> Optional[MailEventSource]:
+        """
+        Subscribes the sleep timer to the event source, so the sleep between endless_watch cycles
+        ends as soon as new mail arrives. The sleep timer pumps the source while it sleeps.
+
+        :return: The started event source, or None if wake_on_new_mail is off or the source failed to start.
+        :rtype: Optional[MailEventSource]
+        """
+        if not self.wake_on_new_mail:
+            return None
+        self._set_read_folder()
+        event_source = self.event_source
+        try:
+            event_source.start(self.read_folder, self.email_app)
+        except (AttributeError, com_error) as e:
+            self.logger.warning(f"not subscribed to new mail events ({e}), sleeping without them.")
+            return None
+        event_source.subscribe(self._on_new_mail)
+        self.sleep_timer.pump = event_source.pump
+        return event_source
+
+    def _stop_new_mail_wake(self, event_source: Optional[MailEventSource]):
+        if event_source is None:
+            return
+        self.sleep_timer.pump = None
+        event_source.unsubscribe(self._on_new_mail)
+        event_source.stop()
 
     def endless_watch(self, stop_condition: Callable[[], bool] = None):
         if not self.dev_mode:
@@ -100,15 +356,21 @@ class ContinuousMonitor(ContinuousMonitorBase):
 
         self.logger.info(self.__class__.TITLE_STRING.format(email_dir_name), print_msg=True)
 
-        while not stop_condition():
-            try:
-                self.check_for_alerts()
-                self._was_refreshed = False
-                self.sleep_timer.sleep_in_rounds()
-            except KeyboardInterrupt:
-                self.logger.error("KeyboardInterrupt detected, exiting program.")
-                break
-
+        event_source = self._start_new_mail_wake()
+        try:
+            while not stop_condition() and not self.sleep_timer.stop_requested:
+                try:
+                    if event_source is not None:
+                        # the full cycle below covers the items reported so far
+                        event_source.clear()
+                    self.check_for_alerts()
+                    self._was_refreshed = False
+                    self._sleep_until_next_cycle()
+                except KeyboardInterrupt:
+                    self.logger.error("KeyboardInterrupt detected, exiting program.")
+                    break
+        finally:
+            self._stop_new_mail_wake(event_source)
 
 if __name__ == '__main__':
     ContinuousMonitor.MSG_FACTORY_CLASS.ALERT_SUBJECT_KEYWORDS = ['training']
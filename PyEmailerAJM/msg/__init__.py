@@ -1,5 +1,24 @@
 # pylint: disable=cyclic-import, wrong-import-position
+from typing import TYPE_CHECKING
+
 from PyEmailerAJM.msg.msg import Msg, FailedMsg
-from PyEmailerAJM.msg.factory import MsgFactory
 
-__all__ = ['Msg', 'FailedMsg', 'MsgFactory']
+# the factory pulls in the alert classes and TheSandman (tqdm), so it is imported on first use
+_LAZY_ATTRS = {'MsgRow': 'PyEmailerAJM.msg.msg_row',
+               'MsgFactory': 'PyEmailerAJM.msg.factory'}
+
+if TYPE_CHECKING:
+    from PyEmailerAJM.msg.msg_row import MsgRow
+    from PyEmailerAJM.msg.factory import MsgFactory
+
+
+def __getattr__(name: str):
+    from PyEmailerAJM import lazy_getattr
+    return lazy_getattr(globals(), _LAZY_ATTRS, name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
+__all__ = ['Msg', 'FailedMsg', 'MsgRow', 'MsgFactory']
@@ -1,6 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
+from typing import Optional
 import inspect
 
 import win32com.client as win32
@@ -52,7 +53,7 @@ class _AlertCheckMethods:
 
     @classmethod
     def _check_attachment_name_for_keys(cls, msg: Msg):
-        for a in msg.attachments:
+        for a in msg.attachment_names:
             try:
                 if cls._check_string_for_keys(Path(a).resolve().stem):
                     return True
@@ -107,17 +108,26 @@ class _AlertMsgBase(Msg, _AlertCheckMethods):
 
     # noinspection PyUnresolvedReferences
     def __init__(self, email_item: win32.CDispatch or 'extract_msg.Message', **kwargs):
-        if isinstance(email_item, Msg):
-            email_item = email_item()
+        source_msg = email_item if isinstance(email_item, Msg) else None
+        if source_msg is not None:
+            # carry over the snapshot/opener so a released item is not re-opened just to build this class
+            kwargs.setdefault('item_opener', source_msg.item_opener)
+            email_item = source_msg._email_item
 
         self.logger = kwargs.get('logger', None)
 
         super().__init__(email_item, **kwargs)
+        if source_msg is not None and source_msg.snapshot is not None:
+            self._snapshot = source_msg.snapshot
 
         self.recent_days_cap = kwargs.get('recent_days_cap', self.__class__.ALERT_TIME_HOURS)
+        # set by MsgFactory.classify, which has already done the full alert check
+        self._alert_checked: Optional[bool] = kwargs.get('alert_checked', None)
         self._msg_snoozed = None
         self._msg_snoozed_time = None
         self.snooze_checker = kwargs.get('snooze_checker', None)
+        # fixed per monitor cycle by SnoozeTracking.begin_cycle, None means "now"
+        self.reference_time: Optional[datetime] = kwargs.get('reference_time', None)
         self.__class__.AlertMsgBaseCheckClsAttrs()
 
     def __init_subclass__(cls, **kwargs):
@@ -138,24 +148,28 @@ class _AlertMsgBase(Msg, _AlertCheckMethods):
                 continue
             raise AttributeError(cls.ALERT_SUBJECT_KEYWORD_ERROR)
 
+    def _snooze_expiration_limit_hours(self) -> Optional[float]:
+        # the tracker's limit (snooze_expiration_limit_hours), so alerts expire on the tracker's schedule
+        limit = getattr(self.snooze_checker, 'expiration_limit', None)
+        return limit.total_seconds() / TheSandman.SECONDS_IN_HOUR if isinstance(limit, timedelta) else None
+
     def _still_snoozed_check(self):
         snooze_checker_entry = self.snooze_checker.read_entry(self.subject)
 
-        if not snooze_checker_entry and self.msg_snoozed_time:
+        if snooze_checker_entry:
+            # one rule for the tracker's eviction and the alerts
+            still_snoozed = self.snooze_checker.is_snoozed(self.subject, reference_time=self.reference_time)
+        elif self.msg_snoozed_time:
             # FIXME: is this the cause of the "\snooze_tracking.py", line 102, in write_entry
             #  TypeError: fromisoformat: argument must be str
-            snooze_expired = TheSandman.is_snooze_expired(self.msg_snoozed_time)
-        elif not snooze_checker_entry and not self.msg_snoozed_time:
-            snooze_expired = True
+            still_snoozed = not TheSandman.is_snooze_expired(
+                self.msg_snoozed_time, snooze_expiration_limit_hours=self._snooze_expiration_limit_hours(),
+                reference_time=self.reference_time)
         else:
-            snooze_expired = TheSandman.is_snooze_expired(snooze_checker_entry)
+            still_snoozed = False
 
-        if not snooze_expired:
-            self.msg_snoozed = True
-            return True
-        self.msg_snoozed = False
-        return False
-        # return False
+        self.msg_snoozed = bool(still_snoozed)
+        return self.msg_snoozed
 
     @property
     def msg_alert(self):
@@ -165,9 +179,11 @@ class _AlertMsgBase(Msg, _AlertCheckMethods):
         :return: True if the email item is unread and not recent, otherwise False.
         :rtype: bool
         """
+        if self._alert_checked is not None:
+            return self._alert_checked
         still_snoozed = self._still_snoozed_check()
         if not still_snoozed:
-            if self.email_item.Unread and not self._msg_is_recent() and self.msg_is_alert(self):
+            if self.unread and not self._msg_is_recent() and self.msg_is_alert(self):
                 return True
         return False
 
@@ -248,8 +264,8 @@ class _AlertMsgBase(Msg, _AlertCheckMethods):
         :return: True if the message is an alert, False otherwise.
         :rtype: bool
         """
-        alert_check_methods = [x(msg) for x in cls._validate_alert_check_methods(**kwargs)]
-        if any(alert_check_methods):
+        # short-circuit so body/attachments are only read when the subject did not match
+        if any(x(msg) for x in cls._validate_alert_check_methods(**kwargs)):
             return True
         return False
 
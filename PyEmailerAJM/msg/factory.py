@@ -1,3 +1,7 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple, Type
+
 from ..backend.errs import InvalidAlertLevel
 from .alert_messages import _AlertMsgBase, _OverDueMsg, _CriticalWarningMsg, _WarningMsg
 from ..backend.enums import AlertTypes
@@ -15,20 +19,158 @@ class MsgFactory:
         types in the order of evaluation for determining the alert level.
 
     Methods:
+        classify(msg, **kwargs):
+            Reads the message's unread flag, age and keyword hit once, maps the age to an alert tier
+            with a sorted-threshold lookup and builds exactly one alert message object (or returns None).
+
         _check_alert_level(msg, **kwargs):
-            Iterates through the defined message type classes (MSG_CLASSES) and
-            determines the alert type for the given message. Returns the first
-            message object with a valid alert type.
+            Kept for backwards compatibility, delegates to classify.
+
+        build_candidate_filter(now=None, include_keywords=False):
+            Builds an @SQL (DASL) Items.Restrict filter that only lets through messages that could alert
+            (unread and older than the lowest alert threshold, optionally containing an alert keyword).
+
+        build_pending_filter(now=None):
+            Builds an @SQL filter for unread messages that can still cross an alert threshold.
 
         get_msg(msg, **kwargs):
             Determines and constructs the appropriate alert message object based on the
             `ALERT_LEVEL` of the given message. If `ALERT_LEVEL` is not defined,
-            attempts to infer and determine the alert type using `_check_alert_level`.
+            attempts to infer and determine the alert type using `classify`.
             Raises InvalidAlertLevel if the alert level does not match any valid value.
     """
     # order is VERY IMPORTANT
     MSG_CLASSES = [_OverDueMsg, _CriticalWarningMsg, _WarningMsg]
     ALERT_SUBJECT_KEYWORDS = []#['keywords']
+    SECONDS_IN_HOUR = 3600
+
+    # DASL names used by build_candidate_filter
+    DASL_READ = '"urn:schemas:httpmail:read"'
+    DASL_RECEIVED_TIME = '"urn:schemas:httpmail:datereceived"'
+    DASL_KEYWORD_FIELDS = ('"urn:schemas:httpmail:subject"', '"urn:schemas:httpmail:textdescription"')
+    DASL_DATE_FORMAT = '%m/%d/%Y %I:%M %p'
+
+    @classmethod
+    def alert_thresholds(cls) -> List[Tuple[float, Type[_AlertMsgBase]]]:
+        """
+        :return: (ALERT_TIME_HOURS, alert class) pairs of MSG_CLASSES sorted by ascending threshold.
+        :rtype: List[Tuple[float, Type[_AlertMsgBase]]]
+        """
+        return sorted(((c.ALERT_TIME_HOURS, c) for c in cls.MSG_CLASSES), key=lambda x: x[0])
+
+    @classmethod
+    def get_alert_class_for_age(cls, age_hours: float,
+                                thresholds: List[Tuple[float, Type[_AlertMsgBase]]] = None
+                                ) -> Optional[Type[_AlertMsgBase]]:
+        """
+        :param age_hours: The age of the message in hours.
+        :type age_hours: float
+        :param thresholds: Pre-computed alert_thresholds(), computed if not given.
+        :return: The alert class with the highest threshold the age is past, or None if it is past none.
+        :rtype: Optional[Type[_AlertMsgBase]]
+        """
+        thresholds = thresholds or cls.alert_thresholds()
+        # a message is only "not recent" once its age is strictly past the threshold
+        index = bisect_left([t for t, _ in thresholds], age_hours)
+        return thresholds[index - 1][1] if index else None
+
+    @classmethod
+    def get_msg_age_hours(cls, msg, now: datetime = None) -> float:
+        """
+        :param msg: The message to get the age of.
+        :param now: The reference time, defaults to now.
+        :return: The age of the message in hours; messages without a received time are treated as infinitely old.
+        :rtype: float
+        """
+        received_time = msg.received_time
+        if received_time is None:
+            return float('inf')
+        if now is None:
+            now = datetime.now(tz=received_time.tzinfo)
+        elif now.tzinfo is None and received_time.tzinfo is not None:
+            # a naive cycle reference time is local time, same as datetime.now(tz=...) above
+            now = now.astimezone(received_time.tzinfo)
+        return abs(received_time - now).total_seconds() / cls.SECONDS_IN_HOUR
+
+    @classmethod
+    def classify(cls, msg, **kwargs) -> Optional[_AlertMsgBase]:
+        """
+        Single pass alert classification.
+
+        :param msg: The message object to be classified.
+        :type msg: Msg
+        :param kwargs: Passed on to the alert message class (logger, snooze_checker etc.).
+            Accepts 'now' to use a fixed reference time.
+        :type kwargs: dict
+        :return: An instance of the alert class whose threshold the message is past, or None if the
+            message is read, recent, has no alert keywords or is still snoozed.
+        :rtype: Optional[_AlertMsgBase]
+        """
+        now = kwargs.pop('now', None)
+        if not msg.unread:
+            return None
+
+        thresholds = cls.alert_thresholds()
+        alert_class = cls.get_alert_class_for_age(cls.get_msg_age_hours(msg, now), thresholds)
+        if alert_class is None:
+            return None
+
+        alert_class.ALERT_SUBJECT_KEYWORDS = cls.ALERT_SUBJECT_KEYWORDS
+        if not alert_class.msg_is_alert(msg):
+            return None
+
+        alert_msg = alert_class(msg, alert_checked=True, reference_time=now, **kwargs)
+        if alert_msg._still_snoozed_check():
+            return None
+        return alert_msg
+
+    @staticmethod
+    def _escape_dasl_string(value: str) -> str:
+        return str(value).replace("'", "''")
+
+    @classmethod
+    def _dasl_cutoff(cls, hours: float, now: datetime = None) -> str:
+        now = now or datetime.now(timezone.utc)
+        if now.tzinfo is not None:
+            now = now.astimezone(timezone.utc)
+        return (now - timedelta(hours=hours)).strftime(cls.DASL_DATE_FORMAT)
+
+    @classmethod
+    def build_pending_filter(cls, now: datetime = None) -> str:
+        """
+        :param now: The reference time, defaults to the current time.
+        :type now: datetime, optional
+        :return: An @SQL filter for unread messages that are still younger than the highest
+            alert threshold, i.e. the only messages that can still cross a threshold.
+        :rtype: str
+        """
+        cutoff = cls._dasl_cutoff(cls.alert_thresholds()[-1][0], now)
+        return f"@SQL=({cls.DASL_READ} = 0) AND ({cls.DASL_RECEIVED_TIME} >= '{cutoff}')"
+
+    @classmethod
+    def build_candidate_filter(cls, now: datetime = None, include_keywords: bool = False) -> str:
+        """
+        Builds an Items.Restrict filter that pushes the cheap parts of alert classification to the store,
+        so only messages that could alert cross the COM boundary. The Python side checks in classify
+        still run on every returned message and remain authoritative.
+
+        :param now: The reference time, defaults to the current time (DASL compares dates in UTC).
+        :type now: datetime, optional
+        :param include_keywords: If True, also require an ALERT_SUBJECT_KEYWORDS hit in the subject or
+            body via ci_phrasematch. This needs content indexing on the store, and it can not see
+            attachment names, so it is off by default.
+        :type include_keywords: bool
+        :return: An @SQL filter string.
+        :rtype: str
+        """
+        cutoff = cls._dasl_cutoff(cls.alert_thresholds()[0][0], now)
+        terms = [f"{cls.DASL_READ} = 0", f"{cls.DASL_RECEIVED_TIME} < '{cutoff}'"]
+        if include_keywords and cls.ALERT_SUBJECT_KEYWORDS:
+            keyword_terms = [f"{field} ci_phrasematch '{cls._escape_dasl_string(keyword)}'"
+                             for keyword in cls.ALERT_SUBJECT_KEYWORDS
+                             for field in cls.DASL_KEYWORD_FIELDS]
+            terms.append(' OR '.join(keyword_terms))
+        return '@SQL=' + ' AND '.join(f'({t})' for t in terms)
 
     @classmethod
     def _check_alert_level(cls, msg, **kwargs):
@@ -40,11 +182,7 @@ class MsgFactory:
         :return: The message type instance if an alert level is detected, otherwise None.
         :rtype: object or None
         """
-        for msg_type_class in cls.MSG_CLASSES:
-            msg_type_class.ALERT_SUBJECT_KEYWORDS = cls.ALERT_SUBJECT_KEYWORDS
-            m_type = msg_type_class(msg, **kwargs)
-            if m_type.msg_alert:
-                return m_type
+        return cls.classify(msg, **kwargs)
 
     @classmethod
     def get_msg(cls, msg: _AlertMsgBase, **kwargs):
@@ -58,18 +196,20 @@ class MsgFactory:
         :raises InvalidAlertLevel: If the ALERT_LEVEL of the provided message is not recognized.
         """
         if hasattr(msg.__class__, 'ALERT_LEVEL'):
+            if 'now' in kwargs:
+                kwargs['reference_time'] = kwargs.pop('now')
             if not isinstance(msg.ALERT_LEVEL, AlertTypes):
                 raise InvalidAlertLevel(msg)
             if msg.ALERT_LEVEL.value == AlertTypes.WARNING.value:
                 _WarningMsg.ALERT_SUBJECT_KEYWORDS = cls.ALERT_SUBJECT_KEYWORDS
-                return _WarningMsg(msg(), **kwargs)
+                return _WarningMsg(msg, **kwargs)
             if msg.ALERT_LEVEL.value == AlertTypes.CRITICAL_WARNING.value:
                 _CriticalWarningMsg.ALERT_SUBJECT_KEYWORDS = cls.ALERT_SUBJECT_KEYWORDS
-                return _CriticalWarningMsg(msg(), **kwargs)
+                return _CriticalWarningMsg(msg, **kwargs)
             if msg.ALERT_LEVEL.value == AlertTypes.OVERDUE.value:
                 _OverDueMsg.ALERT_SUBJECT_KEYWORDS = cls.ALERT_SUBJECT_KEYWORDS
-                return _OverDueMsg(msg(), **kwargs)
+                return _OverDueMsg(msg, **kwargs)
             else:
                 raise InvalidAlertLevel(msg)
-        # if it doesn't have an alert_level, then guess and check.
-        return cls._check_alert_level(msg, **kwargs)
+        # if it doesn't have an alert_level, classify it in a single pass.
+        return cls.classify(msg, **kwargs)
@@ -1,4 +1,5 @@
-from typing import Union
+from functools import wraps
+from typing import TYPE_CHECKING, Union, Callable, Iterable, Optional
 
 from ..backend.errs import UnrecognizedEmailError
 from ..backend.enums import EmailMsgImportanceLevel
@@ -10,13 +11,72 @@ import win32com.client as win32
 # noinspection PyUnresolvedReferences
 from pywintypes import com_error
 import datetime
-import extract_msg
-from bs4 import BeautifulSoup
 from logging import Logger, getLogger, info
 
+if TYPE_CHECKING:
+    # extract_msg and bs4 are slow to import, so they are imported where they are used
+    import extract_msg
+
+
+class MsgSnapshot:
+    """
+    A ``__slots__`` based record of Msg property values.
+
+    Each configured field is read from the COM item at most once (on first access, or all at once
+    with ``Msg.refresh(eager=True)``) and is then served from memory until the next ``Msg.refresh()``.
+
+    Attributes:
+        FIELDS (tuple): Every Msg property that can be held in a snapshot.
+        DEFAULT_FIELDS (tuple): The fields used when none are given. These are the properties read
+            by alert classification and snooze tracking.
+    """
+    FIELDS = ('entry_id', 'subject', 'received_time', 'unread', 'sender', 'sender_name',
+              'to', 'cc', 'body', 'attachment_names', 'importance')
+    DEFAULT_FIELDS = ('entry_id', 'subject', 'received_time', 'unread', 'body', 'attachment_names')
+
+    __slots__ = FIELDS + ('fields', 'taken_at')
+
+    def __init__(self, fields: Optional[Iterable[str]] = None):
+        fields = frozenset(fields or self.__class__.DEFAULT_FIELDS)
+        unknown = fields.difference(self.__class__.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown snapshot field(s): {', '.join(sorted(unknown))}. "
+                             f"Valid fields are: {', '.join(self.__class__.FIELDS)}")
+        self.fields = fields
+        self.taken_at = datetime.datetime.now()
+
+    def __repr__(self):
+        filled = {f: getattr(self, f) for f in self.__class__.FIELDS if self.has_value(f)}
+        return f"<{self.__class__.__name__} {filled}>"
+
+    def has_value(self, field: str) -> bool:
+        return hasattr(self, field)
+
+
+def _snapshot_property(getter: Callable):
+    """ Serves the wrapped property getter from the Msg snapshot (filling it on first access) if the field is in it. """
+    name = getter.__name__
+
+    @wraps(getter)
+    def wrapper(self):
+        snapshot = self._snapshot
+        if snapshot is None or name not in snapshot.fields:
+            return getter(self)
+        try:
+            return getattr(snapshot, name)
+        except AttributeError:
+            value = getter(self)
+            setattr(snapshot, name, value)
+            return value
+
+    return wrapper
+
 
 class _BasicMsgProperties:
     def __init__(self, email_item: win32.CDispatch):
+        self._snapshot: Optional[MsgSnapshot] = None
+        self._item_opener: Optional[Callable[[str], win32.CDispatch]] = None
+        self._email_item = None
         self.email_item = email_item
 
     @classmethod
@@ -25,6 +85,39 @@ class _BasicMsgProperties:
         ...
 
     @property
+    def email_item(self):
+        """
+        The underlying COM (or extract_msg) item. If it was released after a snapshot,
+        it is re-opened by EntryID through the item_opener.
+        """
+        if self._email_item is None and self._item_opener is not None:
+            entry_id = getattr(self._snapshot, 'entry_id', None) if self._snapshot is not None else None
+            if entry_id:
+                self._email_item = self._item_opener(entry_id)
+        return self._email_item
+
+    @email_item.setter
+    def email_item(self, value):
+        self._email_item = value
+
+    @property
+    @_snapshot_property
+    def entry_id(self):
+        return getattr(self.email_item, 'EntryID', None)
+
+    @property
+    @_snapshot_property
+    def unread(self):
+        return self.email_item.UnRead if hasattr(self.email_item, 'UnRead') else getattr(self.email_item, 'Unread', None)
+
+    @property
+    @_snapshot_property
+    def attachment_names(self):
+        # COM Attachment objects expose the name as FileName
+        return [getattr(a, 'FileName', None) or str(a) for a in self.attachments]
+
+    @property
+    @_snapshot_property
     def sender(self):
         if hasattr(self.email_item, 'SenderEmailType') and self.email_item.SenderEmailType == 'EX':
             return self.email_item.Sender.GetExchangeUser().PrimarySmtpAddress
@@ -42,27 +135,33 @@ class _BasicMsgProperties:
         return "SMTP"
 
     @property
+    @_snapshot_property
     def sender_name(self):
         return self.email_item.Sender if hasattr(self.email_item, 'Sender') else self.email_item.sender
 
     @property
+    @_snapshot_property
     def to(self):
         return self.email_item.To if hasattr(self.email_item, 'To') else self.email_item.to
 
     @property
+    @_snapshot_property
     def cc(self):
         return self.email_item.CC if hasattr(self.email_item, 'CC') else self.email_item.cc
 
     @property
+    @_snapshot_property
     def subject(self):
         return self.email_item.Subject if hasattr(self.email_item, 'Subject') else self.email_item.subject
 
     @property
+    @_snapshot_property
     def received_time(self):
         #not_future = self.email_item.ReceivedTime.year < datetime.datetime.now().year
         return self.email_item.ReceivedTime #if not_future else None
 
     @property
+    @_snapshot_property
     def body(self):
         return self.email_item.HTMLBody if hasattr(self.email_item, 'HTMLBody') else self.email_item.htmlBody
 
@@ -75,6 +174,7 @@ class _BasicMsgProperties:
         self._validate_and_add_attachments(self.email_item, value)
 
     @property
+    @_snapshot_property
     def importance(self):
         return self.email_item.Importance
 
@@ -89,19 +189,77 @@ class _BasicMsgProperties:
             elif isinstance(value, int):
                 pass
             self.email_item.Importance = value
+            if self._snapshot is not None and 'importance' in self._snapshot.fields:
+                self._snapshot.importance = value
         else:
             raise TypeError(f"Invalid importance level: {value}")
 
 
 class Msg(_BasicMsgProperties):
-    def __init__(self, email_item: Union[win32.CDispatch,extract_msg.Message], **kwargs):
+    def __init__(self, email_item: Union[win32.CDispatch, 'extract_msg.Message'], **kwargs):
         super().__init__(email_item)
         self._logger: Logger = kwargs.get('logger', getLogger(__name__))
         self.send_success = False
+        self._item_opener = kwargs.get('item_opener', None)
+        if kwargs.get('snapshot_fields', None) or kwargs.get('snapshot', False):
+            self.refresh(fields=kwargs.get('snapshot_fields', None))
 
     def __call__(self, *args, **kwargs):
         return self.email_item
 
+    @property
+    def snapshot(self) -> Optional[MsgSnapshot]:
+        return self._snapshot
+
+    @property
+    def item_opener(self):
+        return self._item_opener
+
+    @property
+    def item_released(self) -> bool:
+        return self._email_item is None
+
+    def refresh(self, fields: Optional[Iterable[str]] = None, eager: bool = False, release_item: bool = False):
+        """
+        Starts a new property snapshot, dropping any memoized values.
+
+        :param fields: The fields to memoize. Defaults to the current snapshot's fields
+            (or MsgSnapshot.DEFAULT_FIELDS if there is no snapshot yet).
+        :type fields: Iterable[str], optional
+        :param eager: If True, read every field now instead of on first access.
+        :type eager: bool
+        :param release_item: If True, read every field now and then release the COM item (see release_item()).
+        :type release_item: bool
+        :return: The new snapshot.
+        :rtype: MsgSnapshot
+        """
+        if fields is None and self._snapshot is not None:
+            fields = self._snapshot.fields
+        # make sure live values are read (not the old snapshot's)
+        self._snapshot = None
+        snapshot = MsgSnapshot(fields)
+        if eager or release_item:
+            for field in snapshot.fields:
+                setattr(snapshot, field, getattr(self, field))
+        self._snapshot = snapshot
+        if release_item:
+            self.release_item()
+        return snapshot
+
+    def release_item(self) -> bool:
+        """
+        Drops the reference to the COM item so it can be freed. Snapshot values keep working,
+        and the item is re-opened by EntryID on the next access to ``email_item``.
+
+        :return: True if the item was released, False if it can not be re-opened (no item_opener/EntryID).
+        :rtype: bool
+        """
+        if self._item_opener is None or self._snapshot is None or not getattr(self._snapshot, 'entry_id', None):
+            self._logger.debug("item not released, item_opener and a snapshotted entry_id are required.")
+            return False
+        self._email_item = None
+        return True
+
     @classmethod
     def SetupMsg(cls, sender, recipient, subject, body, email_item: win32.CDispatch, attachments: list = None, **kwargs):
         email_item.To = recipient
@@ -196,8 +354,8 @@ class Msg(_BasicMsgProperties):
         if self.received_time is not None:
             abs_diff = abs(self.received_time - datetime.datetime.now(tz=self.received_time.tzinfo))
             return abs_diff <= datetime.timedelta(days=recent_days_cap)
-        print(f"msg with subject \'{self.email_item.Subject}\' has no received time. defaulting to false")
-        self._logger.debug(f"msg with subject \'{self.email_item.Subject}\' has no received time. defaulting to false")
+        print(f"msg with subject \'{self.subject}\' has no received time. defaulting to false")
+        self._logger.debug(f"msg with subject \'{self.subject}\' has no received time. defaulting to false")
         return False
 
     def return_as_failed_send(self):
@@ -248,6 +406,7 @@ class FailedMsg(Msg):
 class _FailedMessageDetails(FailedMsg):
     @classmethod
     def extract_msg_from_attachment(cls, parent_msg: str):
+        import extract_msg
         return cls(extract_msg.Message(parent_msg))
 
     def _extract_from_failed_details_msg(self, para):
@@ -265,6 +424,7 @@ class _FailedMessageDetails(FailedMsg):
         detail_marker_string = kwargs.get('detail_marker_string',
                                           "Delivery has failed to these recipients or groups:")
 
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(self.body, features="html.parser")
 
         all_p = soup.find_all(name='p')  # , attrs={'class': 'MsoNormal'})
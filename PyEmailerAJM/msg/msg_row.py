@@ -0,0 +1,130 @@
+from logging import Logger, getLogger
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+# noinspection PyUnresolvedReferences
+from pywintypes import com_error
+
+from PyEmailerAJM.msg.msg import Msg
+
+
+class MsgRow:
+    """
+    A lightweight, read-only record for a single row of an Outlook ``Table`` (``Folder.GetTable()``).
+
+    Only the columns that were requested from the table are held in memory, so reading ``subject``,
+    ``received_time`` etc. costs nothing after the bulk fetch. The full Outlook item is only opened
+    (via ``item_opener`` and the row's EntryID) when the row is called, mirroring ``Msg.__call__``.
+
+    Attributes:
+        DEFAULT_COLUMNS (tuple): The columns fetched when none are specified.
+        DEFAULT_BATCH_SIZE (int): The number of rows pulled per ``Table.GetArray`` call.
+    """
+    DEFAULT_COLUMNS = ('EntryID', 'Subject', 'ReceivedTime', 'UnRead', 'SenderEmailAddress', 'MessageClass')
+    DEFAULT_BATCH_SIZE = 500
+
+    __slots__ = ('_values', '_item_opener', '_email_item', '_logger')
+
+    def __init__(self, values: Dict[str, Any], item_opener: Optional[Callable[[str], Any]] = None, **kwargs):
+        self._values = values
+        self._item_opener = item_opener
+        self._email_item = None
+        self._logger: Logger = kwargs.get('logger', getLogger(__name__))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} subject={self.subject!r} entry_id={self.entry_id!r}>"
+
+    def __getitem__(self, column: str):
+        return self._values[column]
+
+    def __call__(self, *args, **kwargs):
+        """
+        Opens (once) and returns the full Outlook item for this row.
+
+        :return: The full Outlook item, looked up by EntryID.
+        :raises AttributeError: If the row has no EntryID or no item_opener was given.
+        """
+        if self._email_item is None:
+            if self._item_opener is None or not self.entry_id:
+                raise AttributeError("EntryID column and an item_opener are required to open the full item.")
+            self._email_item = self._item_opener(self.entry_id)
+            self._logger.debug(f"opened full item for {self!r}")
+        return self._email_item
+
+    @property
+    def columns(self):
+        return tuple(self._values.keys())
+
+    def get(self, column: str, default=None):
+        return self._values.get(column, default)
+
+    @property
+    def entry_id(self):
+        return self._values.get('EntryID')
+
+    @property
+    def subject(self):
+        return self._values.get('Subject')
+
+    @property
+    def received_time(self):
+        return self._values.get('ReceivedTime')
+
+    @property
+    def unread(self):
+        return self._values.get('UnRead')
+
+    @property
+    def sender(self):
+        return self._values.get('SenderEmailAddress')
+
+    @property
+    def message_class(self):
+        return self._values.get('MessageClass')
+
+    def to_msg(self, **kwargs) -> Msg:
+        """ Opens the full item and wraps it in a ``Msg``. """
+        kwargs.setdefault('logger', self._logger)
+        return Msg(self(), **kwargs)
+
+    @staticmethod
+    def _read_row(row, columns: Sequence[str]):
+        return [row.Item(c) for c in columns]
+
+    @classmethod
+    def _iter_table_values(cls, table, columns: Sequence[str], batch_size: int):
+        """
+        Yields the raw values of each table row. ``Table.GetArray`` is used to pull rows in batches
+        (one cross-process call per batch); stores that do not support it fall back to ``GetNextRow``.
+        """
+        use_get_array = True
+        while not table.EndOfTable:
+            if use_get_array:
+                try:
+                    batch = table.GetArray(batch_size)
+                except (AttributeError, com_error):
+                    use_get_array = False
+                    continue
+                if not batch:
+                    break
+                for values in batch:
+                    yield values
+            else:
+                yield cls._read_row(table.GetNextRow(), columns)
+
+    @classmethod
+    def from_table(cls, table, columns: Sequence[str] = None, item_opener: Optional[Callable[[str], Any]] = None,
+                   batch_size: int = None, **kwargs) -> Iterator['MsgRow']:
+        """
+        :param table: An Outlook Table whose Columns have already been set to ``columns``.
+        :param columns: The column names, in the same order as they were added to the table.
+        :type columns: Sequence[str]
+        :param item_opener: Callable taking an EntryID and returning the full Outlook item.
+        :param batch_size: Number of rows fetched per GetArray call.
+        :type batch_size: int
+        :return: An iterator of MsgRow records.
+        :rtype: Iterator[MsgRow]
+        """
+        columns = tuple(columns or cls.DEFAULT_COLUMNS)
+        batch_size = batch_size or cls.DEFAULT_BATCH_SIZE
+        for values in cls._iter_table_values(table, columns, batch_size):
+            yield cls(dict(zip(columns, values)), item_opener=item_opener, **kwargs)
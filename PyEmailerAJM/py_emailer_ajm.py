@@ -8,7 +8,7 @@ install win32 with pip install pywin32
 from os import environ, getenv
 from os.path import isfile, join, isdir
 from tempfile import gettempdir
-from typing import Optional
+from typing import Optional, List, Sequence, Iterator
 
 # install win32 with pip install pywin32
 import win32com.client as win32
@@ -17,16 +17,16 @@ import win32com.client as win32
 # noinspection PyUnresolvedReferences
 from pythoncom import com_error
 from logging import Logger, StreamHandler
-from email_validator import validate_email, EmailNotValidError
-import questionary
-# this is usually thrown when questionary is used in the dev/Non Win32 environment
-# noinspection PyProtectedMember
-from prompt_toolkit.output.win32 import NoConsoleScreenBufferError
+# email_validator, questionary and prompt_toolkit are imported where they are used,
+# they are slow to import and most scripts never prompt
 
 from PyEmailerAJM import (EmailerNotSetupError, DisplayManualQuit,
                           deprecated,
                           Msg, FailedMsg)
+from PyEmailerAJM.msg import MsgRow
 from PyEmailerAJM.backend import BasicEmailFolderChoices, PyEmailerLogger
+from PyEmailerAJM.backend.session_registry import SessionRegistry, OutlookSession
+from PyEmailerAJM.backend.folder_resolver import FolderResolver
 from PyEmailerAJM.searchers import SearcherFactory
 
 
@@ -36,30 +36,111 @@ class EmailerInitializer:
         email application and namespace. The class uses COM (Component Object Model) to interact with
         the email application and provides mechanisms for logging and email management.
 
+        The email application, namespace and draft email item are created on first use
+        (see initialize_email_item_app_and_namespace); call warm_up() to create them right away.
+        If share_session is True, the application/namespace and the default PyEmailerLogger come
+        from a SessionRegistry (kwarg 'session_registry', SessionRegistry.default() otherwise) and are
+        shared with every other emailer in the thread/process; close() gives them back. share_logger
+        (defaults to share_session) decides for the logger alone.
+
         Attributes:
             DEFAULT_EMAIL_APP_NAME (str): Default application name for email, set to 'outlook.application'.
             DEFAULT_NAMESPACE_NAME (str): Default namespace name for the email application, set to 'MAPI'.
+            DEFAULT_SHARE_SESSION (bool): Default for the share_session kwarg.
     """
     DEFAULT_EMAIL_APP_NAME = 'outlook.application'
     DEFAULT_NAMESPACE_NAME = 'MAPI'
+    DEFAULT_SHARE_SESSION = False
 
     def __init__(self, display_window: bool,
                  send_emails: bool, logger: Logger = None,
                  auto_send: bool = False,
                  email_app_name: str = DEFAULT_EMAIL_APP_NAME,
                  namespace_name: str = DEFAULT_NAMESPACE_NAME, **kwargs):
+        self.share_session = kwargs.get('share_session', self.__class__.DEFAULT_SHARE_SESSION)
+        # SessionRegistry.default() is only looked up (and created) when something is shared
+        self._session_registry: Optional[SessionRegistry] = kwargs.get('session_registry', None)
+        self._session: Optional[OutlookSession] = None
+        self._shared_logger = None
         self.logger, self.logger_class = self.initialize_emailer_logger(logger, **kwargs)
         # print("Dummy logger in use!")
 
         self.email_app_name = email_app_name
         self.namespace_name = namespace_name
 
-        self.email_app, self.namespace, self.email = self.initialize_email_item_app_and_namespace()
+        # created on first use, see _initialize_com
+        self._com_initialized = False
+        self._email_app = None
+        self._namespace = None
+        self._email = None
 
         self.display_window = display_window
         self.auto_send = auto_send
         self.send_emails = send_emails
 
+    @property
+    def session_registry(self) -> SessionRegistry:
+        if self._session_registry is None:
+            self._session_registry = SessionRegistry.default()
+        return self._session_registry
+
+    @session_registry.setter
+    def session_registry(self, value: Optional[SessionRegistry]):
+        self._session_registry = value
+
+    def _initialize_com(self):
+        # set first: initialize_email_item_app_and_namespace reads and sets these attributes itself
+        self._com_initialized = True
+        try:
+            self._email_app, self._namespace, self._email = self.initialize_email_item_app_and_namespace()
+        except BaseException:
+            self._com_initialized = False
+            raise
+
+    @property
+    def email_app(self):
+        if not self._com_initialized:
+            self._initialize_com()
+        return self._email_app
+
+    @email_app.setter
+    def email_app(self, value):
+        self._com_initialized = True
+        self._email_app = value
+
+    @property
+    def namespace(self):
+        if not self._com_initialized:
+            self._initialize_com()
+        return self._namespace
+
+    @namespace.setter
+    def namespace(self, value):
+        self._com_initialized = True
+        self._namespace = value
+
+    @property
+    def email(self):
+        if not self._com_initialized:
+            self._initialize_com()
+        return self._email
+
+    @email.setter
+    def email(self, value):
+        self._com_initialized = True
+        self._email = value
+
+    def warm_up(self):
+        """
+        Creates everything that is otherwise created on first use (for services that would rather
+        pay the startup cost up front).
+
+        :return: self
+        """
+        if not self._com_initialized:
+            self._initialize_com()
+        return self
+
     def initialize_emailer_logger(self, logger: Logger = None, **kwargs):
         if logger:
             # If a real logger instance was provided (has .info), use it directly
@@ -75,11 +156,31 @@ class EmailerInitializer:
                 self.logger = logger
                 # Derive a class reference best-effort
                 self.logger_class = getattr(logger, '__class__', type(logger))
+        elif kwargs.get('share_logger', self.share_session):
+            self.logger_class = self._shared_logger = self.session_registry.acquire_logger(**kwargs)
+            self.logger = self.logger_class()
         else:
             self.logger_class = PyEmailerLogger(**kwargs)
             self.logger = self.logger_class()
         return self.logger, self.logger_class
 
+    def close(self) -> None:
+        """
+        Gives the shared session and logger back to the session registry; the next use of
+        email_app/namespace/email starts (or joins) a session again.
+
+        :return: None
+        :rtype: None
+        """
+        if self._session is not None:
+            self.session_registry.release_session(self._session)
+            self._session = None
+            self._com_initialized = False
+            self._email_app = self._namespace = self._email = None
+        if self._shared_logger is not None:
+            self.session_registry.release_logger(self._shared_logger)
+            self._shared_logger = None
+
     def initialize_new_email(self):
         if hasattr(self, 'email_app') and self.email_app is not None:
             self.email = Msg(self.email_app.CreateItem(0), logger=self.logger)
@@ -96,6 +197,14 @@ class EmailerInitializer:
         return email_app, namespace, email
 
     def _setup_email_app_and_namespace(self):
+        if self.share_session:
+            if self._session is None:
+                self._session = self.session_registry.acquire_session(self.email_app_name, self.namespace_name)
+            self.email_app, self.namespace = self._session.email_app, self._session.namespace
+            self.logger.debug(f"{self.email_app_name} app and {self.namespace_name} namespace "
+                              f"shared through {self._session}.")
+            return self.email_app, self.namespace
+
         self.email_app = win32.Dispatch(self.email_app_name)
 
         self.logger.debug(f"{self.email_app_name} app in use.")
@@ -123,14 +232,19 @@ class PyEmailer(EmailerInitializer):
 
     Methods:
     - `__init__`: Initializes an instance of the `PyEmailer` class with specified settings and optional arguments.
+    - `warm_up`: Creates the email application, namespace, draft email and searcher now instead of on first use.
     - `current_user_email`: Getter and setter for retrieving or setting the current user's email address.
     - `email_signature`: Property that retrieves the email signature from a specified signature file.
     - `send_success`: Getter and setter to track the send status of an email.
     - `_display_tracking_warning_confirm`: Handles display and confirmation of email tracking warnings interactively.
     - `display_tracker_check`: Prompts the user to confirm understanding of the email tracking warning; raises an exception if canceled.
+    - `folder_resolver`: The FolderResolver that caches the folder handles used by `_GetReadFolder` (kwarg 'folder_resolver').
     - `_get_default_folder_for_email_dir`: Retrieves the default folder for a specified email directory index.
-    - `_GetReadFolder`: Helper method that retrieves the specified email folder or default folder, along with an optional subfolder.
+    - `_GetReadFolder`: Helper method that retrieves the specified email folder or default folder, along with an optional subfolder,
+      or the folder at a path such as "Shared Mailbox/Inbox/Alerts".
     - `GetMessages`: Retrieves messages from a specified folder or the currently set folder.
+    - `iter_messages`: Same as `GetMessages`, but yields the messages one at a time (GetFirst/GetNext cursor).
+    - `GetMessageRows`: Bulk-fetches only the requested columns of a folder as lightweight `MsgRow` records.
     - `GetEmailMessageBody`: Deprecated method to retrieve the body of an email message; use the `Msg` class's `body` attribute instead.
     - `FindMsgBySubject`: Deprecated method to search for messages by subject; use `find_messages_by_subject`.
     - `SaveAllEmailAttachments`: Saves all attachments of a specified email to a given directory path.
@@ -149,6 +263,7 @@ class PyEmailer(EmailerInitializer):
     FAILED_SEND_LOGGER_STRING = "{num} confirmed failed send(s) found in the last {recent_days_cap} day(s)."
 
     DEFAULT_TEMP_SAVE_PATH = gettempdir()
+    DEFAULT_TABLE_COLUMNS = MsgRow.DEFAULT_COLUMNS
     VALID_EMAIL_FOLDER_CHOICES = [x for x in BasicEmailFolderChoices]
 
     # TODO: validate this works
@@ -170,11 +285,42 @@ class PyEmailer(EmailerInitializer):
         self._email_signature = None
         self._send_success = False
         self.email_sig_filename = email_sig_filename
-        self.searcher = SearcherFactory().get_searcher(search_type=kwargs.pop('search_type', 'subject'),
-                                                       get_messages=kwargs.pop('get_messages', self.GetMessages),
-                                                       logger=self.logger,
-                                                       **kwargs)
-        self.logger.info(f"searcher {self.searcher.__class__.__name__} initialized.")
+        # the searcher is created on first use
+        self._searcher = None
+        self._searcher_kwargs = kwargs
+        self.folder_resolver: FolderResolver = (kwargs.get('folder_resolver', None)
+                                                or FolderResolver(lambda: self.namespace, logger=self.logger))
+
+    @property
+    def searcher(self):
+        if self._searcher is None:
+            kwargs = dict(self._searcher_kwargs)
+            if 'get_messages' not in kwargs:
+                kwargs.setdefault('iter_messages', self.iter_messages)
+                kwargs.setdefault('get_folder', self._set_read_folder)
+            self._searcher = SearcherFactory().get_searcher(search_type=kwargs.pop('search_type', 'subject'),
+                                                            get_messages=kwargs.pop('get_messages', self.GetMessages),
+                                                            logger=self.logger,
+                                                            **kwargs)
+            self.logger.info(f"searcher {self._searcher.__class__.__name__} initialized.")
+        return self._searcher
+
+    @searcher.setter
+    def searcher(self, value):
+        self._searcher = value
+
+    def warm_up(self):
+        super().warm_up()
+        _ = self.searcher
+        return self
+
+    def close(self) -> None:
+        if self._searcher is not None:
+            self._searcher.close()
+            self._searcher = None
+        # the cached folder handles belong to the session that is given back
+        self.folder_resolver.invalidate()
+        super().close()
 
     @property
     def current_session_exchange_user_email(self):
@@ -192,6 +338,7 @@ class PyEmailer(EmailerInitializer):
 
     @current_user_email.setter
     def current_user_email(self, value):
+        from email_validator import validate_email, EmailNotValidError
         try:
             if validate_email(value, check_deliverability=False):
                 self._current_user_email = value
@@ -264,6 +411,7 @@ class PyEmailer(EmailerInitializer):
         self._send_success = value
 
     def _display_tracking_warning_confirm(self):
+        import questionary
         # noinspection PyBroadException
         try:
             q = questionary.confirm(f"{self.DisplayEmailSendTrackingWarning}. Do you understand?",
@@ -300,7 +448,7 @@ class PyEmailer(EmailerInitializer):
     def _get_default_folder_for_email_dir(self, email_dir_index: int = None, **kwargs):
         # 6 = inbox
         if email_dir_index in self.__class__.VALID_EMAIL_FOLDER_CHOICES:
-            self.read_folder = self.namespace.GetDefaultFolder(email_dir_index)
+            self.read_folder = self.folder_resolver.default_folder(email_dir_index)
             return self.read_folder
         else:
             try:
@@ -311,7 +459,11 @@ class PyEmailer(EmailerInitializer):
 
     def _GetReadFolder(self, email_dir_index: int = None, **kwargs):
         """
+        Folders are resolved through folder_resolver, so repeated calls reuse the cached handle.
+
         :param email_dir_index: Specifies the email directory index to be accessed. Defaults to None.
+            A string containing '/' or '\\' is taken as a full folder path (e.g. "Shared Mailbox/Inbox/Alerts")
+            and subfolder_name is not appended to it.
         :type email_dir_index: int, optional
         :param kwargs: Additional optional arguments that may be passed. Can include `subfolder_name` to specify a subfolder name, defaulting to 'Inbox'.
         :type kwargs: dict
@@ -325,16 +477,20 @@ class PyEmailer(EmailerInitializer):
         if not email_dir_index:
             email_dir_index = BasicEmailFolderChoices.INBOX
             self.logger.debug(f"email_dir_index not specified, defaulting to '{email_dir_index}' folder.")
+        if self.folder_resolver.is_path(email_dir_index):
+            self.logger.debug(f"email_dir_index is a folder path, using {email_dir_index} folder.")
+            return self.folder_resolver.resolve_path(email_dir_index)
         if not isinstance(email_dir_index, int):
             self.logger.debug(f"email_dir_index is not an int, "
                               f"defaulting to {email_dir_index} folder and {subfolder_name} subfolder.")
-            return self.namespace.Folders[email_dir_index].Folders[subfolder_name]
+            return self.folder_resolver.resolve_path((email_dir_index, subfolder_name))
 
         else:
             return self._get_default_folder_for_email_dir(email_dir_index)
 
-    def GetMessages(self, folder_index=None):
-        if isinstance(folder_index, int):
+    def _set_read_folder(self, folder_index=None):
+        # a str is a folder path, see _GetReadFolder
+        if isinstance(folder_index, (int, str)):
             self.read_folder = self._GetReadFolder(folder_index)
         elif not folder_index and self.read_folder:
             pass
@@ -342,12 +498,133 @@ class PyEmailer(EmailerInitializer):
             self.read_folder = self._GetReadFolder()
         else:
             try:
-                raise TypeError("folder_index must be an integer or self.read_folder must be defined")
+                raise TypeError("folder_index must be an integer or a folder path, or self.read_folder must be defined")
             except TypeError as e:
                 self.logger.error(e, exc_info=True)
                 raise e
+        return self.read_folder
+
+    def _get_folder_items(self, folder, item_filter: Optional[str] = None):
+        """
+        :param folder: The folder to get the Items of.
+        :param item_filter: Optional Items.Restrict filter. If the store rejects it,
+            all Items are returned (callers must still do their own checks).
+        :type item_filter: str, optional
+        :return: The (possibly restricted) Items collection of the folder.
+        """
+        items = folder.Items
+        if item_filter:
+            try:
+                items = items.Restrict(item_filter)
+                self.logger.debug(f"Items restricted with filter: {item_filter}")
+            except com_error as e:
+                self.logger.warning(f"Restrict failed ({e}), returning all items.")
+        return items
+
+    def GetMessages(self, folder_index=None, bulk_mode: bool = False, item_filter: Optional[str] = None, **kwargs):
+        """
+        :param folder_index: Index of the folder from which messages are retrieved, or a folder path (see _GetReadFolder).
+        :type folder_index: int, optional
+        :param bulk_mode: If True, return lightweight MsgRow records fetched through GetMessageRows
+            instead of wrapping every item in a Msg.
+        :type bulk_mode: bool
+        :param item_filter: Optional Items.Restrict filter so only matching items cross the COM boundary.
+            All items are returned if the store rejects the filter.
+        :type item_filter: str, optional
+        :param kwargs: Passed on to GetMessageRows when bulk_mode is True (columns, table_filter, batch_size).
+        :return: A list of Msg objects (or MsgRow records in bulk_mode).
+        :rtype: list
+        """
+        if bulk_mode:
+            return self.GetMessageRows(folder_index, **kwargs)
+        self._set_read_folder(folder_index)
+        item_opener = self._get_item_opener(self.read_folder)
         # noinspection PyUnresolvedReferences
-        return [Msg(m, logger=self.logger) for m in self.read_folder.Items]
+        return [Msg(m, logger=self.logger, item_opener=item_opener)
+                for m in self._get_folder_items(self.read_folder, item_filter)]
+
+    @staticmethod
+    def _iter_items(items):
+        """
+        Walks an Items collection with GetFirst/GetNext, so only the current item is held.
+        The cursor belongs to the collection, so every walk needs its own folder.Items.
+        """
+        get_first = getattr(items, 'GetFirst', None)
+        if get_first is None:
+            yield from items
+            return
+        item = get_first()
+        while item is not None:
+            yield item
+            item = items.GetNext()
+
+    def iter_messages(self, folder_index=None, item_filter: Optional[str] = None, **kwargs) -> Iterator[Msg]:
+        """
+        Streaming version of GetMessages: the folder's items are walked with a GetFirst/GetNext cursor
+        and each one is yielded as a Msg as soon as it is read, so the caller can stop early and never
+        holds the whole folder.
+
+        :param folder_index: Index of the folder from which messages are retrieved, or a folder path (see _GetReadFolder).
+        :type folder_index: int, optional
+        :param item_filter: Optional Items.Restrict filter so only matching items cross the COM boundary.
+            All items are returned if the store rejects the filter.
+        :type item_filter: str, optional
+        :return: An iterator of Msg objects.
+        :rtype: Iterator[Msg]
+        """
+        self._set_read_folder(folder_index)
+        folder = self.read_folder
+        item_opener = self._get_item_opener(folder)
+        for item in self._iter_items(self._get_folder_items(folder, item_filter)):
+            yield Msg(item, logger=self.logger, item_opener=item_opener)
+
+    def _open_item_by_entry_id(self, entry_id: str, store_id: Optional[str] = None):
+        if store_id:
+            return self.namespace.GetItemFromID(entry_id, store_id)
+        return self.namespace.GetItemFromID(entry_id)
+
+    def _get_item_opener(self, folder):
+        """ Returns a callable that re-opens an item of ``folder`` by its EntryID. """
+        store_id = getattr(folder, 'StoreID', None)
+        return lambda entry_id: self._open_item_by_entry_id(entry_id, store_id)
+
+    @staticmethod
+    def _get_folder_table(folder, columns: Sequence[str], table_filter: Optional[str] = None):
+        table = folder.GetTable(table_filter) if table_filter else folder.GetTable()
+        table.Columns.RemoveAll()
+        for column in columns:
+            table.Columns.Add(column)
+        return table
+
+    def GetMessageRows(self, folder_index=None, columns: Optional[Sequence[str]] = None,
+                       table_filter: Optional[str] = None, **kwargs) -> List[MsgRow]:
+        """
+        Bulk-fetches the given columns of every item in the read folder through Folder.GetTable(),
+        so that reading subject/received time/sender etc. does not cost a COM round trip per item.
+        The full item is only opened when a returned row is called (row()).
+
+        :param folder_index: Index of the folder from which messages are retrieved, or a folder path (see _GetReadFolder).
+        :type folder_index: int, optional
+        :param columns: The columns to fetch. Defaults to DEFAULT_TABLE_COLUMNS. EntryID is always added.
+        :type columns: Sequence[str], optional
+        :param table_filter: Optional filter passed to Folder.GetTable().
+        :type table_filter: str, optional
+        :return: A list of MsgRow records.
+        :rtype: List[MsgRow]
+        """
+        self._set_read_folder(folder_index)
+        columns = list(columns or self.__class__.DEFAULT_TABLE_COLUMNS)
+        if 'EntryID' not in columns:
+            columns.insert(0, 'EntryID')
+
+        item_opener = self._get_item_opener(self.read_folder)
+        table = self._get_folder_table(self.read_folder, columns, table_filter)
+        rows = list(MsgRow.from_table(table, columns,
+                                      item_opener=item_opener,
+                                      batch_size=kwargs.get('batch_size', None),
+                                      logger=self.logger))
+        self.logger.debug(f"{len(rows)} rows fetched in bulk with columns {columns}")
+        return rows
 
     @deprecated("use Msg classes body attribute instead")
     def GetEmailMessageBody(self, msg):
@@ -389,6 +666,10 @@ class PyEmailer(EmailerInitializer):
         return self.email
 
     def _manual_send_loop(self):
+        import questionary
+        # this is usually thrown when questionary is used in the dev/Non Win32 environment
+        # noinspection PyProtectedMember
+        from prompt_toolkit.output.win32 import NoConsoleScreenBufferError
         try:
             send = questionary.confirm("Send Mail?:", default=False).ask()
             if send:
@@ -22,10 +22,15 @@ OUTLOOK_ATSQL_ALIASES: Tuple[str, ...] = (
 )
 
 
-from PyEmailerAJM.searchers.searchers import BaseSearcher, SubjectSearcher, AttributeSearcher
+from PyEmailerAJM.searchers.searchers import (BaseSearcher, SubjectSearcher, AttributeSearcher,
+                                              OUTLOOK_ALIAS_TYPES, OUTLOOK_DASL_NAMES)
+from PyEmailerAJM.searchers.query import Q, CompiledQuery, QuerySearcher, compile_query
+from PyEmailerAJM.searchers.multi_field import FieldMatch, MultiFieldSearcher
+from PyEmailerAJM.searchers.mail_index import IndexHit, IndexSearcher, IndexUpdate, MailIndex
 from PyEmailerAJM.searchers.factory import SearcherFactory
 
 
 __all__ = ['BaseSearcher', 'AttributeSearcher',
-           'SubjectSearcher', 'SearcherFactory',
-           'OUTLOOK_ATSQL_ALIASES']
\ No newline at end of file
+           'SubjectSearcher', 'SearcherFactory', 'Q', 'CompiledQuery', 'QuerySearcher', 'compile_query',
+           'FieldMatch', 'MultiFieldSearcher', 'IndexHit', 'IndexSearcher', 'IndexUpdate', 'MailIndex',
+           'OUTLOOK_ATSQL_ALIASES', 'OUTLOOK_ALIAS_TYPES', 'OUTLOOK_DASL_NAMES']
\ No newline at end of file
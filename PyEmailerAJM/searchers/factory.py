@@ -2,6 +2,7 @@ from collections.abc import Callable
 from typing import Type, Tuple, Optional
 
 from . import BaseSearcher, AttributeSearcher, OUTLOOK_ATSQL_ALIASES
+from .query import Q, CompiledQuery, compile_query
 
 
 # noinspection PyProtectedMember
@@ -13,6 +14,15 @@ class SearcherFactory:
         """All registered specialized search types (from subclasses that set SEARCH_TYPE)."""
         return tuple(sorted(BaseSearcher._REGISTRY.keys()))
 
+    @staticmethod
+    def compile_query(query: Q) -> CompiledQuery:
+        """
+        Compiles a Q query to its @SQL Restrict filter and Python predicate (cached per query shape),
+        e.g. to filter Items yourself or to test messages from an offline source.
+        Use get_searcher('query') to search with it.
+        """
+        return compile_query(query)
+
     @staticmethod
     def get_searcher(search_type: str, *, attribute: Optional[str] = None, **kwargs) -> BaseSearcher:
         """
@@ -31,6 +41,12 @@ class SearcherFactory:
         py_emailer: Callable | object | None = kwargs.pop('py_emailer', None)
         if py_emailer is not None and 'get_messages' not in kwargs:
             kwargs['get_messages'] = py_emailer.GetMessages
+            if hasattr(py_emailer, 'iter_messages'):
+                kwargs.setdefault('iter_messages', py_emailer.iter_messages)
+            if hasattr(py_emailer, '_set_read_folder'):
+                kwargs.setdefault('get_folder', py_emailer._set_read_folder)
+            if hasattr(py_emailer, '_open_item_by_entry_id'):
+                kwargs.setdefault('get_item', py_emailer._open_item_by_entry_id)
 
         key = (search_type or '').lower().strip()
         # 1) Registered specialized searchers
@@ -0,0 +1,390 @@
+"""
+Local full-text index of a mailbox in a SQLite FTS5 table, so text searches (body included) are answered in
+milliseconds instead of pulling every body across COM.
+
+    index = MailIndex('C:/Users/me/AppData/Local/PyEmailerAJM/mail_index.sqlite3')   # no default location
+    index.update(folder)                      # first call indexes everything, later calls only what changed
+    index.search('quarterly report')          # [IndexHit(entry_id=..., store_id=..., score=...), ...] best first
+
+    searcher = SearcherFactory.get_searcher('index', py_emailer=emailer, mail_index=index)
+    searcher.find_messages_by_attribute('quarterly report')   # the Outlook items, best match first
+
+Uses only the standard library sqlite3 module; FTS5 is compiled into the SQLite of the usual Python builds.
+"""
+import re
+from datetime import datetime
+from logging import Logger, getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+from PyEmailerAJM.backend import folder_key
+from PyEmailerAJM.searchers.searchers import BaseSearcher, CDispatch, SubjectSearcher
+
+if TYPE_CHECKING:
+    import sqlite3
+
+_DEFAULT_LIMIT = object()
+
+
+class IndexHit(NamedTuple):
+    """
+    Attributes:
+        entry_id (str): EntryID of the item.
+        store_id (Optional[str]): StoreID of the item's store, for namespace.GetItemFromID.
+        score (float): BM25 rank, lower is better (SQLite's convention).
+        subject (str): The normalized subject stored in the index.
+    """
+    entry_id: str
+    store_id: Optional[str]
+    score: float
+    subject: str
+
+
+class IndexUpdate(NamedTuple):
+    """
+    The result of a MailIndex.update() call.
+
+    Attributes:
+        indexed (int): Items added to or refreshed in the index.
+        removed (int): Items dropped because they are no longer in the folder.
+    """
+    indexed: int
+    removed: int
+
+    def __str__(self):
+        return f"{self.indexed} indexed, {self.removed} removed"
+
+
+class MailIndex:
+    """
+    Full-text index of Outlook items: EntryID, normalized subject, plain-text body, sender and dates,
+    searched with FTS5 and ranked with BM25.
+
+    Updates are incremental in the same way as FolderSync: the first update of a folder reads every item,
+    later ones only restrict the folder to the items modified since its watermark (the newest
+    LastModificationTime indexed) and skip the ones whose LastModificationTime did not change.
+    Removed items are found by comparing Items.Count to the number of indexed items of the folder.
+
+    Attributes:
+        DEFAULT_LIMIT (int): The number of hits search returns unless told otherwise.
+        BM25_WEIGHTS (tuple): Weights of the subject, body and sender columns in the ranking.
+        RESTRICT_DATE_FORMAT (str): Date format used in the Items.Restrict watermark filter.
+        WATERMARK_FILTER (str): The Items.Restrict filter used for incremental updates.
+            Restrict only has minute granularity, so >= is used and unchanged items are skipped.
+    """
+    BM25_WEIGHTS = (5.0, 1.0, 3.0)
+    DEFAULT_LIMIT = 50
+    RESTRICT_DATE_FORMAT = '%m/%d/%Y %I:%M %p'
+    WATERMARK_FILTER = "[LastModificationTime] >= '{watermark}'"
+
+    _SCHEMA = ("CREATE TABLE IF NOT EXISTS messages ("
+               "id INTEGER PRIMARY KEY, "
+               "entry_id TEXT NOT NULL UNIQUE, "
+               "store_id TEXT, "
+               "folder_key TEXT NOT NULL, "
+               "modified TEXT, "
+               "received TEXT, "
+               "sent TEXT)",
+               "CREATE INDEX IF NOT EXISTS messages_folder_key ON messages (folder_key)",
+               "CREATE TABLE IF NOT EXISTS folders ("
+               "folder_key TEXT PRIMARY KEY, "
+               "watermark TEXT)",
+               "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+               "subject, body, sender, tokenize='unicode61 remove_diacritics 2')")
+
+    def __init__(self, db_path: Union[str, Path], **kwargs):
+        """
+        :param db_path: The database file (':memory:' for a throwaway index). There is no default, the index
+            holds the text of the mailbox and must not end up in whatever the working directory is.
+        :type db_path: Union[str, Path]
+        """
+        self.logger: Logger = kwargs.get('logger', None) or getLogger(__name__)
+        if not db_path:
+            raise ValueError("MailIndex needs a db_path")
+        self.db_path = str(db_path)
+        self.connection = self._connect()
+
+    def _connect(self) -> 'sqlite3.Connection':
+        # imported here so importing the searchers does not load sqlite3
+        import sqlite3
+        connection = sqlite3.connect(self.db_path)
+        if self.db_path != ':memory:':
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with connection:
+                for statement in self.__class__._SCHEMA:
+                    connection.execute(statement)
+        except sqlite3.OperationalError as e:
+            connection.close()
+            raise RuntimeError(f"the SQLite library of this Python ({sqlite3.sqlite_version}) "
+                               f"has no FTS5 support: {e}") from e
+        self.logger.info(f"mail index opened at {self.db_path}")
+        return connection
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    # ---- normalization ----
+
+    @staticmethod
+    def normalize_subject(subject) -> str:
+        """ The subject lowercased and stripped of any leading FW:/FWD:/RE: prefixes. """
+        subject = str(subject or '').lower().strip()
+        prefixes = tuple(p.lower() for p in SubjectSearcher.FW_PREFIXES + [SubjectSearcher.RE_PREFIX])
+        while subject.startswith(prefixes):
+            subject = subject.split(':', 1)[1].strip()
+        return subject
+
+    @staticmethod
+    def normalize_text(text) -> str:
+        return ' '.join(str(text or '').split())
+
+    @staticmethod
+    def _date_text(value) -> Optional[str]:
+        return value.isoformat() if isinstance(value, datetime) else (str(value) if value is not None else None)
+
+    @staticmethod
+    def folder_key(folder) -> str:
+        # backend.folder_key as text, to be stored in the database
+        return '|'.join(str(part) for part in folder_key(folder))
+
+    # ---- updates ----
+
+    # noinspection PyBroadException
+    def _restrict_to_watermark(self, items, watermark: datetime):
+        sql = self.__class__.WATERMARK_FILTER.format(
+            watermark=watermark.strftime(self.__class__.RESTRICT_DATE_FORMAT))
+        try:
+            restricted = items.Restrict(sql)
+            self.logger.debug(f"incremental index filter: {sql}")
+            return restricted
+        except Exception as e:
+            self.logger.warning(f"Restrict failed ({e}), indexing the whole folder.")
+            return None
+
+    def _watermark(self, key: str) -> Optional[datetime]:
+        row = self.connection.execute("SELECT watermark FROM folders WHERE folder_key = ?", (key,)).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def _index_item(self, item, entry_id: str, key: str, store_id: Optional[str], known: dict) -> Optional[datetime]:
+        """ Indexes item unless it is unchanged; returns its LastModificationTime if it was (re)indexed. """
+        modified = item.LastModificationTime
+        previous = known.get(entry_id)
+        if previous is None:
+            # an item moved in from another indexed folder keeps its row
+            previous = self.connection.execute("SELECT id, modified FROM messages WHERE entry_id = ?",
+                                               (entry_id,)).fetchone()
+        elif previous[1] == self._date_text(modified):
+            return None
+        sender = ' '.join(x for x in (getattr(item, 'SenderName', ''), getattr(item, 'SenderEmailAddress', '')) if x)
+        values = (entry_id, store_id, key, self._date_text(modified),
+                  self._date_text(getattr(item, 'ReceivedTime', None)), self._date_text(getattr(item, 'SentOn', None)))
+        if previous is None:
+            rowid = self.connection.execute("INSERT INTO messages (entry_id, store_id, folder_key, modified, received, "
+                                            "sent) VALUES (?, ?, ?, ?, ?, ?)", values).lastrowid
+        else:
+            rowid = previous[0]
+            self.connection.execute("UPDATE messages SET entry_id = ?, store_id = ?, folder_key = ?, modified = ?, "
+                                    "received = ?, sent = ? WHERE id = ?", values + (rowid,))
+            self.connection.execute("DELETE FROM messages_fts WHERE rowid = ?", (rowid,))
+        self.connection.execute("INSERT INTO messages_fts (rowid, subject, body, sender) VALUES (?, ?, ?, ?)",
+                                (rowid, self.normalize_subject(getattr(item, 'Subject', '')),
+                                 self.normalize_text(getattr(item, 'Body', '')), self.normalize_text(sender)))
+        known[entry_id] = (rowid, self._date_text(modified))
+        return modified
+
+    def _remove(self, entry_ids: Iterable[str]) -> int:
+        removed = 0
+        for entry_id in entry_ids:
+            row = self.connection.execute("SELECT id FROM messages WHERE entry_id = ?", (entry_id,)).fetchone()
+            if row:
+                self.connection.execute("DELETE FROM messages_fts WHERE rowid = ?", (row[0],))
+                self.connection.execute("DELETE FROM messages WHERE id = ?", (row[0],))
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _iter_items(items):
+        # the GetFirst/GetNext cursor avoids indexing into the collection
+        if hasattr(items, 'GetFirst'):
+            item = items.GetFirst()
+            while item is not None:
+                yield item
+                item = items.GetNext()
+        else:
+            yield from items
+
+    def update(self, folder) -> IndexUpdate:
+        """
+        Brings the index of ``folder`` up to date, in a single transaction.
+
+        :param folder: An Outlook folder.
+        :return: How many items were (re)indexed and removed.
+        :rtype: IndexUpdate
+        """
+        key = self.folder_key(folder)
+        store_id = getattr(folder, 'StoreID', None)
+        known = {entry_id: (rowid, modified) for rowid, entry_id, modified in self.connection.execute(
+            "SELECT id, entry_id, modified FROM messages WHERE folder_key = ?", (key,))}
+        watermark = self._watermark(key)
+        items = self._restrict_to_watermark(folder.Items, watermark) if watermark is not None else None
+        full_scan = items is None
+
+        indexed, seen_ids = 0, set()
+        with self.connection:
+            for item in self._iter_items(folder.Items if full_scan else items):
+                entry_id = item.EntryID
+                seen_ids.add(entry_id)
+                modified = self._index_item(item, entry_id, key, store_id, known)
+                if modified is not None:
+                    indexed += 1
+                    if watermark is None or modified > watermark:
+                        watermark = modified
+            if full_scan:
+                stale = [x for x in known if x not in seen_ids]
+            elif folder.Items.Count != len(known):
+                current_ids = {item.EntryID for item in self._iter_items(folder.Items)}
+                stale = [x for x in known if x not in current_ids]
+            else:
+                stale = []
+            removed = self._remove(stale)
+            self.connection.execute("INSERT INTO folders (folder_key, watermark) VALUES (?, ?) "
+                                    "ON CONFLICT(folder_key) DO UPDATE SET watermark = excluded.watermark",
+                                    (key, self._date_text(watermark)))
+        result = IndexUpdate(indexed, removed)
+        self.logger.info(f"mail index update complete: {result} ({len(known) - removed} indexed in folder)")
+        return result
+
+    def remove(self, entry_ids: Iterable[str]) -> int:
+        """ Drops the given items (e.g. ones that could not be opened any more) from the index. """
+        with self.connection:
+            return self._remove(entry_ids)
+
+    # ---- searches ----
+
+    @classmethod
+    def match_query(cls, search_str: str, prefix: bool = False, columns: Optional[Sequence[str]] = None) -> str:
+        """
+        :param search_str: Plain text; every word has to appear (in any order).
+        :param prefix: Match words that start with the given ones.
+        :param columns: Only search these of subject, body and sender.
+        :return: An FTS5 MATCH expression for search_str, with FTS5's own syntax quoted away.
+        :raises ValueError: If search_str has no words.
+        """
+        words = re.findall(r'\w+', str(search_str).lower())
+        if not words:
+            raise ValueError(f"nothing to search for in {search_str!r}")
+        query = ' '.join(f'"{w}"' + ('*' if prefix else '') for w in words)
+        if columns:
+            query = f"{{{' '.join(columns)}}} : ({query})"
+        return query
+
+    def search(self, search_str: str, limit: Optional[int] = _DEFAULT_LIMIT, prefix: bool = False,
+               columns: Optional[Sequence[str]] = None) -> List[IndexHit]:
+        """
+        :param search_str: The words to search for (see match_query).
+        :param limit: The maximum number of hits, DEFAULT_LIMIT if not given, None for all of them.
+        :param prefix: Match words that start with the given ones.
+        :param columns: Only search these of subject, body and sender.
+        :return: The hits, best BM25 rank first.
+        :rtype: List[IndexHit]
+        """
+        weights = ', '.join(str(float(w)) for w in self.__class__.BM25_WEIGHTS)
+        if limit is _DEFAULT_LIMIT:
+            limit = self.__class__.DEFAULT_LIMIT
+        rows = self.connection.execute(
+            f"SELECT m.entry_id, m.store_id, bm25(messages_fts, {weights}) AS score, messages_fts.subject "
+            f"FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+            f"WHERE messages_fts MATCH ? ORDER BY score LIMIT ?",
+            # a negative LIMIT is no limit in SQLite
+            (self.match_query(search_str, prefix, columns), -1 if limit is None else limit))
+        return [IndexHit(*row) for row in rows]
+
+
+class IndexSearcher(BaseSearcher):
+    """
+    Answers text searches from a MailIndex and opens the hits by EntryID, best match first.
+
+    The index is brought up to date (incrementally) with the search folder before every search when a
+    get_folder provider is available, unless update_index=False is passed. Every hit is returned unless
+    max_results is given. Hits that can no longer be opened are dropped from the index.
+
+    kwargs:
+        mail_index (MailIndex): The index to search, otherwise one is opened at index_path.
+        index_path: Database file of the index; mail_index or index_path is required.
+        get_item (Callable): entry_id, store_id -> Outlook item (e.g. py_emailer._open_item_by_entry_id).
+    """
+    SEARCH_TYPE = 'index'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mail_index: MailIndex = kwargs.get('mail_index', None)
+        # an index opened here is closed by close(), a passed in one belongs to the caller
+        self._owns_index = self.mail_index is None
+        if self.mail_index is None:
+            if not kwargs.get('index_path', None):
+                self.close()
+                raise ValueError("IndexSearcher needs a mail_index or an index_path")
+            self.mail_index = MailIndex(kwargs['index_path'], logger=self.logger)
+        self._get_item: Optional[Callable] = kwargs.get('get_item', None)
+
+    def close(self) -> None:
+        if self._owns_index and self.mail_index is not None:
+            self.mail_index.close()
+            self.mail_index = None
+        super().close()
+
+    def update_index(self) -> Optional[IndexUpdate]:
+        folder = self._get_folder() if self._get_folder is not None else None
+        if folder is None:
+            self.logger.debug("no folder provider, searching the index as it is")
+            return None
+        return self.mail_index.update(folder)
+
+    # noinspection PyBroadException
+    def _open_hits(self, hits: List[IndexHit]) -> List[CDispatch]:
+        if self._get_item is None:
+            raise NotImplementedError("No get_item provider configured. Pass get_item=... (or py_emailer=...) "
+                                      "to open the index hits.")
+        items, stale = [], []
+        for hit in hits:
+            try:
+                items.append(self._get_item(hit.entry_id, hit.store_id))
+            except Exception as e:
+                self.logger.debug(f"could not open {hit.entry_id} ({e}), dropping it from the index")
+                stale.append(hit.entry_id)
+        if stale:
+            self.mail_index.remove(stale)
+        return items
+
+    def find_hits(self, search_str: str, partial_match_ok: bool = False, **kwargs) -> List[IndexHit]:
+        """
+        :param search_str: The words to search for.
+        :param partial_match_ok: Match words that start with the given ones.
+        :param kwargs: max_results (all hits by default), columns (see MailIndex.search),
+            update_index=False skips the update.
+        :return: The ranked hits, without opening the items.
+        :rtype: List[IndexHit]
+        """
+        self.searching_string = f"Searching the mail index for \'{search_str}\'"
+        self.logger.info(self.searching_string, print_msg=True)
+        if kwargs.get('update_index', True):
+            self.update_index()
+        hits = self.mail_index.search(search_str, limit=kwargs.get('max_results', None), prefix=partial_match_ok,
+                                      columns=kwargs.get('columns', None))
+        self.logger.info(f"{len(hits)} messages found in the index!")
+        return hits
+
+    def find_messages_by_attribute(self, search_str: str, partial_match_ok: bool = False, **kwargs) -> List[CDispatch]:
+        """
+        :param search_str: The words to search for.
+        :param partial_match_ok: Match words that start with the given ones.
+        :param kwargs: see find_hits.
+        :return: The matching Outlook items, best match first.
+        :rtype: List[CDispatch]
+        """
+        return self._open_hits(self.find_hits(search_str, partial_match_ok, **kwargs))
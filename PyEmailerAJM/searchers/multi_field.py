@@ -0,0 +1,139 @@
+"""
+Searches several text fields of the messages (subject, body, sender, recipients...) for one string in a single
+pass, and reports which of the fields matched.
+
+    searcher = SearcherFactory.get_searcher('multi_field', fields={'subject': 'contains', 'sender': 'exact'})
+    for match in searcher.find_matches('project x'):
+        match.item, match.fields   # the Outlook item, ('Subject',)
+"""
+from itertools import islice
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from PyEmailerAJM.searchers.searchers import CDispatch
+from PyEmailerAJM.searchers.query import (PREDICATE_LOOKUPS, QUERY_FIELD_TYPES, Q, QuerySearcher, compile_query,
+                                          parse_lookup)
+
+
+class FieldMatch(NamedTuple):
+    """
+    Attributes:
+        item (CDispatch): The matching Outlook item.
+        fields (Tuple[str, ...]): The aliases of the fields that matched, in the searcher's field order.
+    """
+    item: Any
+    fields: Tuple[str, ...]
+
+
+class MultiFieldSearcher(QuerySearcher):
+    """
+    Matches one search string against several text fields at once.
+
+    Every field has its own match mode: 'exact', 'contains' or 'startswith' (case-insensitive, as in Q queries).
+    Each field of a message is read once per search, however many fields match. When a folder is available,
+    the OR of the fields is compiled (see query.compile_query) into one Restrict, so the store only returns the
+    items that mention the string somewhere; the fields the store can not filter on make the search scan instead.
+
+    Attributes:
+        fields (Dict[str, str]): {alias: match mode} of the fields searched.
+
+    Methods:
+        find_matches: The matching items, each with the fields that matched.
+        find_messages_by_attribute: The matching items only.
+    """
+    SEARCH_TYPE = 'multi_field'
+    MATCH_MODES = ('exact', 'contains', 'startswith')
+    DEFAULT_MATCH_MODE = 'contains'
+    DEFAULT_FIELDS: Tuple[str, ...] = ('Subject', 'Body', 'SenderName', 'To')
+
+    def __init__(self, *args, fields: Optional[Union[Dict[str, str], Iterable[str]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields = self._resolve_fields(fields if fields is not None else self.__class__.DEFAULT_FIELDS)
+
+    @classmethod
+    def _resolve_fields(cls, fields: Union[Dict[str, str], Iterable[str]]) -> Dict[str, str]:
+        """
+        :param fields: {field: match mode}, or field names that all use DEFAULT_MATCH_MODE.
+        :return: {alias: match mode}
+        :raises ValueError: If a field is unknown or not a text field, or a match mode is unknown.
+        """
+        if not isinstance(fields, dict):
+            fields = {field: cls.DEFAULT_MATCH_MODE for field in fields}
+        resolved = {}
+        for field, mode in fields.items():
+            if mode not in cls.MATCH_MODES:
+                raise ValueError(f"unknown match mode {mode!r} for {field!r}, use one of {cls.MATCH_MODES}")
+            alias, _ = parse_lookup(f"{field}__{mode}")
+            if QUERY_FIELD_TYPES[alias] is not str:
+                raise ValueError(f"{alias} is not a text field")
+            resolved[alias] = mode
+        if not resolved:
+            raise ValueError("no fields to search")
+        return resolved
+
+    def build_query(self, search_str: str, fields: Optional[Dict[str, str]] = None) -> Q:
+        """ :return: The OR of the fields' lookups of search_str, as a Q query. """
+        fields = fields or self.fields
+        return Q(*(Q(**{f"{alias}__{mode}": search_str}) for alias, mode in fields.items()), connector=Q.OR)
+
+    @staticmethod
+    def _read(item, alias: str):
+        # one COM read per field; a missing property does not match
+        try:
+            return getattr(item, alias, None)
+        except Exception:
+            return None
+
+    def _match_fields(self, item, search_str: str, fields: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(alias for alias, mode in fields.items()
+                     if PREDICATE_LOOKUPS[mode](self._read(item, alias), search_str))
+
+    def _iter_field_matches(self, items: Iterable, search_str: str, fields: Dict[str, str]):
+        for item in items:
+            matched = self._match_fields(item, search_str, fields)
+            if matched:
+                self.logger.debug(f"matched {search_str!r} in {', '.join(matched)}")
+                yield FieldMatch(item, matched)
+
+    def find_matches(self, search_str: str, fields: Optional[Union[Dict[str, str], Iterable[str]]] = None,
+                     **kwargs) -> List[FieldMatch]:
+        """
+        :param search_str: The string to look for.
+        :type search_str: str
+        :param fields: Overrides the searcher's fields for this search (same forms as the constructor's).
+        :param kwargs: no_fastpath_search=True skips the server-side filter, max_results stops the scan early.
+        :return: The matching items with the fields that matched.
+        :rtype: List[FieldMatch]
+        """
+        fields = self._resolve_fields(fields) if fields is not None else self.fields
+        self.searching_string = f"Searching for Messages with {', '.join(fields)} matching \'{search_str}\'"
+        self.logger.info(self.searching_string, print_msg=True)
+
+        items = None
+        sql = compile_query(self.build_query(search_str, fields)).sql
+        if sql and not kwargs.get('no_fastpath_search', False):
+            results = self._restrict(sql)
+            if isinstance(results, Exception):
+                self.logger.debug(f"fast path search not used ({results}), falling back to Python-side scan...")
+            else:
+                items = results
+        if items is None:
+            # a Msg wraps the Outlook item
+            items = (m() if callable(m) else m for m in self.IterMessages())
+
+        matches = list(islice(self._iter_field_matches(items, search_str, fields), kwargs.get('max_results', None)))
+        self.logger.info(f"{len(matches)} messages found!")
+        return matches
+
+    def find_messages_by_attribute(self, search_str, partial_match_ok: bool = False, **kwargs) -> List[CDispatch]:
+        """
+        :param search_str: The string to look for (a Q query is searched as QuerySearcher does).
+        :param partial_match_ok: Also match the 'exact' fields with contains.
+        :return: The matching Outlook items.
+        """
+        if isinstance(search_str, Q):
+            return super().find_messages_by_attribute(search_str, partial_match_ok, **kwargs)
+        fields = kwargs.pop('fields', None)
+        fields = self._resolve_fields(fields) if fields is not None else self.fields
+        if partial_match_ok:
+            fields = {alias: 'contains' if mode == 'exact' else mode for alias, mode in fields.items()}
+        return [match.item for match in self.find_matches(search_str, fields, **kwargs)]
@@ -0,0 +1,118 @@
+"""
+Matching one text against many patterns at once, for searches that look for a lot of
+subjects (or other strings) in a single pass over a folder.
+"""
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Iterable, List, Sequence, Set
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over a fixed set of patterns: matches(text) finds every pattern contained
+    in text in O(len(text) + number of hits), however many patterns there are.
+
+    Patterns are matched as given (normalize them and the texts the same way beforehand);
+    empty patterns never match.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        # node 0 is the root; _goto[node] maps a character to the next node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._add(pattern, index)
+        self._link()
+
+    def _add(self, pattern: str, index: int) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._out[node].append(index)
+
+    def _link(self) -> None:
+        # breadth first, so the fail node of every node is final before its children are linked;
+        # the root's children fail to the root, which is how they were created
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # a node also outputs everything its fail node outputs
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def matches(self, text: str) -> Set[int]:
+        """
+        :param text: The text to search.
+        :return: The indexes (into patterns) of the patterns contained in text.
+        :rtype: Set[int]
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class ContainedInIndex:
+    """
+    The reverse question: which patterns contain a given text. The patterns are joined into one
+    string, so each lookup is a few str.find calls (C speed) instead of one 'in' per pattern.
+    """
+    SEPARATOR = '\x00'
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._joined = self.__class__.SEPARATOR.join(self.patterns)
+        self._starts = []
+        position = 0
+        for pattern in self.patterns:
+            self._starts.append(position)
+            position += len(pattern) + 1
+        self._longest = max((len(p) for p in self.patterns), default=0)
+
+    def containing(self, text: str) -> Set[int]:
+        """
+        :param text: The text to look for.
+        :return: The indexes of the patterns that contain text (none for an empty text).
+        :rtype: Set[int]
+        """
+        found = set()
+        if not text or len(text) > self._longest or self.__class__.SEPARATOR in text:
+            return found
+        position = self._joined.find(text)
+        while position != -1:
+            index = bisect_right(self._starts, position) - 1
+            found.add(index)
+            # continue after the end of this pattern
+            position = self._joined.find(text, self._starts[index] + len(self.patterns[index]) + 1)
+        return found
+
+
+def unique_patterns(patterns: Iterable[str], normalize) -> Dict[str, List[str]]:
+    """
+    :return: {normalized pattern: the given patterns that normalize to it}, in first seen order.
+    """
+    unique: Dict[str, List[str]] = {}
+    for pattern in patterns:
+        unique.setdefault(normalize(pattern), []).append(pattern)
+    return unique
@@ -0,0 +1,422 @@
+"""
+Composable search queries compiled to an @SQL Restrict filter and to a Python predicate.
+
+    query = Q(subject__contains='report') & Q(received__gte=datetime(2025, 10, 1)) | ~Q(unread=True)
+    compiled = compile_query(query)
+    compiled.sql        # '@SQL=(... LIKE '%report%' AND ... >= '10/01/2025 ...') OR (NOT (... = 0))'
+    compiled.predicate  # item -> bool, for the fallback scan and for offline sources
+
+The @SQL filter is a pre-filter: it never drops an item the predicate would keep (date bounds are rounded
+outwards to the minute, exact and startswith text lookups become a LIKE '%value%', as the predicate ignores
+surrounding whitespace, parts the store can not evaluate are left out), and the predicate is authoritative.
+Both compilers cache their work per query shape (the fields, lookups and operators, without the values).
+"""
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from PyEmailerAJM.searchers.searchers import (BaseSearcher, FastPathSearcher, CDispatch, OUTLOOK_ALIAS_TYPES,
+                                              OUTLOOK_ATSQL_ALIASES, OUTLOOK_DASL_INVERTED_BOOLEANS,
+                                              OUTLOOK_DASL_NAMES)
+
+# field types of the aliases a query can use (OUTLOOK_ALIAS_TYPES plus the date fields)
+QUERY_FIELD_TYPES: Dict[str, type] = {**OUTLOOK_ALIAS_TYPES,
+                                      'ReceivedTime': datetime, 'SentOn': datetime, 'CreationTime': datetime,
+                                      'LastModificationTime': datetime, 'Start': datetime, 'End': datetime}
+
+# short field names, the aliases themselves (any case) work too
+QUERY_FIELD_NAMES: Dict[str, str] = {
+    'sender': 'SenderName', 'sender_name': 'SenderName', 'sender_email': 'SenderEmailAddress',
+    'sender_email_type': 'SenderEmailType', 'message_class': 'MessageClass', 'has_attachment': 'HasAttachment',
+    'conversation_topic': 'ConversationTopic', 'received': 'ReceivedTime', 'sent': 'SentOn',
+    'created': 'CreationTime', 'modified': 'LastModificationTime', 'flag_status': 'FlagStatus',
+    'flag_request': 'FlagRequest', 'meeting_status': 'MeetingStatus',
+}
+
+LOOKUPS: Dict[str, Tuple[type, ...]] = {
+    'exact': (str, int, bool, datetime),
+    'contains': (str,),
+    'startswith': (str,),
+    'gt': (int, datetime), 'gte': (int, datetime), 'lt': (int, datetime), 'lte': (int, datetime),
+    'in': (str, int, bool),
+}
+
+DASL_DATE_FORMAT = '%m/%d/%Y %I:%M %p'
+_MISSING = object()
+
+
+def resolve_field(name: str) -> str:
+    """
+    :param name: A short field name (QUERY_FIELD_NAMES) or an Outlook alias, in any case.
+    :return: The Outlook alias.
+    :raises ValueError: If the field is unknown or can not be queried.
+    """
+    alias = QUERY_FIELD_NAMES.get(name.lower()) or {a.lower(): a for a in OUTLOOK_ATSQL_ALIASES}.get(name.lower())
+    if alias is None or alias not in QUERY_FIELD_TYPES:
+        raise ValueError(f"unknown query field {name!r}")
+    return alias
+
+
+def parse_lookup(key: str) -> Tuple[str, str]:
+    """
+    :param key: A Q keyword such as 'subject__contains' (no lookup means exact).
+    :return: (alias, lookup)
+    :raises ValueError: If the field or lookup is unknown, or the lookup does not apply to the field's type.
+    """
+    field, _, lookup = key.partition('__')
+    lookup = lookup or 'exact'
+    alias = resolve_field(field)
+    if lookup not in LOOKUPS:
+        raise ValueError(f"unknown lookup {lookup!r} in {key!r}, use one of {list(LOOKUPS)}")
+    if QUERY_FIELD_TYPES[alias] not in LOOKUPS[lookup]:
+        raise ValueError(f"lookup {lookup!r} does not apply to {alias} ({QUERY_FIELD_TYPES[alias].__name__})")
+    return alias, lookup
+
+
+class Q:
+    """
+    A node of a search query: keyword lookups (field__lookup=value, AND-ed together) or other Q objects
+    combined with & (AND), | (OR) and ~ (NOT).
+
+    Fields are Outlook aliases or their short names (QUERY_FIELD_NAMES); lookups are exact (the default),
+    contains, startswith, gt, gte, lt, lte and in. Text comparisons are case-insensitive.
+    """
+    AND = 'AND'
+    OR = 'OR'
+
+    def __init__(self, *children: 'Q', connector: str = AND, negated: bool = False, **lookups):
+        self.children: List[Any] = list(children) + sorted(lookups.items())
+        self.connector = connector
+        self.negated = negated
+
+    def _combine(self, other: 'Q', connector: str) -> 'Q':
+        if not isinstance(other, Q):
+            return NotImplemented
+        return Q(self, other, connector=connector)
+
+    def __and__(self, other: 'Q') -> 'Q':
+        return self._combine(other, self.__class__.AND)
+
+    def __or__(self, other: 'Q') -> 'Q':
+        return self._combine(other, self.__class__.OR)
+
+    def __invert__(self) -> 'Q':
+        return Q(self, negated=True)
+
+    def __repr__(self):
+        parts = [repr(c) if isinstance(c, Q) else f"{c[0]}={c[1]!r}" for c in self.children]
+        text = f"({f' {self.connector} '.join(parts)})"
+        return f"NOT {text}" if self.negated else text
+
+    @property
+    def shape(self) -> tuple:
+        """ The query without its values; queries with the same shape share their compiled form. """
+        children = tuple(c.shape if isinstance(c, Q)
+                         else parse_lookup(c[0]) + ((len(c[1]),) if c[0].endswith('__in') else ())
+                         for c in self.children)
+        return self.connector, self.negated, children
+
+    @property
+    def values(self) -> tuple:
+        """ The values of the query's lookups, in the order shape lists them. """
+        values = []
+        for c in self.children:
+            if isinstance(c, Q):
+                values.extend(c.values)
+            else:
+                values.append(tuple(c[1]) if c[0].endswith('__in') else c[1])
+        return tuple(values)
+
+
+# ---- Python predicate ----
+
+def _read_field(item, alias: str):
+    value = getattr(item, alias, _MISSING)
+    if value is _MISSING and callable(item):
+        # a Msg wraps the Outlook item
+        value = getattr(item(), alias, None)
+    return None if value is _MISSING else value
+
+
+def _align(value, other):
+    # a naive datetime is local time, the same way MsgFactory treats it
+    if isinstance(value, datetime) and isinstance(other, datetime) and (value.tzinfo is None) != (other.tzinfo is None):
+        if value.tzinfo is None:
+            value = value.astimezone()
+        else:
+            other = other.astimezone()
+    return value, other
+
+
+def _normalize(value):
+    return value.lower().strip() if isinstance(value, str) else value
+
+
+def _exact(value, expected) -> bool:
+    if value is None:
+        return False
+    if isinstance(expected, bool):
+        return bool(value) == expected
+    value, expected = _align(value, expected)
+    return _normalize(value) == _normalize(expected)
+
+
+def _compare(operator: Callable[[Any, Any], bool]):
+    def compare(value, expected) -> bool:
+        if value is None:
+            return False
+        return operator(*_align(value, expected))
+    return compare
+
+
+PREDICATE_LOOKUPS: Dict[str, Callable[[Any, Any], bool]] = {
+    'exact': _exact,
+    'contains': lambda value, expected: value is not None and _normalize(str(expected)) in _normalize(str(value)),
+    'startswith': lambda value, expected: (value is not None
+                                           and _normalize(str(value)).startswith(_normalize(str(expected)))),
+    'gt': _compare(lambda a, b: a > b), 'gte': _compare(lambda a, b: a >= b),
+    'lt': _compare(lambda a, b: a < b), 'lte': _compare(lambda a, b: a <= b),
+    'in': lambda value, expected: any(_exact(value, e) for e in expected),
+}
+
+
+def _build_predicate(shape: tuple, start: int = 0) -> Tuple[Callable[[Any, tuple], bool], int]:
+    connector, negated, children = shape
+    functions = []
+    index = start
+    for child in children:
+        if len(child) == 3 and isinstance(child[2], tuple):
+            function, index = _build_predicate(child, index)
+        else:
+            alias, lookup = child[0], child[1]
+            function = (lambda a, op, i: lambda item, values: op(_read_field(item, a), values[i]))(
+                alias, PREDICATE_LOOKUPS[lookup], index)
+            index += 1
+        functions.append(function)
+    combine = all if connector == Q.AND else any
+    if negated:
+        return (lambda item, values: not combine(f(item, values) for f in functions)), index
+    return (lambda item, values: combine(f(item, values) for f in functions)), index
+
+
+@lru_cache(maxsize=256)
+def compile_predicate_shape(shape: tuple) -> Callable[[Any, tuple], bool]:
+    """ :return: predicate(item, values) for queries of this shape. """
+    return _build_predicate(shape)[0]
+
+
+# ---- @SQL filter ----
+# A compiled node is a function values -> SQL text, or True/False for "every item"/"no item".
+# Leaves the store can not evaluate become True where the query needs a superset of the matches
+# and False under a NOT (which needs a subset), so the filter never drops a match.
+
+def _sql_text(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _minute_floor(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+def _minute_ceil(value: datetime) -> datetime:
+    floor = _minute_floor(value)
+    return floor if floor == value.astimezone(timezone.utc) else floor + timedelta(minutes=1)
+
+
+def _sql_date(value: datetime) -> str:
+    return f"'{value.strftime(DASL_DATE_FORMAT)}'"
+
+
+def _sql_literal(alias: str, value) -> str:
+    field_type = QUERY_FIELD_TYPES[alias]
+    if field_type is bool:
+        value = bool(value) != (alias in OUTLOOK_DASL_INVERTED_BOOLEANS)
+        return '1' if value else '0'
+    if field_type is int:
+        return str(int(value))
+    return _sql_text(value)
+
+
+def _date_leaf(name: str, lookup: str, superset: bool) -> Callable[[datetime], Any]:
+    # (operator, rounding) that keeps the filter a superset (or, under a NOT, a subset) of the matches
+    bounds = {('gt', True): ('>=', _minute_floor), ('gte', True): ('>=', _minute_floor),
+              ('lt', True): ('<=', _minute_ceil), ('lte', True): ('<=', _minute_ceil),
+              ('gt', False): ('>', _minute_ceil), ('gte', False): ('>=', _minute_ceil),
+              ('lt', False): ('<', _minute_floor), ('lte', False): ('<=', _minute_floor)}
+    if lookup == 'exact':
+        if not superset:
+            return lambda value: False
+        return lambda value: (f"{name} >= {_sql_date(_minute_floor(value))} AND "
+                              f"{name} < {_sql_date(_minute_floor(value) + timedelta(minutes=1))}")
+    operator, rounding = bounds[(lookup, superset)]
+    return lambda value: f"{name} {operator} {_sql_date(rounding(value))}"
+
+
+def _sql_leaf(alias: str, lookup: str, superset: bool) -> Callable[[Any], Any]:
+    name = OUTLOOK_DASL_NAMES.get(alias, None)
+    if name is None:
+        return lambda value: superset
+    if QUERY_FIELD_TYPES[alias] is datetime:
+        return _date_leaf(name, lookup, superset)
+
+    if QUERY_FIELD_TYPES[alias] is str:
+        return _text_leaf(name, lookup, superset)
+    if lookup == 'in':
+        return lambda value: ' OR '.join(f"{name} = {_sql_literal(alias, v)}" for v in value) or False
+    symbol = {'exact': '=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}[lookup]
+    return lambda value: f"{name} {symbol} {_sql_literal(alias, value)}"
+
+
+def _text_leaf(name: str, lookup: str, superset: bool) -> Callable[[Any], Any]:
+    # the predicate strips both sides, so the store only ever sees the stripped value; an item with
+    # surrounding whitespace fails '=' and 'value%', which are only subsets (used under a NOT)
+    def like(pattern: str):
+        def leaf(value):
+            value = str(value).strip()
+            # '%' is the only LIKE wildcard and can not be escaped
+            return superset if '%' in value else f"{name} LIKE {_sql_text(pattern.format(value))}"
+        return leaf
+
+    def exact(value):
+        return f"{name} = {_sql_text(str(value).strip())}"
+
+    if lookup == 'in':
+        each = like('%{}%') if superset else exact
+        return lambda value: _join([each(v) for v in value], Q.OR)
+    if lookup == 'contains' or superset:
+        return like('%{}%')
+    if lookup == 'startswith':
+        return like('{}%')
+    return exact
+
+
+def _join(parts: list, connector: str):
+    # True/False absorb or drop out the way they do in boolean algebra
+    absorbing, neutral = (False, True) if connector == Q.AND else (True, False)
+    if any(p is absorbing for p in parts):
+        return absorbing
+    parts = [p for p in parts if p is not neutral]
+    if not parts:
+        return neutral
+    return parts[0] if len(parts) == 1 else f' {connector} '.join(f'({p})' for p in parts)
+
+
+def _build_sql(shape: tuple, superset: bool = True, start: int = 0) -> Tuple[Callable[[tuple], Any], int]:
+    connector, negated, children = shape
+    # under a NOT the children have to be a subset of their matches
+    child_superset = superset != negated
+    functions = []
+    index = start
+    for child in children:
+        if len(child) == 3 and isinstance(child[2], tuple):
+            function, index = _build_sql(child, child_superset, index)
+        else:
+            function = (lambda leaf, i: lambda values: leaf(values[i]))(
+                _sql_leaf(child[0], child[1], child_superset), index)
+            index += 1
+        functions.append(function)
+
+    def build(values: tuple):
+        joined = _join([f(values) for f in functions], connector)
+        if not negated:
+            return joined
+        return (not joined) if isinstance(joined, bool) else f"NOT ({joined})"
+    return build, index
+
+
+@lru_cache(maxsize=256)
+def compile_sql_shape(shape: tuple) -> Callable[[tuple], Any]:
+    """ :return: build(values) -> @SQL condition text (or True when no part of the query can be restricted on). """
+    return _build_sql(shape)[0]
+
+
+class CompiledQuery(NamedTuple):
+    """
+    Attributes:
+        query (Q): The compiled query.
+        sql (Optional[str]): The @SQL Restrict filter, None if the store can not narrow the query down
+            (or if no item can match).
+        predicate (Callable): item -> bool, the authoritative check (works on Outlook items and Msg objects).
+        matches_nothing (bool): True if no item can match (an empty __in), so there is nothing to search.
+    """
+    query: Q
+    sql: Optional[str]
+    predicate: Callable[[Any], bool]
+    matches_nothing: bool = False
+
+
+def compile_query(query: Q) -> CompiledQuery:
+    """
+    :param query: The query to compile.
+    :type query: Q
+    :return: The @SQL filter and Python predicate of the query.
+    :rtype: CompiledQuery
+    :raises ValueError: If the query uses an unknown field or a lookup that does not apply to a field.
+    """
+    shape, values = query.shape, query.values
+    condition = compile_sql_shape(shape)(values)
+    predicate_shape = compile_predicate_shape(shape)
+    # False only comes from an empty __in: no item can match, there is nothing to restrict or scan
+    return CompiledQuery(query=query,
+                         sql=None if isinstance(condition, bool) else '@SQL=' + condition,
+                         predicate=lambda item: predicate_shape(item, values),
+                         matches_nothing=condition is False)
+
+
+class QuerySearcher(BaseSearcher, FastPathSearcher):
+    """
+    Searches with a Q query: the compiled @SQL filter restricts the folder server side (when a folder is
+    available and the store accepts it) and the compiled predicate checks the returned items; otherwise
+    the predicate runs over IterMessages.
+    """
+    SEARCH_TYPE = 'query'
+    DEFAULT_QUERY_FIELD = 'subject'
+
+    def find_messages(self, query: Q, **kwargs) -> List[CDispatch]:
+        """
+        :param query: The query to search for.
+        :type query: Q
+        :param kwargs: no_fastpath_search=True skips the server-side filter, max_results stops the scan early.
+        :return: The matching Outlook items.
+        :rtype: List[CDispatch]
+        """
+        compiled = compile_query(query)
+        self.searching_string = f"Searching for Messages matching {query}"
+        self.logger.info(self.searching_string, print_msg=True)
+
+        if compiled.matches_nothing:
+            self.logger.info("0 messages found!")
+            return []
+        if compiled.sql and not kwargs.get('no_fastpath_search', False):
+            results = self._restrict(compiled.sql)
+            if not isinstance(results, Exception):
+                found = [item for item in results if compiled.predicate(item)][:kwargs.get('max_results', None)]
+                self.logger.info(f"{len(found)} messages found via fast search!")
+                return found
+            self.logger.debug(f"fast path search not used ({results}), falling back to Python-side scan...")
+
+        matched = list(islice((m for m in self.IterMessages() if compiled.predicate(m)),
+                              kwargs.get('max_results', None)))
+        self.logger.info(f"{len(matched)} messages found!")
+        return [m() if callable(m) else m for m in matched]
+
+    def _restrict(self, sql: str):
+        try:
+            folder = self._get_fastpath_search_folder()
+            if folder is None or not hasattr(folder, 'Items'):
+                raise AttributeError("No read_folder available for fast path search.")
+            return self._fastpath_search(self._attempt_item_sort(folder), sql)
+        except Exception as e:
+            return e
+
+    def find_messages_by_attribute(self, search_str, partial_match_ok: bool = False, **kwargs) -> List[CDispatch]:
+        """
+        :param search_str: A Q query, or a string to look for in kwargs['attribute'] (DEFAULT_QUERY_FIELD).
+        :param partial_match_ok: For a string, match with contains instead of exact.
+        :return: The matching Outlook items.
+        """
+        if not isinstance(search_str, Q):
+            field = kwargs.pop('attribute', self.__class__.DEFAULT_QUERY_FIELD)
+            search_str = Q(**{f"{field}__{'contains' if partial_match_ok else 'exact'}": search_str})
+        return self.find_messages(search_str, **kwargs)
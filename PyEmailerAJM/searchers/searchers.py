@@ -1,7 +1,10 @@
 from abc import abstractmethod
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
 from typing import List, Dict, Type, Optional, Tuple
 
+from PyEmailerAJM.searchers.multi_pattern import AhoCorasick, ContainedInIndex, unique_patterns
+
 # Provide a safe fallback for CDispatch when pywin32 is unavailable (e.g., in test environments)
 try:  # pragma: no cover - trivial import guard
     from win32com.client import CDispatch  # type: ignore
@@ -9,7 +12,6 @@ except Exception:  # pragma: no cover - define a minimal stand-in type
     class CDispatch:  # minimal placeholder for typing/annotations only
         pass
 
-from PyEmailerAJM.backend import PyEmailerLogger
 
 
 # noinspection PyAbstractClass
@@ -19,6 +21,8 @@ class BaseSearcher:
 
     SEARCH_TYPE: Optional[str] = None  # subclasses set this to a unique key (e.g. 'subject')
     SEARCHING_STRING = "Searching for Messages..."  # partial match ok: {partial_match_ok}"
+    # a partial match also accepts a value that is contained in the search string
+    DEFAULT_REVERSE_PARTIAL_MATCH = True
 
     # NEW: class-level default that can be set once for all instances
     _DEFAULT_GET_MESSAGES: Optional[Callable] = None#[..., Iterable]] = None
@@ -30,12 +34,19 @@ class BaseSearcher:
             key = cls.SEARCH_TYPE.lower()
             BaseSearcher._REGISTRY[key] = cls
 
-    def __init__(self, logger=None, *, get_messages: Optional[Callable] = None, **kwargs):
+    def __init__(self, logger=None, *, get_messages: Optional[Callable] = None,
+                 iter_messages: Optional[Callable] = None, get_folder: Optional[Callable] = None, **kwargs):
         self._searching_string = None
+        self._session_registry = None
+        self._elog = None
         if logger:
             self.logger = logger
         else:
-            self._elog = PyEmailerLogger(**kwargs)
+            # imported here so importing the searchers does not load EasyLoggerAJM;
+            # the logger is shared with every other searcher/emailer of the project, close() gives it back
+            from PyEmailerAJM.backend import SessionRegistry
+            self._session_registry = kwargs.get('session_registry', None) or SessionRegistry.default()
+            self._elog = self._session_registry.acquire_logger(**kwargs)
             self.logger = self._elog()
 
         # Instance provider, if not provided, fall back to class default
@@ -43,11 +54,21 @@ class BaseSearcher:
         if self._get_messages is None:
             # Not fatal immediately; we raise only if someone calls GetMessages without a provider
             self.logger.debug("No get_messages provider set yet; call set_default_get_messages or pass get_messages.")
+        # optional streaming provider (e.g. py_emailer.iter_messages), used by IterMessages
+        self._iter_messages = iter_messages
+        # optional provider of the folder to search server side (e.g. py_emailer._set_read_folder)
+        self._get_folder = get_folder
 
     @abstractmethod
     def find_messages_by_attribute(self, search_str: str, partial_match_ok: bool = False, **kwargs) -> List[CDispatch]:
         ...
 
+    def close(self) -> None:
+        """ Gives the logger acquired from the session registry (if no logger was passed in) back. """
+        if self._elog is not None:
+            self._session_registry.release_logger(self._elog)
+            self._elog = None
+
     @classmethod
     def set_default_get_messages(cls, provider: Callable) -> None:
         """Set a global default provider for all searchers (current and future instances).
@@ -64,6 +85,13 @@ class BaseSearcher:
             )
         return self._get_messages(*args, **kwargs)
 
+    def IterMessages(self, *args, **kwargs) -> Iterator:
+        """Yields the messages one at a time, through the iter_messages provider if one was given,
+        otherwise from GetMessages."""
+        if self._iter_messages is not None:
+            return iter(self._iter_messages(*args, **kwargs))
+        return iter(self.GetMessages(*args, **kwargs))
+
     @classmethod
     def get_attribute_for_search(cls, message: CDispatch, attribute: str):
         return getattr(message, attribute, getattr(message(), attribute, None))
@@ -85,31 +113,42 @@ class BaseSearcher:
         # print(normalized_message_attr, normalized_search_str)
         return normalized_message_attr, normalized_search_str
 
-    def fetch_matched_messages(self, search_string: str, msg_attr_name: str,
-                               partial_match_ok: bool = False, **kwargs):
-        matched_messages = []
-        for message in self.GetMessages():
+    def iter_matched_messages(self, search_string: str, msg_attr_name: str,
+                              partial_match_ok: bool = False, **kwargs) -> Iterator:
+        """Yields the matching messages (not yet called) while the messages are streamed through
+        IterMessages, so a caller can stop at the first hit."""
+        for message in self.IterMessages():
             (normalized_msg_attr,
              normalized_search_string) = self.get_normalized_attr_and_candidate(message,
                                                                                 msg_attr_name,
                                                                                 search_string)
             # normalized_msg_attr = str(getattr(message(), normalized_msg_attr_name))
             self.logger.debug(f"got attribute {msg_attr_name} with value {normalized_msg_attr}")
-            msg = self._search_for_match(search_string, message, normalized_msg_attr,
+            msg = self._search_for_match(normalized_search_string, message, normalized_msg_attr,
                                          partial_match_ok, **kwargs)
             if msg:
-                matched_messages.append(msg)
-                continue
+                yield msg
+
+    def fetch_matched_messages(self, search_string: str, msg_attr_name: str,
+                               partial_match_ok: bool = False, **kwargs):
+        """Returns the matching messages; pass max_results to stop scanning once that many were found."""
+        matched_messages = list(islice(self.iter_matched_messages(search_string, msg_attr_name,
+                                                                  partial_match_ok, **kwargs),
+                                       kwargs.get('max_results', None)))
         self.logger.info(f"{len(matched_messages)} messages found!")  #, print_msg=True)
         self.logger.info("Search Complete, returning Msg's")
         return [m() for m in matched_messages]
 
+    def _reverse_partial_match(self, **kwargs) -> bool:
+        return kwargs.get('reverse_partial_match', self.__class__.DEFAULT_REVERSE_PARTIAL_MATCH)
+
     def _search_for_match(self, normalized_search_str: str, message: CDispatch, normalized_message_attr: str,
                           partial_match_ok: bool = False, **kwargs):
         # Correct argument order: candidate(message attr) first, then search string
         if (self._is_exact_match(normalized_message_attr, normalized_search_str) or
                 (partial_match_ok and self._is_partial_match(normalized_message_attr,
-                                                             normalized_search_str))):
+                                                             normalized_search_str,
+                                                             self._reverse_partial_match(**kwargs)))):
             return message
         return None
 
@@ -126,17 +165,47 @@ class BaseSearcher:
         return candidate_str == search_str
 
     @staticmethod
-    def _is_partial_match(candidate_str: str, search_str: str) -> bool:
+    def _is_partial_match(candidate_str: str, search_str: str, reverse: bool = True) -> bool:
+        """Checks if the candidate contains the search string (or, if reverse, is contained in it)."""
         if candidate_str == '' or search_str == '':
             return False
-        return (search_str in candidate_str) or (candidate_str in search_str)
+        return (search_str in candidate_str) or (reverse and candidate_str in search_str)
 
 
 class FastPathSearcher:
+    """
+    Mixin that answers attribute searches with Items.Restrict on the search folder, so only the matching
+    items cross the COM boundary; callers fall back to the Python-side scan if it fails.
+
+    Any alias in OUTLOOK_ATSQL_ALIASES with a text, number or boolean type (OUTLOOK_ALIAS_TYPES) can be
+    restricted on. The filters are tried in order until the store accepts one:
+
+    - numbers and booleans: a Jet filter on the [Alias] = value,
+      then an @SQL filter on the alias' DASL name (OUTLOOK_DASL_NAMES), for stores that reject the alias.
+    - text fields only use the DASL name, as LIKE '%...%' for partial and exact matches alike: the scan strips
+      and lowercases both sides before comparing, which the store's '=' does not (a Body ending in a line
+      break would never equal the search string), and LIKE also covers the FW/RE prefixed subjects.
+      Partial matches use ci_startswith instead if use_content_index is set and the store has content
+      indexing (Instant Search) enabled. ci_startswith matches word prefixes only, so it is faster on
+      indexed stores but misses matches in the middle of a word.
+
+    Every item the store returns is checked again with the searcher's _search_for_match, so the fast path
+    never returns an item the Python-side scan would not.
+
+    By default a partial match also accepts a value that is contained in the search string
+    (see BaseSearcher.DEFAULT_REVERSE_PARTIAL_MATCH). No store filter can express that, so such searches always
+    use the Python-side scan; pass reverse_partial_match=False to only match values containing the search
+    string, which both paths return alike and which the fast path restricts on.
+    """
     FW_PREFIXES: List[str] = []
     RE_PREFIX: List[str] = []
+    # PR_SUBJECT_W, understood by stores that reject the [Subject] alias in @SQL filters
+    DASL_SUBJECT = '"http://schemas.microsoft.com/mapi/proptag/0x0037001F"'
+    DEFAULT_USE_CONTENT_INDEX = False
+    DEFAULT_FASTPATH_ATTRIBUTE = 'Subject'
 
     def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
         mandatory_attributes = ['FW_PREFIXES', 'RE_PREFIX']
         if any([x for x in mandatory_attributes if not hasattr(cls, x)]):
             raise AttributeError(f"All subclasses of FastPathSearcher must define the following attributes: "
@@ -146,41 +215,120 @@ class FastPathSearcher:
     def GetMessages(self):
         ...
 
-    def _build_terms(self, operator, escaped, include_fw, include_re, **kwargs):
-        terms = [f"[Subject] {operator} '{escaped}'"]
-        if include_fw:
-            for x in self.__class__.FW_PREFIXES:
-                terms.append(f"[Subject] {operator} '{x} {escaped}'")
-        if include_re:
-            for x in self.__class__.RE_PREFIX:
-                terms.append(f"[Subject] {operator} '{x} {escaped}'")
-        return terms
+    @classmethod
+    def _prefixes(cls, attribute_name: str) -> List[str]:
+        # RE_PREFIX is a single string on SubjectSearcher
+        prefixes = getattr(cls, attribute_name)
+        return [prefixes] if isinstance(prefixes, str) else list(prefixes)
+
+    @staticmethod
+    def _canonical_alias(attribute: str) -> Optional[str]:
+        """The OUTLOOK_ATSQL_ALIASES spelling of attribute (matched case-insensitively), None if it is not one."""
+        return {a.lower(): a for a in OUTLOOK_ATSQL_ALIASES}.get(str(attribute).lower().strip())
 
-    def _build_sql_filter(self, search_subject, partial_match_ok, **kwargs) -> str:
-        # Build an @SQL filter that matches the desired subject, accounting for prefixes
-        # Note: [Subject] alias is recognized by Outlook's @SQL provider
-        include_fw = kwargs.get('include_fw', True)
-        include_re = kwargs.get('include_re', True)
+    @staticmethod
+    def _to_literal(value: str, field_type: type, dasl: bool = False) -> str:
+        """
+        :param value: The search string.
+        :param field_type: str, int or bool (see OUTLOOK_ALIAS_TYPES).
+        :param dasl: Booleans are written as 1/0 in @SQL filters and as True/False in Jet filters.
+        :return: value as a filter literal.
+        :raises ValueError: If value can not be compared with a field of field_type.
+        """
+        if field_type is str:
+            return "'" + str(value).replace("'", "''") + "'"
+        normalized = str(value).lower().strip()
+        if field_type is bool:
+            # the Python-side scan compares against str(True).lower()/str(False).lower()
+            if normalized not in ('true', 'false'):
+                raise ValueError(f"{value!r} is not a boolean")
+            if dasl:
+                return '1' if normalized == 'true' else '0'
+            return 'True' if normalized == 'true' else 'False'
+        if field_type is int:
+            return str(int(normalized))
+        raise ValueError(f"{field_type.__name__} fields are not restricted on")
+
+    def _build_partial_sql_filter(self, search_subject: str, use_content_index: bool = False,
+                                  dasl_name: str = None) -> str:
+        dasl_name = dasl_name or self.__class__.DASL_SUBJECT
+        # '%' is the only LIKE wildcard and can not be escaped, such searches are left to the Python-side scan
+        if '%' in search_subject:
+            raise ValueError(f"'%' in {search_subject!r} can not be matched with LIKE")
+        escaped = search_subject.strip().replace("'", "''")
+        if not escaped:
+            raise ValueError("empty search string")
+        # LIKE '%...%' already matches the FW/RE prefixed subjects
+        if use_content_index:
+            return f"@SQL={dasl_name} ci_startswith '{escaped}'"
+        return f"@SQL={dasl_name} LIKE '%{escaped}%'"
 
-        escaped = search_subject.replace("'", "''")
-        if partial_match_ok:
-            self.logger.warning("Partial match is not supported with fasttrack at this time, setting to false. "
-                                "\nRun with no_fastpath_search set to True for partial match searches. ")
-            partial_match_ok = False
+    def _build_sql_filter(self, search_subject, partial_match_ok, **kwargs) -> str:
+        """The first filter _build_sql_filters would try."""
+        return self._build_sql_filters(search_subject, partial_match_ok, **kwargs)[0]
 
+    def _build_sql_filters(self, search_str: str, partial_match_ok: bool = False, **kwargs) -> List[str]:
+        """
+        :param search_str: The string to search for.
+        :param partial_match_ok: Build a "contains" filter instead of an "equals" one.
+        :param kwargs: 'attribute' (defaults to DEFAULT_FASTPATH_ATTRIBUTE), include_fw, include_re, use_content_index,
+            reverse_partial_match (partial matches are only restricted on if it is False).
+        :return: The filters to try, in order.
+        :rtype: List[str]
+        :raises ValueError: If the attribute or the search string can not be restricted on.
+        """
+        attribute = self._canonical_alias(kwargs.get('attribute', self.__class__.DEFAULT_FASTPATH_ATTRIBUTE))
+        field_type = OUTLOOK_ALIAS_TYPES.get(attribute, None)
+        if field_type is None:
+            raise ValueError(f"no fast path for attribute {kwargs.get('attribute')!r}")
+        dasl_name = OUTLOOK_DASL_NAMES.get(attribute, None)
+        if attribute == 'Subject':
+            dasl_name = self.__class__.DASL_SUBJECT
+
+        filters = []
         if partial_match_ok:
-            operator = 'LIKE'
-            like = f"%{escaped}%"
-            terms = self._build_terms(operator, like, include_fw, include_re, **kwargs)
-
+            if field_type is not str or dasl_name is None:
+                raise ValueError(f"partial matches of {attribute} are not restricted on")
+            if self._reverse_partial_match(**kwargs):
+                raise ValueError("values contained in the search string are only matched by the Python-side scan "
+                                 "(pass reverse_partial_match=False to restrict on the values containing it)")
+            filters.append(self._build_partial_sql_filter(search_str, kwargs.get('use_content_index', False),
+                                                          dasl_name))
+        elif field_type is str:
+            # the Python-side match strips and lowercases both sides, the store's '=' does not: restrict to the
+            # items containing the value (which also covers the FW/RE prefixed subjects) and let
+            # _reconcile_fastpath_results keep the exact matches
+            if dasl_name is None:
+                raise ValueError(f"exact matches of {attribute} are not restricted on")
+            filters.append(self._build_partial_sql_filter(search_str, False, dasl_name))
         else:
-            operator = '='
-            terms = self._build_terms(operator, escaped, include_fw, include_re, **kwargs)
+            filters.append(f"([{attribute}] = {self._to_literal(search_str, field_type)})")
+            if dasl_name is not None:
+                literal = self._to_literal(search_str, field_type, dasl=True)
+                if attribute in OUTLOOK_DASL_INVERTED_BOOLEANS:
+                    literal = '0' if literal == '1' else '1'
+                filters.append(f'@SQL=({dasl_name} = {literal})')
+        self.logger.debug(f"sql filters: {filters}")
+        return filters
+
+    # noinspection PyBroadException
+    @staticmethod
+    def _content_index_available(folder: CDispatch) -> bool:
+        try:
+            return bool(folder.Store.IsInstantSearchEnabled)
+        except Exception:
+            return False
 
-        sql_where = ' OR '.join(f'({t})' for t in terms) if terms else f"[Subject] = '{escaped}'"
-        sql = sql_where
-        self.logger.debug(f"sql filter: {sql}")
-        return sql
+    def _reconcile_fastpath_results(self, results: List[CDispatch], search_str: str,
+                                    partial_match_ok: bool = False, **kwargs) -> List[CDispatch]:
+        """Drops the items the Python-side matcher would not have matched (the store's LIKE, ci_* and
+        '=' operators are not exactly the same comparisons)."""
+        attribute = self._canonical_alias(kwargs.get('attribute', self.__class__.DEFAULT_FASTPATH_ATTRIBUTE))
+        normalized_search = self._normalize_to_string(search_str)
+        return [item for item in results
+                if self._search_for_match(normalized_search, item,
+                                          self._normalize_to_string(getattr(item, attribute, '')),
+                                          partial_match_ok, **kwargs)]
 
     # noinspection PyBroadException
     def _attempt_item_sort(self, folder: CDispatch):
@@ -200,6 +348,8 @@ class FastPathSearcher:
 
     def _get_fastpath_search_folder(self):
         # Ensure we have a folder to search
+        if getattr(self, '_get_folder', None) is not None:
+            return self._get_folder()
         folder = getattr(self, 'read_folder', None)
         if folder is None and hasattr(self, '_GetReadFolder'):
             # Default to INBOX/_GetReadFolder behavior of PyEmailer
@@ -213,12 +363,12 @@ class FastPathSearcher:
             restricted = items.Restrict(sql)
             # Convert to list of CDispatch quickly; no Python-side filtering
             results: List[CDispatch] = []
-            # Using Find/FindNext over restricted to avoid full enumeration when large
+            # Walk the restricted collection with its GetFirst/GetNext cursor
             try:
-                itm = restricted.Find()
+                itm = restricted.GetFirst()
                 while itm is not None:
                     results.append(itm)
-                    itm = restricted.FindNext()
+                    itm = restricted.GetNext()
 
             except Exception:
                 # Fall back to iterating the restricted collection
@@ -228,33 +378,50 @@ class FastPathSearcher:
             return results
 
         except Exception as e:
-            # If Restrict fails (e.g., older store), fall back
-            self.logger.error(f"Restrict failed, falling back to Python scan: {e}", print_msg=True)
+            # If Restrict fails (e.g., the store does not know the alias), the next filter is tried
+            self.logger.warning(f"Restrict rejected {sql!r}: {e}")
             return e
 
-    def run_fastpath_search(self, search_subject: str, partial_match_ok: bool = False, **kwargs):
+    def run_fastpath_search(self, search_str: str, partial_match_ok: bool = False, **kwargs):
+        """
+        :param search_str: The string to search for.
+        :param partial_match_ok: Match items whose attribute contains search_str.
+        :param kwargs: 'attribute' (defaults to DEFAULT_FASTPATH_ATTRIBUTE), include_fw, include_re, use_content_index.
+        :return: The matching items, or the exception if no filter could be built or the store rejected all of them.
+        """
         # Try fast path using Items.Restrict if we have a read_folder (PyEmailer sets this)
         try:
             folder = self._get_fastpath_search_folder()
 
             if folder is not None and hasattr(folder, 'Items'):
+                kwargs['use_content_index'] = (kwargs.get('use_content_index', self.__class__.DEFAULT_USE_CONTENT_INDEX)
+                                               and self._content_index_available(folder))
+                filters = self._build_sql_filters(search_str, partial_match_ok, **kwargs)
                 items = self._attempt_item_sort(folder)
-                sql = self._build_sql_filter(search_subject=search_subject,
-                                             partial_match_ok=partial_match_ok, **kwargs)
-                results = self._fastpath_search(items, sql, **kwargs)
+                results = None
+                for sql in filters:
+                    results = self._fastpath_search(items, sql, **kwargs)
+                    if not isinstance(results, Exception):
+                        break
                 if isinstance(results, Exception):
                     raise results from None
-                return results or []
+                return self._reconcile_fastpath_results(results or [], search_str, partial_match_ok, **kwargs)
             raise AttributeError("No read_folder available for fast path search.")
 
         except Exception as e:
             # Any unexpected failure -> fall back
-            self.logger.debug(f"Fast subject search preparation failed: {e}")
+            self.logger.debug(f"Fast search preparation failed: {e}")
             return e
 
 
-class AttributeSearcher(BaseSearcher):
-    """ Generic searcher for a specific outlook item attribute. """
+class AttributeSearcher(BaseSearcher, FastPathSearcher):
+    """ Generic searcher for a specific outlook item attribute.
+
+    Searches are restricted server side first (see FastPathSearcher) when a folder is available and the
+    attribute is in OUTLOOK_ATSQL_ALIASES; pass no_fastpath_search=True to always scan Python-side.
+    Partial matches also match values contained in the search string, so they scan unless
+    reverse_partial_match=False is passed.
+    """
 
     def __init__(self, attribute: str, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -264,10 +431,15 @@ class AttributeSearcher(BaseSearcher):
         """Returns a list of messages matching the given attribute."""
         self.searching_string = f"Searching for Messages with {self._attribute} containing \'{search_str}\'"
         self.logger.info(self.searching_string, print_msg=True)
+        if not kwargs.get('no_fastpath_search', False):
+            res = self.run_fastpath_search(search_str, partial_match_ok, attribute=self._attribute, **kwargs)
+            if not isinstance(res, Exception):
+                return res
+            self.logger.debug(f"fast path search not used ({res}), falling back to Python-side scan...")
         return self.fetch_matched_messages(search_str, self._attribute, partial_match_ok, **kwargs)
 
 
-class SubjectSearcher(BaseSearcher):
+class SubjectSearcher(BaseSearcher, FastPathSearcher):
     # Constants for prefixes
     FW_PREFIXES = ['FW:', 'FWD:']
     RE_PREFIX = 'RE:'
@@ -288,21 +460,23 @@ class SubjectSearcher(BaseSearcher):
         # (normalized_message_attr,
         #  normalized_search_str) = self.get_normalized_attr_and_candidate(message, attribute, search_str)
 
+        reverse = self._reverse_partial_match(**kwargs)
+
         if super()._search_for_match(normalized_search_str, message,
-                                     normalized_message_attr, partial_match_ok):
+                                     normalized_message_attr, partial_match_ok, reverse_partial_match=reverse):
             return message
 
         # Check for FW/FWD and RE prefixes on the message subject
         if include_fw and self._matches_prefix(normalized_message_attr,
                                                self.__class__.FW_PREFIXES,
                                                normalized_search_str,
-                                               partial_match_ok):
+                                               partial_match_ok, reverse):
             return message
 
         if include_re and self._matches_prefix(normalized_message_attr,
                                                [self.__class__.RE_PREFIX],
                                                normalized_search_str,
-                                               partial_match_ok):
+                                               partial_match_ok, reverse):
             return message
         return None
 
@@ -314,9 +488,14 @@ class SubjectSearcher(BaseSearcher):
                                  partial_match_ok: bool = False, **kwargs) -> List[CDispatch]:
         """Returns a list of messages matching the given subject, ignoring prefixes based on flags.
 
-        Optimization: If an Outlook read folder is available on `self` (PyEmailer provides `read_folder`),
-        use Outlook's Items.Restrict/@SQL to filter by subject server-side instead of iterating Python-side.
+        Optimization: If a folder is available (a get_folder provider, which PyEmailer passes in, or `read_folder`),
+        use Outlook's Items.Restrict to filter by subject server-side instead of iterating Python-side (see
+        FastPathSearcher). Pass use_content_index=True to use ci_startswith on stores with content indexing.
         Falls back to the existing in-Python scan if Restrict is unavailable or throws a COM error.
+
+        A partial match also matches subjects contained in search_subject, which only the Python-side scan can
+        find, so partial searches scan unless reverse_partial_match=False is passed. With it, only subjects
+        containing search_subject match, on both paths, and the search is restricted server-side.
         """
 
         # Normalize search subject and attr label
@@ -334,7 +513,7 @@ class SubjectSearcher(BaseSearcher):
                     raise res from None
                 return res
             except Exception as e:
-                pass
+                self.logger.debug(f"fast path search failed: {e}")
         else:
             self.logger.warning("No fast path search available.")
 
@@ -343,14 +522,100 @@ class SubjectSearcher(BaseSearcher):
         return self.fetch_matched_messages(normalized_subject, normalized_msg_attr, partial_match_ok, **kwargs)
 
     def _matches_prefix(self, message_subject: str, prefixes: list, search_subject: str,
-                        partial_match_ok: bool = False) -> bool:
+                        partial_match_ok: bool = False, reverse: bool = True) -> bool:
         """Checks if the message subject matches the search subject after removing a prefix."""
+        stripped_subject = self._strip_prefix(message_subject, prefixes)
+        if stripped_subject is None:
+            return False
+        return (self._is_exact_match(stripped_subject, search_subject) if not partial_match_ok
+                else self._is_partial_match(stripped_subject, search_subject, reverse))
+
+    @staticmethod
+    def _strip_prefix(message_subject: str, prefixes: list) -> Optional[str]:
+        """The subject with the first matching prefix removed, None if it has none of the prefixes."""
         for prefix in prefixes:
             if message_subject.startswith(prefix.lower()):
-                stripped_subject = message_subject.split(prefix.lower(), 1)[1].strip()
-                return (self._is_exact_match(stripped_subject, search_subject) if not partial_match_ok
-                        else self._is_partial_match(stripped_subject, search_subject))
-        return False
+                return message_subject.split(prefix.lower(), 1)[1].strip()
+        return None
+
+    def _subject_variants(self, normalized_subject: str, include_fw: bool = True, include_re: bool = True) -> List[str]:
+        """The normalized subject plus its FW/RE stripped forms, the strings _search_for_match compares."""
+        variants = [normalized_subject]
+        for include, prefixes in ((include_fw, self._prefixes('FW_PREFIXES')),
+                                  (include_re, self._prefixes('RE_PREFIX'))):
+            stripped = self._strip_prefix(normalized_subject, prefixes) if include else None
+            if stripped is not None:
+                variants.append(stripped)
+        return variants
+
+    @staticmethod
+    def _read_subject(message):
+        # Msg exposes .subject; raw items only have the COM property
+        subject = getattr(message, 'subject', None)
+        if subject is None and callable(message):
+            subject = getattr(message(), 'Subject', None)
+        return subject
+
+    def find_messages_by_any(self, subjects: Iterable[str], partial_match_ok: bool = False,
+                             **kwargs) -> Dict[str, List[CDispatch]]:
+        """Searches for many subjects at once, in a single pass over the folder.
+
+        Every message's subject is read once and matched against all of the subjects together:
+        exact matches are dictionary lookups of the subject and its FW/RE stripped forms, partial matches
+        go through one Aho-Corasick automaton built over the subjects (see multi_pattern), so the cost of
+        a message does not grow with the number of subjects. A message matches a subject exactly when
+        find_messages_by_subject(subject, partial_match_ok=partial_match_ok, ...) would return it.
+
+        :param subjects: The subjects to search for.
+        :type subjects: Iterable[str]
+        :param partial_match_ok: Match subjects partially instead of exactly.
+        :type partial_match_ok: bool
+        :param kwargs: include_fw / include_re (default True) and reverse_partial_match, as for
+            find_messages_by_subject.
+        :return: {subject: the matching messages}, with an entry (possibly empty) for every given subject.
+        :rtype: Dict[str, List[CDispatch]]
+        """
+        include_fw = kwargs.get('include_fw', True)
+        include_re = kwargs.get('include_re', True)
+        subjects = list(subjects)
+        unique = unique_patterns(subjects, self._normalize_to_string)
+        patterns = list(unique)
+        exact_lookup = {pattern: index for index, pattern in enumerate(patterns) if pattern}
+        contains = AhoCorasick(patterns) if partial_match_ok else None
+        contained_in = ContainedInIndex(patterns) if partial_match_ok and self._reverse_partial_match(**kwargs) else None
+
+        self.searching_string = (f"searching for messages matching any of {len(patterns)} subjects, "
+                                 f"partial match ok: {partial_match_ok}").capitalize()
+        self.logger.info(self.searching_string, print_msg=True)
+
+        matched: List[List] = [[] for _ in patterns]
+        for message in self.IterMessages():
+            subject = self._read_subject(message)
+            if subject is None:
+                continue
+            variants = [v for v in self._subject_variants(self._normalize_to_string(subject),
+                                                          include_fw, include_re) if v]
+            if not variants:
+                continue
+            if partial_match_ok:
+                # the stripped forms are substrings of the subject, so one automaton pass covers them;
+                # the reverse direction (subject contained in the pattern) needs every form
+                hits = contains.matches(variants[0])
+                if contained_in is not None:
+                    for variant in variants:
+                        hits |= contained_in.containing(variant)
+            else:
+                hits = {exact_lookup[v] for v in variants if v in exact_lookup}
+            for index in hits:
+                matched[index].append(message)
+
+        results = {subject: [] for subject in subjects}
+        for index, pattern in enumerate(patterns):
+            items = [m() for m in matched[index]]
+            for subject in unique[pattern]:
+                results[subject] = list(items)
+        self.logger.info(f"{sum(len(m) for m in matched)} matches found for {len(patterns)} subjects")
+        return results
 
 
 # Commonly recognized Outlook @SQL aliases
@@ -375,6 +640,48 @@ OUTLOOK_ATSQL_ALIASES: Tuple[str, ...] = (
 )
 
 
+# Value type of each alias, used to write the literal of a Restrict filter (True/1, 5, 'text').
+# Date/time aliases are not restricted on by the searchers (they compare strings), so they are left out.
+OUTLOOK_ALIAS_TYPES: Dict[str, type] = {
+    'Subject': str, 'Body': str, 'Categories': str, 'MessageClass': str, 'Size': int, 'Importance': int,
+    'Sensitivity': int, 'UnRead': bool, 'HasAttachment': bool, 'ConversationTopic': str,
+    'SenderName': str, 'SenderEmailAddress': str, 'SenderEmailType': str, 'To': str, 'CC': str, 'BCC': str,
+    'Location': str, 'Organizer': str, 'MeetingStatus': int, 'FlagStatus': int, 'FlagRequest': str,
+}
+
+# DASL names of the aliases, for stores/providers that reject [Alias] filters (and for LIKE, which only @SQL has).
+# To/CC/BCC are the display name lists (PR_DISPLAY_TO etc.), the same strings the To/CC/BCC properties return.
+OUTLOOK_DASL_NAMES: Dict[str, str] = {
+    'Subject': '"http://schemas.microsoft.com/mapi/proptag/0x0037001F"',
+    'Body': '"http://schemas.microsoft.com/mapi/proptag/0x1000001F"',
+    'Categories': '"urn:schemas-microsoft-com:office:office#Keywords"',
+    'MessageClass': '"http://schemas.microsoft.com/mapi/proptag/0x001A001F"',
+    'Size': '"http://schemas.microsoft.com/mapi/proptag/0x0E080003"',
+    'Importance': '"http://schemas.microsoft.com/mapi/proptag/0x00170003"',
+    'Sensitivity': '"http://schemas.microsoft.com/mapi/proptag/0x00360003"',
+    'UnRead': '"urn:schemas:httpmail:read"',
+    'HasAttachment': '"urn:schemas:httpmail:hasattachment"',
+    'ConversationTopic': '"http://schemas.microsoft.com/mapi/proptag/0x0070001F"',
+    'SenderName': '"http://schemas.microsoft.com/mapi/proptag/0x0C1A001F"',
+    'SenderEmailAddress': '"http://schemas.microsoft.com/mapi/proptag/0x0C1F001F"',
+    'SenderEmailType': '"http://schemas.microsoft.com/mapi/proptag/0x0C1E001F"',
+    'To': '"http://schemas.microsoft.com/mapi/proptag/0x0E04001F"',
+    'CC': '"http://schemas.microsoft.com/mapi/proptag/0x0E03001F"',
+    'BCC': '"http://schemas.microsoft.com/mapi/proptag/0x0E02001F"',
+    'ReceivedTime': '"urn:schemas:httpmail:datereceived"',
+    'SentOn': '"urn:schemas:httpmail:date"',
+    'CreationTime': '"http://schemas.microsoft.com/mapi/proptag/0x30070040"',
+    'LastModificationTime': '"http://schemas.microsoft.com/mapi/proptag/0x30080040"',
+    'Start': '"urn:schemas:calendar:dtstart"',
+    'End': '"urn:schemas:calendar:dtend"',
+    'Location': '"urn:schemas:calendar:location"',
+    'FlagStatus': '"http://schemas.microsoft.com/mapi/proptag/0x10900003"',
+    'FlagRequest': '"urn:schemas:httpmail:messageflag"',
+}
+# aliases whose DASL property holds the negated value ([UnRead] = True is "urn:schemas:httpmail:read" = 0)
+OUTLOOK_DASL_INVERTED_BOOLEANS: Tuple[str, ...] = ('UnRead',)
+
+
 def get_outlook_sql_aliases() -> Iterable:#[str]:
     """Return a tuple of commonly recognized Outlook @SQL field aliases.
 
@@ -0,0 +1,95 @@
+"""
+bench_event_latency.py
+
+Measures the delay between a new item arriving and ContinuousMonitor classifying it with
+event_watch (driven by a LocalEventSource), and the delay until the next endless_watch cycle
+when the new mail notification wakes its sleep (wake_on_new_mail), compared to the expected
+delay of a polling endless_watch loop (on average half of TheSandman.DEFAULT_SLEEP_TIME_SECONDS).
+
+run with: python -m benchmarks.bench_event_latency
+"""
+import threading
+from random import Random
+from statistics import mean, median
+from time import monotonic, sleep
+from unittest.mock import MagicMock, patch
+
+from PyEmailerAJM.backend import TheSandman
+from PyEmailerAJM.continuous_monitor import ContinuousMonitor
+from PyEmailerAJM.continuous_monitor.backend import LocalEventSource
+
+
+def _get_monitor(source):
+    with patch('PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+               return_value=(None, MagicMock(), MagicMock())):
+        monitor = ContinuousMonitor(False, False, dev_mode=True, logger=MagicMock(), event_source=source)
+    monitor.read_folder = MagicMock()
+    monitor.check_for_alerts = MagicMock()
+    return monitor
+
+
+def run(count=50, seed=42):
+    rand = Random(seed)
+    source = LocalEventSource()
+    monitor = _get_monitor(source)
+
+    sent, latencies = {}, []
+    monitor.check_new_items = lambda entry_ids: latencies.extend(monotonic() - sent[x] for x in entry_ids)
+
+    def emitter():
+        for i in range(count):
+            sleep(rand.uniform(0.001, 0.02))
+            sent[f'ID{i}'] = monotonic()
+            source.emit(f'ID{i}')
+
+    thread = threading.Thread(target=emitter)
+    thread.start()
+    monitor.event_watch(stop_condition=lambda: len(latencies) >= count, reconcile_interval_seconds=3600)
+    thread.join()
+    return latencies
+
+
+def run_endless_watch(count=20, seed=42):
+    rand = Random(seed)
+    source = LocalEventSource()
+    monitor = _get_monitor(source)
+    monitor.snooze_tracker = MagicMock(**{'next_expiry.return_value': None})
+    monitor.sleep_timer = TheSandman(use_visual_sleep=False, logger=MagicMock())
+
+    sent, latencies = [], []
+    checked = threading.Event()
+
+    def check_for_alerts():
+        if sent:
+            latencies.append(monotonic() - sent[-1])
+        if len(latencies) >= count:
+            monitor.stop()
+        checked.set()
+
+    monitor.check_for_alerts = check_for_alerts
+
+    def emitter():
+        for i in range(count):
+            checked.wait()
+            checked.clear()
+            # give the monitor time to fall asleep
+            sleep(rand.uniform(0.01, 0.05))
+            sent.append(monotonic())
+            source.emit(f'ID{i}')
+
+    thread = threading.Thread(target=emitter)
+    thread.start()
+    monitor.endless_watch()
+    thread.join()
+    return latencies
+
+
+if __name__ == '__main__':
+    latencies = run()
+    print(f"event_watch   latency: mean={mean(latencies) * 1000:7.2f} ms  "
+          f"median={median(latencies) * 1000:7.2f} ms  max={max(latencies) * 1000:7.2f} ms")
+    latencies = run_endless_watch()
+    print(f"endless_watch latency: mean={mean(latencies) * 1000:7.2f} ms  "
+          f"median={median(latencies) * 1000:7.2f} ms  max={max(latencies) * 1000:7.2f} ms (woken by new mail)")
+    print(f"polling       latency: mean={TheSandman.DEFAULT_SLEEP_TIME_SECONDS / 2 * 1000:7.0f} ms (expected, "
+          f"up to {TheSandman.DEFAULT_SLEEP_TIME_SECONDS} s)")
@@ -0,0 +1,47 @@
+"""
+bench_import_time.py
+
+Runs `python -X importtime` for a few typical entry points and prints the cumulative import time
+of each, along with the slowest modules it pulled in, and checks `import PyEmailerAJM` against
+IMPORT_TIME_BUDGET_SECONDS.
+
+run with: python -m benchmarks.bench_import_time
+"""
+import os
+import subprocess
+import sys
+
+# cumulative `python -X importtime` time of `import PyEmailerAJM`
+IMPORT_TIME_BUDGET_SECONDS = 0.15
+STATEMENTS = ('import PyEmailerAJM',
+              'from PyEmailerAJM import SearcherFactory',
+              'from PyEmailerAJM import Msg',
+              'from PyEmailerAJM import PyEmailer',
+              'from PyEmailerAJM.continuous_monitor import ContinuousMonitorAlertSend')
+
+
+def import_times(statement):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, env=env, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, name = line.split('|')
+            rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+if __name__ == '__main__':
+    for statement in STATEMENTS:
+        rows = import_times(statement)
+        top_level = [r for r in rows if not r[1].startswith(' ')]
+        total = sum(us for us, _ in top_level)
+        print(f"{statement:<70} {total / 1000:8.1f} ms  ({len(rows)} modules)")
+        for us, name in sorted(top_level, reverse=True)[:5]:
+            print(f"    {name:<60} {us / 1000:8.1f} ms")
+
+    package_us = next(us for us, name in import_times('import PyEmailerAJM') if name == 'PyEmailerAJM')
+    verdict = 'within' if package_us / 1e6 < IMPORT_TIME_BUDGET_SECONDS else 'OVER'
+    print(f"import PyEmailerAJM: {package_us / 1000:.1f} ms, {verdict} the "
+          f"{IMPORT_TIME_BUDGET_SECONDS * 1000:.0f} ms budget")
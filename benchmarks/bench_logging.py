@@ -0,0 +1,72 @@
+"""
+bench_logging.py
+
+Compares how long the calling (monitor) thread spends in logging calls with PyEmailerLogger's
+synchronous handlers against async_logging (QueueHandler + listener thread, buffered file handler).
+A slow handler stands in for the OutlookEmailHandler building and sending an email on ERROR.
+
+run with: python -m benchmarks.bench_logging
+"""
+import logging
+import tempfile
+from pathlib import Path
+from time import perf_counter, sleep
+from unittest.mock import patch
+
+from EasyLoggerAJM.easy_logger import EasyLogger
+
+from PyEmailerAJM.backend import PyEmailerLogger
+
+
+class SlowEmailHandler(logging.Handler):
+    """ Sleeps send_seconds per record, like an email being sent through Outlook. """
+    def __init__(self, send_seconds=0.05):
+        super().__init__(logging.ERROR)
+        self.send_seconds = send_seconds
+        self.sent = 0
+
+    def emit(self, record):
+        sleep(self.send_seconds)
+        self.sent += 1
+
+
+def make_logger(name, log_dir, async_logging):
+    with patch.object(EasyLogger, 'post_handler_setup'):
+        py_logger = PyEmailerLogger()
+    py_logger.logger = logging.getLogger(name)
+    py_logger.logger.setLevel(logging.DEBUG)
+    py_logger.logger.propagate = False
+    py_logger.logger.handlers.clear()
+    file_handler = logging.FileHandler(Path(log_dir, f'{name}.log'))
+    py_logger.logger.addHandler(file_handler)
+    email_handler = SlowEmailHandler()
+    py_logger.add_handler(email_handler)
+    if async_logging:
+        py_logger.enable_async_logging()
+    return py_logger, file_handler, email_handler
+
+
+def run(label, log_dir, async_logging, records=20000, error_every=2000):
+    py_logger, file_handler, email_handler = make_logger(label, log_dir, async_logging)
+    logger = py_logger()
+    start = perf_counter()
+    for i in range(records):
+        if i % error_every == 0:
+            logger.error(f"record {i} failed")
+        else:
+            logger.debug(f"record {i} processed")
+    caller_time = perf_counter() - start
+    depth = py_logger.queue_metrics['max_depth']
+    py_logger.stop_async_logging()
+    total_time = perf_counter() - start
+    file_handler.close()
+    print(f"{label:<6} caller={caller_time * 1000:8.1f} ms ({records / caller_time:10.0f} records/s) "
+          f"until drained={total_time * 1000:8.1f} ms emails={email_handler.sent} max queue depth={depth}")
+    return caller_time
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_time = run('sync', tmp, async_logging=False)
+        async_time = run('async', tmp, async_logging=True)
+    print(f"time spent logging on the calling thread reduced by {100 * (1 - async_time / sync_time):.1f}%")
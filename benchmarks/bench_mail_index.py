@@ -0,0 +1,83 @@
+"""
+bench_mail_index.py
+
+Compares a body substring search through AttributeSearcher (every Body pulled across COM, as when the
+store rejects the Restrict) against the same search answered by the SQLite FTS5 MailIndex, on a large mocked
+folder. Every item property read costs a simulated cross-process COM call. The index is built once,
+then brought up to date incrementally (nothing changed) before the search, as IndexSearcher does.
+
+run with: python -m benchmarks.bench_mail_index
+"""
+from datetime import datetime, timedelta
+from random import Random
+from time import perf_counter
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.msg import Msg
+from PyEmailerAJM.searchers import AttributeSearcher, IndexSearcher, MailIndex
+
+COM_CALL_SECONDS = 20e-6
+WORDS = ['invoice', 'meeting', 'report', 'deploy', 'lunch', 'budget', 'review', 'outage', 'contract', 'schedule']
+
+
+def com_call():
+    end = perf_counter() + COM_CALL_SECONDS
+    while perf_counter() < end:
+        pass
+
+
+class CountingItem:
+    """ Outlook-like item counting every property read. """
+    reads = 0
+
+    def __init__(self, n, rand):
+        body = ' '.join(rand.choices(WORDS, k=200)) + (' deployment succeeded' if n % 500 == 0 else '')
+        self._fields = {'EntryID': f'id{n}', 'Subject': ' '.join(rand.choices(WORDS, k=3)), 'Body': body,
+                        'SenderName': 'Alice', 'SenderEmailAddress': 'alice@example.com',
+                        'LastModificationTime': datetime(2025, 10, 1) + timedelta(seconds=n),
+                        'ReceivedTime': datetime(2025, 10, 1), 'SentOn': datetime(2025, 10, 1)}
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self._fields:
+            raise AttributeError(name)
+        CountingItem.reads += 1
+        com_call()
+        return self._fields[name]
+
+
+class Items(list):
+    @property
+    def Count(self):
+        return len(self)
+
+    def Restrict(self, sql_filter):
+        watermark = datetime.strptime(sql_filter.split("'")[1], MailIndex.RESTRICT_DATE_FORMAT)
+        # evaluated inside the store: no COM reads on our side
+        return [i for i in self if i._fields['LastModificationTime'] >= watermark]
+
+
+def run(label, search):
+    CountingItem.reads = 0
+    start = perf_counter()
+    found = search()
+    elapsed = perf_counter() - start
+    print(f"{label:<14} found={len(found):<5} COM reads={CountingItem.reads:<7} time={elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+if __name__ == '__main__':
+    rand = Random(42)
+    folder = MagicMock(StoreID='store', EntryID='inbox')
+    folder.Items = Items(CountingItem(n, rand) for n in range(5000))
+    by_id = {i._fields['EntryID']: i for i in folder.Items}
+
+    scan = AttributeSearcher('Body', logger=MagicMock(), get_messages=lambda: [Msg(i) for i in folder.Items])
+    index = MailIndex(':memory:')
+    run('build index', lambda: [None] * index.update(folder).indexed)
+    searcher = IndexSearcher(logger=MagicMock(), mail_index=index, get_folder=lambda: folder,
+                             get_item=lambda entry_id, store_id: by_id[entry_id])
+
+    slow = run('body scan', lambda: scan.find_messages_by_attribute('deployment succeeded', partial_match_ok=True,
+                                                                    no_fastpath_search=True))
+    fast = run('mail index', lambda: searcher.find_messages_by_attribute('deployment succeeded'))
+    print(f"mail index is {slow / fast:.1f}x faster")
@@ -0,0 +1,74 @@
+"""
+bench_msg_factory.py
+
+Compares COM property reads per message of the original MsgFactory guess-and-check
+(build _OverDueMsg, _CriticalWarningMsg, _WarningMsg in turn, then msg_alert again on the winner)
+against the single-pass MsgFactory.classify.
+
+run with: python -m benchmarks.bench_msg_factory
+"""
+from datetime import datetime, timedelta
+from random import Random
+from time import perf_counter
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.msg import Msg, MsgFactory
+
+
+class CountingItem:
+    """ Outlook-like item counting every property read (each one is a cross-process COM call). """
+    def __init__(self, subject, hours_old, unread):
+        self._values = {'Subject': subject, 'HTMLBody': '<p>nothing to see</p>', 'Attachments': [],
+                        'UnRead': unread, 'ReceivedTime': datetime.now() - timedelta(hours=hours_old),
+                        'EntryID': subject}
+        self.reads = 0
+
+    def __getattr__(self, name):
+        values = self.__dict__.get('_values', {})
+        if name in values:
+            self.__dict__['reads'] += 1
+            return values[name]
+        raise AttributeError(name)
+
+
+def make_items(count, seed=42):
+    rand = Random(seed)
+    return [CountingItem(subject=rand.choice(['Training due', 'Lunch', 'Weekly training report', 'Invoice']),
+                         hours_old=rand.uniform(0, 96), unread=rand.random() < 0.7)
+            for _ in range(count)]
+
+
+def legacy_guess_and_check(msg, **kwargs):
+    for msg_class in MsgFactory.MSG_CLASSES:
+        msg_class.ALERT_SUBJECT_KEYWORDS = MsgFactory.ALERT_SUBJECT_KEYWORDS
+        candidate = msg_class(msg, **kwargs)
+        if candidate.msg_alert:
+            return candidate
+    return None
+
+
+def run(label, classify, items, **msg_kwargs):
+    snooze_checker = MagicMock()
+    snooze_checker.read_entry.return_value = None
+    start = perf_counter()
+    alerts = 0
+    for item in items:
+        alert = classify(Msg(item, **msg_kwargs), snooze_checker=snooze_checker)
+        # ContinuousMonitor.GetMessages checks msg_alert on the winner again
+        if alert is not None and alert.msg_alert:
+            alerts += 1
+    elapsed = perf_counter() - start
+    reads = sum(i.reads for i in items)
+    print(f"{label:<32} alerts={alerts:<6} reads/msg={reads / len(items):6.2f} "
+          f"time={elapsed * 1000:8.1f} ms")
+    return reads
+
+
+if __name__ == '__main__':
+    MsgFactory.ALERT_SUBJECT_KEYWORDS = ['training']
+    message_count = 5000
+    legacy = run('guess-and-check', legacy_guess_and_check, make_items(message_count))
+    single = run('classify', MsgFactory.classify, make_items(message_count))
+    snap = run('classify + snapshot', MsgFactory.classify, make_items(message_count), snapshot=True)
+    print(f"property reads reduced by {100 * (1 - single / legacy):.1f}% "
+          f"({100 * (1 - snap / legacy):.1f}% with snapshots)")
@@ -0,0 +1,67 @@
+"""
+bench_multi_subject_search.py
+
+Looks for many subjects in one folder (like reconciling a list of sent subjects against the inbox):
+one find_messages_by_subject scan per subject against a single find_messages_by_any pass, which reads
+every subject once and matches it against all the subjects with one Aho-Corasick automaton.
+Every item property read costs a simulated cross-process COM call.
+
+run with: python -m benchmarks.bench_multi_subject_search
+"""
+from random import Random
+from time import perf_counter
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.msg import Msg
+from PyEmailerAJM.searchers import SubjectSearcher
+
+COM_CALL_SECONDS = 20e-6
+
+
+def com_call():
+    end = perf_counter() + COM_CALL_SECONDS
+    while perf_counter() < end:
+        pass
+
+
+class CountingItem:
+    """ Outlook-like item counting every property read. """
+    reads = 0
+
+    def __init__(self, subject):
+        self._subject = subject
+
+    @property
+    def Subject(self):
+        CountingItem.reads += 1
+        com_call()
+        return self._subject
+
+
+def make_folder(count, subjects, seed=42):
+    rand = Random(seed)
+    prefixes = ['', '', 'RE: ', 'FW: ']
+    return [CountingItem(rand.choice(prefixes) + rand.choice(subjects)) for _ in range(count)]
+
+
+def run(label, search):
+    CountingItem.reads = 0
+    start = perf_counter()
+    found = search()
+    elapsed = perf_counter() - start
+    print(f"{label:<16} matches={found:<6} COM reads={CountingItem.reads:<7} time={elapsed * 1000:9.1f} ms")
+    return elapsed
+
+
+if __name__ == '__main__':
+    all_subjects = [f"Order {n} shipped" for n in range(1000)]
+    wanted = all_subjects[:100]
+    folder = make_folder(2000, all_subjects)
+    searcher = SubjectSearcher(logger=MagicMock(), get_messages=lambda: [Msg(i) for i in folder])
+
+    one_by_one = run('one by one', lambda: sum(len(searcher.find_messages_by_subject(s, no_fastpath_search=True))
+                                               for s in wanted))
+    single_pass = run('single pass', lambda: sum(len(v) for v in searcher.find_messages_by_any(wanted).values()))
+    run('single, partial', lambda: sum(len(v) for v in searcher.find_messages_by_any(
+        wanted, partial_match_ok=True).values()))
+    print(f"single pass is {one_by_one / single_pass:.1f}x faster")
@@ -0,0 +1,73 @@
+"""
+bench_snooze_index.py
+
+Compares the per-message snooze check at 100k snooze entries: the original read_entry
+(dict lookup + datetime.fromisoformat) followed by TheSandman.is_snooze_expired (datetime.now()
+on every call) against SnoozeTracking.is_snoozed on the pre-parsed index with one reference time
+per cycle. Also times evicting the expired entries through the expiry heap.
+
+run with: python -m benchmarks.bench_snooze_index
+"""
+from datetime import datetime, timedelta
+from logging import getLogger
+from pathlib import Path
+from random import Random
+from time import perf_counter
+from typing import Optional
+
+from PyEmailerAJM.backend import TheSandman
+from PyEmailerAJM.continuous_monitor.backend import SnoozeTracking
+
+
+def make_entries(count, now, seed=42):
+    rand = Random(seed)
+    limit_hours = TheSandman.DEFAULT_SNOOZE_EXPIRATION_LIMIT_HOURS
+    return {f"subject {i}": (now - timedelta(hours=rand.uniform(0, 2 * limit_hours))).isoformat()
+            for i in range(count)}
+
+
+def make_tracker(entries):
+    tracker = SnoozeTracking(Path('bench_snooze_index.json'), logger=getLogger('bench_snooze_index'))
+    tracker._json_loaded = dict(entries)
+    return tracker
+
+
+def legacy_read_entry(json_loaded, email_subject) -> Optional[datetime]:
+    entry = json_loaded.get(email_subject, None)
+    return datetime.fromisoformat(entry) if entry is not None else None
+
+
+def legacy_check(entries, subjects):
+    snoozed = 0
+    for subject in subjects:
+        entry = legacy_read_entry(entries, subject)
+        if entry is not None and not TheSandman.is_snooze_expired(entry):
+            snoozed += 1
+    return snoozed
+
+
+def indexed_check(tracker, subjects):
+    return sum(tracker.is_snoozed(subject) for subject in subjects)
+
+
+def timed(label, func, *args):
+    start = perf_counter()
+    result = func(*args)
+    elapsed = perf_counter() - start
+    print(f"{label:<36} result={result:<8} time={elapsed * 1000:8.1f} ms")
+    return elapsed
+
+
+if __name__ == '__main__':
+    entry_count = 100_000
+    now = datetime.now()
+    entries = make_entries(entry_count, now)
+    subjects = list(entries) + [f"unknown {i}" for i in range(entry_count // 10)]
+
+    legacy = timed('read_entry + fromisoformat + now()', legacy_check, entries, subjects)
+    tracker = make_tracker(entries)
+    timed('index build (parse + heapify)', lambda: len(tracker.snooze_index))
+    timed('begin_cycle (evicts ~50%, once)', lambda: tracker.begin_cycle(now) and len(tracker.snooze_index))
+    indexed = timed('is_snoozed', indexed_check, tracker, subjects)
+    timed('evict a further 6h of expiries', lambda: len(tracker.evict_expired(now + timedelta(hours=6))))
+    print(f"per-cycle snooze checks {legacy / indexed:.1f}x faster")
@@ -0,0 +1,70 @@
+"""
+bench_startup.py
+
+Measures PyEmailer / ContinuousMonitor construction time against a fake win32 Dispatch that
+sleeps like a real Outlook startup would (Dispatch, GetNamespace, CreateItem), comparing lazy
+construction with construction + warm_up() (which is what construction used to cost), and
+warming up many emailers with and without the shared SessionRegistry session.
+
+run with: python -m benchmarks.bench_startup
+"""
+from time import perf_counter, sleep
+from unittest.mock import MagicMock, patch
+
+from PyEmailerAJM.backend import SessionRegistry
+from PyEmailerAJM.continuous_monitor import ContinuousMonitor
+from PyEmailerAJM.py_emailer_ajm import PyEmailer
+
+DISPATCH_SECONDS = 0.25
+GET_NAMESPACE_SECONDS = 0.05
+CREATE_ITEM_SECONDS = 0.03
+
+
+class FakeOutlook:
+    def __init__(self, name):
+        sleep(DISPATCH_SECONDS)
+        self.name = name
+
+    @staticmethod
+    def GetNamespace(name):
+        sleep(GET_NAMESPACE_SECONDS)
+        return MagicMock(name=name)
+
+    @staticmethod
+    def CreateItem(item_type):
+        sleep(CREATE_ITEM_SECONDS)
+        return MagicMock(name=f'item {item_type}')
+
+
+def timed(label, build, warm_up, runs=5):
+    start = perf_counter()
+    for _ in range(runs):
+        obj = build()
+        if warm_up:
+            obj.warm_up()
+    elapsed = (perf_counter() - start) / runs
+    print(f"{label:<50} {elapsed * 1000:8.1f} ms")
+    return elapsed
+
+
+def many_emailers(count, share_session):
+    # start from a cold registry every run
+    SessionRegistry.default().close_all()
+    return [PyEmailer(False, False, logger=MagicMock(), share_session=share_session).warm_up()
+            for _ in range(count)][0]
+
+
+if __name__ == '__main__':
+    with patch('PyEmailerAJM.py_emailer_ajm.win32.Dispatch', FakeOutlook):
+        for name, build in (('PyEmailer', lambda: PyEmailer(False, False, logger=MagicMock(),
+                                                            share_session=False)),
+                            ('ContinuousMonitor', lambda: ContinuousMonitor(False, False, dev_mode=True,
+                                                                            logger=MagicMock(), share_session=False,
+                                                                            file_name='bench_startup.json'))):
+            eager = timed(f'{name} + warm_up (previous behaviour)', build, True)
+            lazy = timed(f'{name} (lazy)', build, False)
+            print(f"{name} startup {eager / lazy:.0f}x faster when Outlook is not needed")
+
+        shared = timed('10 PyEmailers + warm_up (shared session)', lambda: many_emailers(10, True), False)
+        separate = timed('10 PyEmailers + warm_up (share_session=False)', lambda: many_emailers(10, False), False)
+        print(f"shared sessions {separate / shared:.1f}x faster for 10 emailers")
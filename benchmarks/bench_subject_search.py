@@ -0,0 +1,86 @@
+"""
+bench_subject_search.py
+
+Compares a partial subject search ("undeliverable", like get_failed_sends) answered by the
+SubjectSearcher fast path (one Items.Restrict with LIKE '%...%', evaluated by the store) against
+the Python-side fallback scan, on a large mocked folder. Every item property read costs a
+simulated cross-process COM call; filtering inside the store costs nothing on our side.
+
+run with: python -m benchmarks.bench_subject_search
+"""
+from random import Random
+from time import perf_counter
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.msg import Msg
+from PyEmailerAJM.searchers import SubjectSearcher
+
+COM_CALL_SECONDS = 20e-6
+
+
+def com_call():
+    end = perf_counter() + COM_CALL_SECONDS
+    while perf_counter() < end:
+        pass
+
+
+class CountingItem:
+    """ Outlook-like item counting every property read. """
+    reads = 0
+
+    def __init__(self, subject):
+        self._subject = subject
+
+    @property
+    def Subject(self):
+        CountingItem.reads += 1
+        com_call()
+        return self._subject
+
+
+class Cursor:
+    def __init__(self, items):
+        self._iter = iter(items)
+
+    def GetFirst(self):
+        return next(self._iter, None)
+
+    def GetNext(self):
+        return next(self._iter, None)
+
+
+class StoreItems(list):
+    """ Items collection whose Restrict runs inside the 'store' (no COM reads on our side). """
+    def Sort(self, *args):
+        pass
+
+    def Restrict(self, sql_filter):
+        needle = sql_filter.split("LIKE '%", 1)[1].rsplit("%'", 1)[0].replace("''", "'").lower()
+        return Cursor([i for i in self if needle in i._subject.lower()])
+
+
+def make_folder(count, seed=42):
+    rand = Random(seed)
+    subjects = ['Weekly report', 'Lunch', 'Undeliverable: Weekly report', 'RE: Invoice 42', 'Build failed']
+    folder = MagicMock()
+    folder.Items = StoreItems(CountingItem(rand.choices(subjects, weights=[30, 30, 1, 30, 9])[0])
+                              for _ in range(count))
+    return folder
+
+
+def run(label, folder, **kwargs):
+    searcher = SubjectSearcher(logger=MagicMock(), get_folder=lambda: folder,
+                               get_messages=lambda: [Msg(i) for i in folder.Items])
+    CountingItem.reads = 0
+    start = perf_counter()
+    found = searcher.find_messages_by_subject('undeliverable', partial_match_ok=True, **kwargs)
+    elapsed = perf_counter() - start
+    print(f"{label:<12} found={len(found):<6} COM reads={CountingItem.reads:<7} time={elapsed * 1000:8.1f} ms")
+    return elapsed
+
+
+if __name__ == '__main__':
+    test_folder = make_folder(20000)
+    fallback = run('fallback', test_folder, no_fastpath_search=True)
+    fast = run('fast path', test_folder)
+    print(f"fast path is {fallback / fast:.1f}x faster")
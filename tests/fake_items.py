@@ -0,0 +1,36 @@
+"""Stand-ins for Outlook collections, shared by the tests."""
+
+
+class CursorItems:
+    """
+    Items collection (or Items.Restrict result) that only supports the GetFirst/GetNext cursor and
+    counts the items read. Restrict ignores the filter and returns the collection itself.
+    """
+    def __init__(self, items):
+        self.items = list(items)
+        self.position = 0
+        self.reads = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def Count(self):
+        return len(self.items)
+
+    def Restrict(self, _filter):
+        return self
+
+    def _read(self):
+        if self.position >= len(self.items):
+            return None
+        self.reads += 1
+        self.position += 1
+        return self.items[self.position - 1]
+
+    def GetFirst(self):
+        self.position = 0
+        return self._read()
+
+    def GetNext(self):
+        return self._read()
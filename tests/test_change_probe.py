@@ -0,0 +1,141 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from PyEmailerAJM.backend import folder_key
+from PyEmailerAJM.continuous_monitor import ContinuousMonitor
+from PyEmailerAJM.continuous_monitor.backend import ChangeProbe, FolderFingerprint, FolderSync
+
+
+class DummyItem:
+    def __init__(self, received, unread=True):
+        self.ReceivedTime = received
+        self.LastModificationTime = received
+        self.UnRead = unread
+
+
+class DummyItems(list):
+    def __init__(self, items, folder):
+        super().__init__(items)
+        self._folder = folder
+        self._sort = None
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def Sort(self, prop, descending=False):
+        self._sort = (prop.strip('[]'), descending)
+
+    def GetFirst(self):
+        if not self:
+            return None
+        prop, descending = self._sort
+        return sorted(self, key=lambda x: getattr(x, prop), reverse=descending)[0]
+
+
+class DummyFolder:
+    def __init__(self, items):
+        self.StoreID = 'STORE'
+        self.EntryID = 'FOLDER'
+        self.items = items
+
+    @property
+    def Items(self):
+        return DummyItems(self.items, self)
+
+    @property
+    def UnReadItemCount(self):
+        return sum(1 for x in self.items if x.UnRead)
+
+
+class TestChangeProbe(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2025, 1, 1, 12, 0)
+        self.folder = DummyFolder([DummyItem(self.now - timedelta(hours=h)) for h in (1, 30, 60)])
+        self.probe = ChangeProbe(logger=MagicMock())
+
+    def run_cycle(self, deadlines=(), now=None) -> bool:
+        """ should_run, committed when it says to run (as if the full cycle succeeded) """
+        run = self.probe.should_run(self.folder, deadlines, now=now)
+        if run:
+            self.probe.commit(self.folder)
+        return run
+
+    def test_folder_key_is_shared_with_folder_sync(self):
+        folder = MagicMock(StoreID='store', EntryID='inbox')
+        self.assertEqual(ChangeProbe.folder_key(folder), ('store', 'inbox'))
+        self.assertIs(ChangeProbe.folder_key, folder_key)
+        self.assertIs(FolderSync.folder_key, folder_key)
+        anonymous = object()
+        self.assertEqual(folder_key(anonymous), ('id', id(anonymous)))
+
+    def test_fingerprint(self):
+        fingerprint = self.probe.fingerprint(self.folder)
+        self.assertEqual(fingerprint, FolderFingerprint(3, 3, self.now - timedelta(hours=1),
+                                                        self.now - timedelta(hours=1)))
+
+    def test_unchanged_folder_is_skipped(self):
+        self.assertTrue(self.run_cycle(now=self.now))
+        self.assertFalse(self.run_cycle(now=self.now + timedelta(minutes=10)))
+        self.assertEqual(self.probe.last_run(self.folder), self.now)
+
+    def test_changes_force_a_run(self):
+        self.run_cycle(now=self.now)
+        self.folder.items[0].UnRead = False
+        self.assertTrue(self.run_cycle(now=self.now))
+        self.folder.items.append(DummyItem(self.now))
+        self.assertTrue(self.run_cycle(now=self.now))
+
+    def test_passed_deadline_forces_a_run_once(self):
+        self.run_cycle(now=self.now)
+        deadline = self.now + timedelta(minutes=5)
+        self.assertFalse(self.run_cycle([deadline], now=self.now + timedelta(minutes=1)))
+        self.assertTrue(self.run_cycle([None, deadline], now=self.now + timedelta(minutes=6)))
+        self.assertFalse(self.run_cycle([deadline], now=self.now + timedelta(minutes=7)))
+
+    def test_uncommitted_run_is_run_again(self):
+        # the first cycle fails before commit
+        self.assertTrue(self.probe.should_run(self.folder, now=self.now))
+        self.assertIsNone(self.probe.last_run(self.folder))
+        self.assertTrue(self.run_cycle(now=self.now + timedelta(minutes=1)))
+        self.assertEqual(self.probe.last_run(self.folder), self.now + timedelta(minutes=1))
+
+        # a failed deadline run keeps the deadline pending
+        deadline = self.now + timedelta(minutes=5)
+        self.assertTrue(self.probe.should_run(self.folder, [deadline], now=self.now + timedelta(minutes=6)))
+        self.assertTrue(self.run_cycle([deadline], now=self.now + timedelta(minutes=7)))
+        self.assertFalse(self.run_cycle([deadline], now=self.now + timedelta(minutes=8)))
+
+
+class TestMonitorChangeProbe(unittest.TestCase):
+    def setUp(self):
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(None, MagicMock(), MagicMock())
+        )
+        self._init_email_patch.start()
+        now = datetime.now()
+        self.monitor = ContinuousMonitor(False, False, dev_mode=True, logger=MagicMock(), change_probe=True)
+        self.monitor.read_folder = DummyFolder([DummyItem(now - timedelta(hours=h)) for h in (1, 30)])
+        self.monitor.snooze_tracker = MagicMock(**{'next_expiry.return_value': None})
+        self.monitor.refresh_messages = MagicMock()
+        self.monitor.all_messages = []
+        self.monitor.record_full_cycle = MagicMock()
+        self.monitor._classify_and_process = MagicMock(side_effect=[RuntimeError('COM call failed'), None])
+
+    def tearDown(self):
+        self._init_email_patch.stop()
+
+    def test_failed_cycle_is_not_skipped_next_time(self):
+        with self.assertRaises(RuntimeError):
+            self.monitor.check_for_alerts()
+        self.monitor.check_for_alerts()
+        self.assertEqual(self.monitor._classify_and_process.call_count, 2)
+        # the successful cycle was recorded, an unchanged folder is skipped now
+        self.monitor.check_for_alerts()
+        self.assertEqual(self.monitor.refresh_messages.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
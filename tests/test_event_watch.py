@@ -0,0 +1,179 @@
+import threading
+import unittest
+from datetime import datetime, timedelta
+from time import monotonic
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from PyEmailerAJM.backend import TheSandman
+from PyEmailerAJM.continuous_monitor import ContinuousMonitor
+from PyEmailerAJM.continuous_monitor.backend import LocalEventSource, OutlookMailEventSource
+from PyEmailerAJM.continuous_monitor.backend import mail_events
+
+
+class TestLocalEventSource(unittest.TestCase):
+    def test_wait_returns_all_queued_entry_ids(self):
+        source = LocalEventSource()
+        source.emit('ID1', 'ID2')
+        source.emit(None, 'ID3')
+        self.assertEqual(source.wait(1), ['ID1', 'ID2', 'ID3'])
+
+    def test_wait_times_out_with_empty_list(self):
+        source = LocalEventSource(poll_interval=0.01)
+        start = monotonic()
+        self.assertEqual(source.wait(0.05), [])
+        self.assertGreaterEqual(monotonic() - start, 0.05)
+
+    def test_event_from_another_thread_wakes_wait(self):
+        source = LocalEventSource()
+        timer = threading.Timer(0.05, source.emit, args=('ID1',))
+        start = monotonic()
+        timer.start()
+        self.assertEqual(source.wait(5), ['ID1'])
+        self.assertLess(monotonic() - start, 1)
+
+
+class TestEventWatch(unittest.TestCase):
+    def setUp(self) -> None:
+        # Avoid actual COM/Outlook initialization
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(None, MagicMock(), MagicMock())
+        )
+        self._init_email_patch.start()
+        self.source = LocalEventSource(poll_interval=0.01)
+        self.monitor = ContinuousMonitor(False, False, dev_mode=True, logger=MagicMock(),
+                                         event_source=self.source)
+        self.monitor.read_folder = MagicMock(StoreID='STORE', EntryID='INBOX')
+        self.items = {}
+        self.monitor.namespace.GetItemFromID.side_effect = lambda entry_id, *args: self.items[entry_id]
+
+    def add_item(self, entry_id, folder_id='INBOX', received_time=None, unread=True):
+        self.items[entry_id] = SimpleNamespace(EntryID=entry_id, Parent=SimpleNamespace(EntryID=folder_id),
+                                               ReceivedTime=received_time or datetime.now(), UnRead=unread)
+
+    def tearDown(self) -> None:
+        self._init_email_patch.stop()
+
+    def test_new_items_are_checked_without_full_refresh(self):
+        self.monitor.check_for_alerts = MagicMock()
+        self.monitor.check_new_items = MagicMock(side_effect=lambda ids: stop.set())
+        stop = threading.Event()
+        self.source.emit('ID1', 'ID2')
+
+        self.monitor.event_watch(stop_condition=stop.is_set, reconcile_interval_seconds=60)
+        # one reconcile on start up, then only the new items
+        self.monitor.check_for_alerts.assert_called_once()
+        self.monitor.check_new_items.assert_called_once_with(['ID1', 'ID2'])
+        self.assertFalse(self.source.started)
+
+    def test_reconcile_runs_at_the_interval(self):
+        calls = []
+        self.monitor.check_for_alerts = MagicMock(side_effect=lambda: calls.append(monotonic()))
+        self.monitor.event_watch(stop_condition=lambda: len(calls) >= 2, reconcile_interval_seconds=0.05)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.05)
+
+    def test_stop_ends_event_watch(self):
+        self.monitor.check_for_alerts = MagicMock()
+        threading.Timer(0.05, self.monitor.stop).start()
+        start = monotonic()
+        self.monitor.event_watch(reconcile_interval_seconds=60)
+        self.assertLess(monotonic() - start, 0.5)
+
+    def test_check_new_items_opens_each_item_once(self):
+        self.monitor._get_alert_messages = MagicMock(return_value=[])
+        self.monitor.snooze_tracker = MagicMock()
+        self.add_item('ID1')
+        self.add_item('ID2')
+        self.monitor.check_new_items(['ID1', 'ID1', 'ID2'])
+        # NewMailEx ids can belong to any store, so no StoreID is passed
+        self.assertEqual([c.args for c in self.monitor.namespace.GetItemFromID.call_args_list],
+                         [('ID1',), ('ID2',)])
+        self.assertEqual(len(self.monitor._get_alert_messages.call_args.args[0]), 2)
+
+    def test_check_new_items_skips_items_of_other_folders(self):
+        self.monitor._get_alert_messages = MagicMock(return_value=[])
+        self.monitor.snooze_tracker = MagicMock()
+        self.add_item('ID1')
+        self.add_item('ID2', folder_id='OTHER_INBOX')
+        self.monitor.check_new_items(['ID1', 'ID2'])
+        self.assertEqual([m.entry_id for m in self.monitor._get_alert_messages.call_args.args[0]], ['ID1'])
+
+    def test_new_items_set_the_threshold_deadline(self):
+        self.monitor._get_alert_messages = MagicMock(return_value=[])
+        self.monitor.snooze_tracker = MagicMock()
+        self.monitor._event_watching = True
+        first_threshold = self.monitor.alert_thresholds_hours[0]
+        received_time = datetime.now() - timedelta(hours=first_threshold) + timedelta(minutes=5)
+        self.add_item('ID1', received_time=received_time)
+        self.add_item('ID2', unread=False)
+        self.monitor.check_new_items(['ID1', 'ID2'])
+        self.assertEqual(self.monitor.pending_received_times, [received_time])
+        self.assertAlmostEqual((self.monitor.threshold_deadline - datetime.now()).total_seconds(), 300, delta=5)
+
+    def test_event_watch_wakes_at_the_threshold_deadline(self):
+        calls = []
+        self.monitor.check_for_alerts = MagicMock(side_effect=lambda: calls.append(monotonic()))
+        self.monitor.threshold_deadline = datetime.now() + timedelta(seconds=0.1)
+        self.monitor.event_watch(stop_condition=lambda: len(calls) >= 2, reconcile_interval_seconds=60)
+        self.assertLess(calls[1] - calls[0], 1)
+
+
+class TestNewMailWake(unittest.TestCase):
+    def setUp(self) -> None:
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(None, MagicMock(), MagicMock())
+        )
+        self._init_email_patch.start()
+        self.handlers = []
+        self._with_events_patch = patch.object(mail_events.win32, 'WithEvents', side_effect=self.with_events)
+        self._with_events_patch.start()
+        self.source = OutlookMailEventSource(logger=MagicMock())
+        self.monitor = ContinuousMonitor(False, False, dev_mode=True, logger=MagicMock(), event_source=self.source)
+        self.monitor.read_folder = MagicMock(StoreID='STORE', EntryID='INBOX')
+        self.monitor.snooze_tracker = MagicMock(**{'next_expiry.return_value': None})
+        self.monitor.sleep_timer = TheSandman(sleep_time_seconds=60, use_visual_sleep=False, logger=MagicMock())
+
+    def tearDown(self) -> None:
+        self._with_events_patch.stop()
+        self._init_email_patch.stop()
+
+    def with_events(self, _com_object, handler_class):
+        handler = type('Events', (handler_class,), {'close': lambda _self: None})()
+        self.handlers.append(handler)
+        return handler
+
+    def test_item_add_ends_the_sleep_between_cycles(self):
+        calls = []
+
+        def check_for_alerts():
+            calls.append(monotonic())
+            if len(calls) == 2:
+                self.monitor.stop()
+
+        self.monitor.check_for_alerts = MagicMock(side_effect=check_for_alerts)
+        item_added = threading.Event()
+        threading.Timer(0.1, item_added.set).start()
+
+        def pump():
+            # COM delivers ItemAdd on the thread that pumps messages
+            if item_added.is_set() and len(calls) == 1:
+                item_added.clear()
+                self.handlers[0].OnItemAdd(SimpleNamespace(EntryID='ID1'))
+
+        with patch.object(mail_events.pythoncom, 'PumpWaitingMessages', side_effect=pump):
+            self.monitor.endless_watch()
+        self.assertLess(calls[1] - calls[0], 5)
+        self.assertFalse(self.source.started)
+        self.assertIsNone(self.monitor.sleep_timer.pump)
+
+    def test_no_subscription_without_wake_on_new_mail(self):
+        self.monitor.wake_on_new_mail = False
+        self.monitor.check_for_alerts = MagicMock(side_effect=self.monitor.stop)
+        self.monitor.endless_watch()
+        self.assertEqual(self.handlers, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
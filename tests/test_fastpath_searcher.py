@@ -0,0 +1,212 @@
+import re
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.msg import Msg
+from PyEmailerAJM.searchers import SubjectSearcher, AttributeSearcher
+
+from fake_items import CursorItems
+
+
+class FakeStoreItems:
+    """Evaluates the LIKE / ci_startswith subject filters the way the store would (case-insensitive)."""
+    def __init__(self, items):
+        self.items = items
+        self.filters = []
+
+    def Sort(self, *args):
+        pass
+
+    def Restrict(self, sql_filter):
+        self.filters.append(sql_filter)
+        like = re.search(r"LIKE '%(.*)%'$", sql_filter)
+        if like:
+            needle = like.group(1).replace("''", "'").lower()
+            return CursorItems([i for i in self.items if needle in i.Subject.lower()])
+        starts = re.search(r"ci_startswith '(.*)'$", sql_filter)
+        if starts:
+            needle = starts.group(1).lower()
+            return CursorItems([i for i in self.items
+                                   if any(w.startswith(needle) for w in i.Subject.lower().split())])
+        raise ValueError(f"unsupported filter {sql_filter}")
+
+
+def make_items():
+    subjects = ['Undeliverable: Weekly Report', 'RE: undeliverable: hello', 'FW: Lunch', 'Report undeliverables',
+                "Bob's report", 'Nothing here', 'Weekly']
+    return [SimpleNamespace(Subject=s) for s in subjects]
+
+
+class TestSubjectFastPath(unittest.TestCase):
+    def setUp(self) -> None:
+        self.items = make_items()
+        self.store_items = FakeStoreItems(self.items)
+        self.folder = MagicMock()
+        self.folder.Items = self.store_items
+        self.folder.Store.IsInstantSearchEnabled = True
+        self.get_messages = MagicMock(return_value=[])
+        self.searcher = SubjectSearcher(logger=MagicMock(), get_messages=self.get_messages,
+                                        get_folder=lambda: self.folder)
+
+    def test_partial_match_is_restricted_server_side(self):
+        found = self.searcher.find_messages_by_subject('undeliverable', partial_match_ok=True,
+                                                       reverse_partial_match=False)
+        self.assertEqual([i.Subject for i in found], ['Undeliverable: Weekly Report', 'RE: undeliverable: hello',
+                                                      'Report undeliverables'])
+        self.assertEqual(self.store_items.filters,
+                         ['@SQL="http://schemas.microsoft.com/mapi/proptag/0x0037001F" LIKE \'%undeliverable%\''])
+        self.get_messages.assert_not_called()
+
+    def test_quotes_are_escaped(self):
+        found = self.searcher.find_messages_by_subject("bob's", partial_match_ok=True, reverse_partial_match=False)
+        self.assertEqual([i.Subject for i in found], ["Bob's report"])
+        self.assertIn("LIKE '%bob''s%'", self.store_items.filters[0])
+
+    def test_content_index_is_opt_in(self):
+        found = self.searcher.find_messages_by_subject('undeliverable', partial_match_ok=True, use_content_index=True,
+                                                       reverse_partial_match=False)
+        self.assertIn("ci_startswith 'undeliverable'", self.store_items.filters[0])
+        self.assertEqual(len(found), 3)
+
+        self.folder.Store.IsInstantSearchEnabled = False
+        self.searcher.find_messages_by_subject('undeliverable', partial_match_ok=True, use_content_index=True,
+                                               reverse_partial_match=False)
+        self.assertIn("LIKE", self.store_items.filters[1])
+
+    def test_results_are_reconciled_with_the_python_matcher(self):
+        # a store that ignores the filter must not produce extra hits
+        self.store_items.Restrict = lambda sql_filter: CursorItems(self.items)
+        found = self.searcher.find_messages_by_subject('weekly', partial_match_ok=True, reverse_partial_match=False)
+        self.assertEqual([i.Subject for i in found], ['Undeliverable: Weekly Report', 'Weekly'])
+
+    def test_partial_match_scans_for_subjects_contained_in_the_search(self):
+        self.get_messages.return_value = [Msg(i) for i in self.items]
+        found = self.searcher.find_messages_by_subject('weekly report card', partial_match_ok=True)
+        self.assertEqual([i.Subject for i in found], ['Weekly'])
+        self.assertEqual(self.store_items.filters, [])
+
+    def test_fast_path_and_scan_return_the_same_partial_matches(self):
+        self.get_messages.return_value = [Msg(i) for i in self.items]
+        for search_str in ('undeliverable', 'weekly report card', 'lunch', "bob's"):
+            for reverse in (True, False):
+                with self.subTest(search_str=search_str, reverse=reverse):
+                    fast = self.searcher.find_messages_by_subject(search_str, partial_match_ok=True,
+                                                                  reverse_partial_match=reverse)
+                    scan = self.searcher.find_messages_by_subject(search_str, partial_match_ok=True,
+                                                                  reverse_partial_match=reverse,
+                                                                  no_fastpath_search=True)
+                    self.assertEqual(fast, scan)
+        # only the searches without reverse matches were restricted
+        self.assertEqual(len(self.store_items.filters), 4)
+
+    def test_unsupported_search_falls_back_to_scan(self):
+        self.get_messages.return_value = [MagicMock(return_value='HIT', subject='100% done')]
+        found = self.searcher.find_messages_by_subject('100%', partial_match_ok=True)
+        self.assertEqual(found, ['HIT'])
+        self.assertEqual(self.store_items.filters, [])
+
+    def test_exact_filter_is_a_superset_covering_prefixes(self):
+        sql = self.searcher._build_sql_filter(' Weekly Report ', False)
+        self.assertEqual(sql, '@SQL="http://schemas.microsoft.com/mapi/proptag/0x0037001F" LIKE \'%Weekly Report%\'')
+        found = self.searcher.find_messages_by_subject('weekly report')
+        self.assertEqual([i.Subject for i in found], [])
+        found = self.searcher.find_messages_by_subject('undeliverable: weekly report')
+        self.assertEqual([i.Subject for i in found], ['Undeliverable: Weekly Report'])
+
+
+
+class TestAttributeFastPath(unittest.TestCase):
+    def setUp(self) -> None:
+        self.items = [SimpleNamespace(SenderName='Alice Smith', To='Bob; Carol', UnRead=True, Size=10),
+                      SimpleNamespace(SenderName='Bob Jones', To='Alice', UnRead=False, Size=20)]
+        self.filters = []
+        self.rejected = ()
+        self.folder = MagicMock()
+        self.folder.Items.Restrict.side_effect = self._restrict
+        self.get_messages = MagicMock(return_value=[])
+
+    def _restrict(self, sql_filter):
+        self.filters.append(sql_filter)
+        if sql_filter.startswith(self.rejected):
+            raise ValueError('unknown property')
+        # the store "matches" everything, the searcher reconciles
+        return CursorItems(self.items)
+
+    def search(self, attribute, search_str, partial_match_ok=False, **kwargs):
+        searcher = AttributeSearcher(attribute, logger=MagicMock(), get_messages=self.get_messages,
+                                     get_folder=lambda: self.folder)
+        return searcher.find_messages_by_attribute(search_str, partial_match_ok=partial_match_ok, **kwargs)
+
+    def test_sender_partial_match_uses_dasl(self):
+        found = self.search('sendername', 'alice', partial_match_ok=True, reverse_partial_match=False)
+        self.assertEqual([i.SenderName for i in found], ['Alice Smith'])
+        self.assertEqual(self.filters, ['@SQL="http://schemas.microsoft.com/mapi/proptag/0x0C1A001F" LIKE \'%alice%\''])
+        self.get_messages.assert_not_called()
+
+    def test_exact_text_match_uses_like(self):
+        found = self.search('To', 'alice')
+        self.assertEqual([i.SenderName for i in found], ['Bob Jones'])
+        self.assertEqual(self.filters, ['@SQL="http://schemas.microsoft.com/mapi/proptag/0x0E04001F" LIKE \'%alice%\''])
+
+    def test_fast_path_and_scan_agree_on_surrounding_whitespace(self):
+        items = [SimpleNamespace(Body='deploy ok\r\n'), SimpleNamespace(Body='  Deploy OK'),
+                 SimpleNamespace(Body='deploy ok, mostly')]
+        self.items = items
+
+        def like_restrict(sql_filter):
+            self.filters.append(sql_filter)
+            needle = re.search(r"LIKE '%(.*)%'$", sql_filter).group(1).lower()
+            return CursorItems([i for i in items if needle in i.Body.lower()])
+        self.folder.Items.Restrict.side_effect = like_restrict
+        self.get_messages.return_value = [MagicMock(return_value=i, Body=i.Body) for i in items]
+
+        for search_str in ('deploy ok', ' deploy ok '):
+            with self.subTest(search_str=search_str):
+                fast = self.search('Body', search_str)
+                scan = self.search('Body', search_str, no_fastpath_search=True)
+                self.assertEqual(fast, items[:2])
+                self.assertEqual(fast, scan)
+
+    def test_fast_path_and_scan_return_the_same_partial_matches(self):
+        self.get_messages.return_value = [MagicMock(return_value=i, SenderName=i.SenderName, To=i.To)
+                                          for i in self.items]
+        for attribute, search_str in (('SenderName', 'alice'), ('SenderName', 'alice smith jr'), ('To', 'carol'),
+                                      ('To', 'alice and bob')):
+            for reverse in (True, False):
+                with self.subTest(attribute=attribute, search_str=search_str, reverse=reverse):
+                    fast = self.search(attribute, search_str, True, reverse_partial_match=reverse)
+                    scan = self.search(attribute, search_str, True, reverse_partial_match=reverse,
+                                       no_fastpath_search=True)
+                    self.assertEqual(fast, scan)
+        self.assertEqual(self.search('SenderName', 'alice smith jr', True), self.items[:1])
+        # only the searches without reverse matches were restricted
+        self.assertEqual(len(self.filters), 4)
+
+    def test_booleans_and_numbers_are_typed(self):
+        self.rejected = ('([',)
+        found = self.search('UnRead', 'True')
+        self.assertEqual([i.SenderName for i in found], ['Alice Smith'])
+        self.assertEqual(self.filters, ['([UnRead] = True)', '@SQL=("urn:schemas:httpmail:read" = 0)'])
+        self.search('Size', '20')
+        self.assertEqual(self.filters[2:], ['([Size] = 20)',
+                                            '@SQL=("http://schemas.microsoft.com/mapi/proptag/0x0E080003" = 20)'])
+
+    def test_unsupported_searches_scan(self):
+        for attribute, search_str, partial in (('Size', '2', True), ('UnRead', 'maybe', False),
+                                               ('ReceivedTime', '2025', True), ('NotAnAlias', 'x', False)):
+            with self.subTest(attribute=attribute):
+                self.get_messages.reset_mock()
+                self.search(attribute, search_str, partial)
+                self.get_messages.assert_called_once()
+        self.assertEqual(self.filters, [])
+
+    def test_every_filter_rejected_scans(self):
+        self.rejected = ('(', '@SQL')
+        self.search('Size', '10')
+        self.assertEqual(len(self.filters), 2)
+        self.get_messages.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+# noinspection PyUnresolvedReferences
+from pywintypes import com_error
+
+from PyEmailerAJM.backend import BasicEmailFolderChoices, FolderNotFoundError
+from PyEmailerAJM.backend.folder_resolver import FolderResolver
+from PyEmailerAJM.py_emailer_ajm import PyEmailer
+
+
+class FakeFolders:
+    def __init__(self, owner):
+        self.owner = owner
+        self.children = {}
+        self.lookups = 0
+
+    def __getitem__(self, name):
+        self.lookups += 1
+        for child_name, child in self.children.items():
+            if child_name.casefold() == name.casefold():
+                return child
+        raise com_error(f'{name} not found')
+
+
+class FakeFolder:
+    def __init__(self, name, store_id='store-1'):
+        self.name = name
+        self.StoreID = store_id
+        self._entry_id = f'entry-{name}'
+        self.stale = False
+        self.Folders = FakeFolders(self)
+
+    @property
+    def EntryID(self):
+        if self.stale:
+            raise com_error('RPC server is unavailable')
+        return self._entry_id
+
+    def add(self, name):
+        child = self.Folders.children[name] = FakeFolder(name, self.StoreID)
+        return child
+
+
+class TestFolderResolver(unittest.TestCase):
+    def setUp(self) -> None:
+        self.namespace = MagicMock()
+        self.root = FakeFolder('root')
+        self.mailbox = self.root.add('Shared Mailbox')
+        self.inbox = self.mailbox.add('Inbox')
+        self.alerts = self.inbox.add('Alerts')
+        self.namespace.Folders = self.root.Folders
+        self.namespace.GetDefaultFolder.side_effect = lambda index: FakeFolder(f'default-{index}')
+        self.namespace.GetFolderFromID.side_effect = com_error('not found')
+        self.resolver = FolderResolver(lambda: self.namespace, logger=MagicMock())
+
+    def test_deep_path_is_resolved_and_cached(self):
+        self.assertIs(self.resolver.resolve_path('Shared Mailbox/Inbox/Alerts'), self.alerts)
+        lookups = (self.root.Folders.lookups, self.mailbox.Folders.lookups, self.inbox.Folders.lookups)
+        self.assertEqual(lookups, (1, 1, 1))
+
+        self.assertIs(self.resolver.resolve_path('shared mailbox\\INBOX\\alerts'), self.alerts)
+        self.assertIs(self.resolver.resolve_path(('Shared Mailbox', 'Inbox')), self.inbox)
+        self.assertEqual((self.root.Folders.lookups, self.mailbox.Folders.lookups, self.inbox.Folders.lookups),
+                         lookups)
+
+    def test_default_folder_is_cached(self):
+        first = self.resolver.default_folder(BasicEmailFolderChoices.INBOX)
+        self.assertIs(self.resolver.default_folder(BasicEmailFolderChoices.INBOX), first)
+        self.assertIsNot(self.resolver.default_folder(BasicEmailFolderChoices.SENT_ITEMS), first)
+        self.assertEqual(self.namespace.GetDefaultFolder.call_count, 2)
+
+    def test_stale_handle_is_reopened_by_id(self):
+        self.resolver.resolve_path('Shared Mailbox/Inbox/Alerts')
+        reopened = FakeFolder('Alerts')
+        self.namespace.GetFolderFromID.side_effect = None
+        self.namespace.GetFolderFromID.return_value = reopened
+        self.alerts.stale = True
+
+        self.assertIs(self.resolver.resolve_path('Shared Mailbox/Inbox/Alerts'), reopened)
+        self.namespace.GetFolderFromID.assert_called_once_with('entry-Alerts', 'store-1')
+        self.assertEqual(self.inbox.Folders.lookups, 1)
+
+    def test_stale_handle_is_resolved_again(self):
+        self.resolver.resolve_path('Shared Mailbox/Inbox/Alerts')
+        self.alerts.stale = True
+        new_alerts = self.inbox.add('Alerts')
+
+        self.assertIs(self.resolver.resolve_path('Shared Mailbox/Inbox/Alerts'), new_alerts)
+        self.assertEqual(self.inbox.Folders.lookups, 2)
+        # the parents were still valid
+        self.assertEqual(self.root.Folders.lookups, 1)
+
+    def test_missing_folder_raises(self):
+        with self.assertRaises(FolderNotFoundError):
+            self.resolver.resolve_path('Shared Mailbox/Nope')
+        with self.assertRaisesRegex(FolderNotFoundError, "'Nope' not found"):
+            self.resolver.resolve_path('Nope/Inbox/Alerts')
+        with self.assertRaises(FolderNotFoundError):
+            self.resolver.resolve_path('/')
+
+    def test_invalidate_drops_subfolders(self):
+        self.resolver.resolve_path('Shared Mailbox/Inbox/Alerts')
+        self.resolver.default_folder(BasicEmailFolderChoices.INBOX)
+        self.resolver.invalidate('Shared Mailbox/Inbox')
+        self.assertEqual(self.resolver.cached_keys, [('path', 'shared mailbox'),
+                                                     ('default', None, BasicEmailFolderChoices.INBOX.value)])
+        self.resolver.invalidate()
+        self.assertEqual(self.resolver.cached_keys, [])
+
+
+class TestPyEmailerFolderResolution(unittest.TestCase):
+    def setUp(self) -> None:
+        self.namespace = MagicMock()
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(MagicMock(), self.namespace, MagicMock()))
+        self._init_email_patch.start()
+        self.addCleanup(self._init_email_patch.stop)
+        self.emailer = PyEmailer(display_window=False, send_emails=False, logger=MagicMock())
+
+    def test_default_folder_is_looked_up_once(self):
+        for _ in range(3):
+            self.emailer.GetMessages(BasicEmailFolderChoices.INBOX)
+        self.namespace.GetDefaultFolder.assert_called_once_with(BasicEmailFolderChoices.INBOX)
+
+    def test_folder_path(self):
+        folder = self.emailer._GetReadFolder('Shared Mailbox/Inbox/Alerts', subfolder_name='Ignored')
+        self.assertIs(folder, self.namespace.Folders['Shared Mailbox'].Folders['Inbox'].Folders['Alerts'])
+        self.assertIs(self.emailer._GetReadFolder('Shared Mailbox', subfolder_name='Inbox'),
+                      self.namespace.Folders['Shared Mailbox'].Folders['Inbox'])
+
+    def test_bad_path_raises_com_error(self):
+        self.namespace.Folders.__getitem__.side_effect = com_error('not found')
+        for folder_index in ('Nope/Inbox', 'Nope'):
+            with self.subTest(folder_index=folder_index):
+                # callers catching com_error, as they did before FolderResolver, still catch it
+                with self.assertRaises(com_error):
+                    self.emailer._set_read_folder(folder_index)
+
+    def test_invalid_index_still_raises(self):
+        with self.assertRaises(ValueError):
+            self.emailer._GetReadFolder(999)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+from PyEmailerAJM.continuous_monitor import ContinuousMonitor
+from PyEmailerAJM.continuous_monitor.backend import FolderSync, SyncDiff
+
+
+class DummyItem:
+    def __init__(self, entry_id, modified):
+        self.EntryID = entry_id
+        self.LastModificationTime = modified
+        self.Subject = f"subject {entry_id}"
+
+
+class DummyItems(list):
+    """List of DummyItems that evaluates the watermark filter the way Items.Restrict would."""
+
+    def __init__(self, items, folder):
+        super().__init__(items)
+        self._folder = folder
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def Restrict(self, sql):
+        self._folder.restrict_filters.append(sql)
+        watermark = datetime.strptime(sql.split("'")[1], FolderSync.RESTRICT_DATE_FORMAT)
+        return DummyItems([x for x in self if x.LastModificationTime >= watermark], self._folder)
+
+
+class DummyFolder:
+    def __init__(self, items):
+        self.StoreID = 'STORE'
+        self.EntryID = 'FOLDER'
+        self.items = items
+        self.restrict_filters = []
+        self.enumerations = 0
+
+    @property
+    def Items(self):
+        self.enumerations += 1
+        return DummyItems(self.items, self)
+
+    def GetTable(self):
+        raise AttributeError('GetTable')
+
+
+class TestFolderSync(unittest.TestCase):
+    def setUp(self):
+        self.base_time = datetime(2025, 1, 1, 9, 0)
+        self.folder = DummyFolder([DummyItem(f'ID{i}', self.base_time + timedelta(minutes=i))
+                                   for i in range(3)])
+        self.sync = FolderSync(logger=MagicMock())
+
+    def test_first_sync_adds_everything_and_sets_watermark(self):
+        diff = self.sync.sync(self.folder)
+        self.assertIsInstance(diff, SyncDiff)
+        self.assertEqual(len(diff.added), 3)
+        self.assertEqual(diff.changed, [])
+        self.assertEqual(self.sync.watermark(self.folder), self.base_time + timedelta(minutes=2))
+        self.assertTrue(self.sync.has_synced(self.folder))
+        self.assertEqual(self.folder.restrict_filters, [])
+
+    def test_second_sync_uses_restrict_and_skips_unchanged(self):
+        self.sync.sync(self.folder)
+        diff = self.sync.sync(self.folder)
+        self.assertFalse(diff.has_changes)
+        self.assertEqual(len(self.folder.restrict_filters), 1)
+        self.assertIn('[LastModificationTime] >=', self.folder.restrict_filters[0])
+
+    def test_added_and_changed_items_are_reported(self):
+        self.sync.sync(self.folder)
+        self.folder.items[0].LastModificationTime = self.base_time + timedelta(minutes=10)
+        self.folder.items.append(DummyItem('ID9', self.base_time + timedelta(minutes=11)))
+        diff = self.sync.sync(self.folder)
+        self.assertEqual([m().EntryID for m in diff.added], ['ID9'])
+        self.assertEqual([m().EntryID for m in diff.changed], ['ID0'])
+        self.assertEqual(len(self.sync.messages(self.folder)), 4)
+
+    def test_removed_items_detected_when_count_differs(self):
+        self.sync.sync(self.folder)
+        del self.folder.items[1]
+        diff = self.sync.sync(self.folder)
+        self.assertEqual(diff.removed, ['ID1'])
+        self.assertEqual(len(self.sync.messages(self.folder)), 2)
+
+    def test_subscribers_receive_only_diffs_with_changes(self):
+        received = []
+        self.sync.subscribe(received.append)
+        self.sync.sync(self.folder)
+        self.sync.sync(self.folder)
+        self.assertEqual(len(received), 1)
+        self.sync.unsubscribe(received.append)
+        self.folder.items.append(DummyItem('ID9', self.base_time + timedelta(minutes=11)))
+        self.sync.sync(self.folder)
+        self.assertEqual(len(received), 1)
+
+
+class MailItem(DummyItem):
+    """DummyItem with the properties read by alert classification, counting the UnRead reads."""
+
+    def __init__(self, entry_id, modified, unread=True):
+        super().__init__(entry_id, modified)
+        self._unread = unread
+        self.unread_reads = 0
+        self.ReceivedTime = datetime.now() - timedelta(days=30)
+        self.HTMLBody = ''
+        self.Attachments = []
+
+    @property
+    def UnRead(self):
+        self.unread_reads += 1
+        return self._unread
+
+    @UnRead.setter
+    def UnRead(self, value):
+        self._unread = value
+
+
+class TestMonitorFolderSync(unittest.TestCase):
+    def setUp(self):
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(None, MagicMock(), MagicMock())
+        )
+        self._init_email_patch.start()
+        self._keywords_patch = patch.object(ContinuousMonitor.MSG_FACTORY_CLASS, 'ALERT_SUBJECT_KEYWORDS', ['subject'])
+        self._keywords_patch.start()
+        self.base_time = datetime(2025, 1, 1, 9, 0)
+        self.folder = DummyFolder([MailItem('ID0', self.base_time, unread=False)] +
+                                  [MailItem(f'ID{i}', self.base_time + timedelta(minutes=i)) for i in (1, 2)])
+        self.monitor = ContinuousMonitor(False, False, dev_mode=True, logger=MagicMock(), incremental_sync=True)
+        self.monitor.read_folder = self.folder
+        self.monitor.snooze_tracker = MagicMock(**{'read_entry.return_value': None,
+                                                   'begin_cycle.return_value': datetime.now()})
+        self.monitor.GetMessages = MagicMock(side_effect=AssertionError('folder enumerated again'))
+
+    def tearDown(self):
+        self._keywords_patch.stop()
+        self._init_email_patch.stop()
+
+    def test_only_unread_messages_are_classified(self):
+        self.monitor.refresh_messages()
+        self.assertEqual(sorted(m.entry_id for m in self.monitor.sync_candidates()), ['ID1', 'ID2'])
+        self.assertEqual(sorted(m.entry_id for m in self.monitor.all_messages), ['ID1', 'ID2'])
+
+    def test_unchanged_messages_are_classified_from_their_snapshot(self):
+        self.monitor.refresh_messages()
+        reads = [item.unread_reads for item in self.folder.items]
+        self.monitor.refresh_messages()
+        self.assertEqual([item.unread_reads for item in self.folder.items], reads)
+        self.assertEqual(len(self.monitor.all_messages), 2)
+
+    def test_changed_and_removed_messages_update_the_candidates(self):
+        self.monitor.refresh_messages()
+        self.folder.items[1].UnRead = False
+        self.folder.items[1].LastModificationTime = self.base_time + timedelta(minutes=10)
+        self.folder.items[0].UnRead = True
+        self.folder.items[0].LastModificationTime = self.base_time + timedelta(minutes=11)
+        del self.folder.items[2]
+        self.monitor.refresh_messages()
+        self.assertEqual([m.entry_id for m in self.monitor.sync_candidates()], ['ID0'])
+        self.assertEqual([m.entry_id for m in self.monitor.all_messages], ['ID0'])
+
+
+if __name__ == '__main__':
+    unittest.main()
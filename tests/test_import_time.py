@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+def run_python(*args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+class TestImportTime(unittest.TestCase):
+    # the import time itself is measured by benchmarks/bench_import_time.py
+    HEAVY_MODULES = ('win32com', 'questionary', 'prompt_toolkit', 'email_validator', 'extract_msg', 'bs4',
+                     'tqdm', 'ColorizerAJM', 'EasyLoggerAJM', 'pythoncom', 'sqlite3')
+
+    def test_heavy_dependencies_load_on_first_use(self):
+        code = ("import sys, PyEmailerAJM\n"
+                f"print(','.join(m for m in {self.HEAVY_MODULES!r} if m in sys.modules))\n"
+                "PyEmailerAJM.SearcherFactory, PyEmailerAJM.Msg\n"
+                "print('win32com' in sys.modules, 'EasyLoggerAJM' in sys.modules)\n")
+        loaded_on_import, after_first_use = run_python('-c', code).stdout.splitlines()
+        self.assertEqual(loaded_on_import, '')
+        self.assertEqual(after_first_use, 'True False')
+
+    def test_lazy_names_resolve(self):
+        import PyEmailerAJM
+        from PyEmailerAJM.msg import MsgFactory
+        self.assertIs(PyEmailerAJM.Msg, PyEmailerAJM.msg.Msg)
+        self.assertIs(PyEmailerAJM.msg.MsgFactory, MsgFactory)
+        self.assertIn('ContinuousMonitor', dir(PyEmailerAJM))
+        with self.assertRaises(AttributeError):
+            PyEmailerAJM.NotAThing
+
+
+if __name__ == '__main__':
+    unittest.main()
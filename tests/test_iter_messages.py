@@ -0,0 +1,81 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from PyEmailerAJM.continuous_monitor import ContinuousMonitor
+from PyEmailerAJM.msg import MsgFactory
+from PyEmailerAJM.py_emailer_ajm import PyEmailer
+from PyEmailerAJM.searchers import SearcherFactory
+
+from fake_items import CursorItems
+
+
+class TestIterMessages(unittest.TestCase):
+    def setUp(self) -> None:
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(MagicMock(), MagicMock(), MagicMock()))
+        self._init_email_patch.start()
+        self.addCleanup(self._init_email_patch.stop)
+        self.items = CursorItems([SimpleNamespace(Subject=f'subject {i}', EntryID=f'ID{i}') for i in range(100)])
+        self.folder = MagicMock(StoreID='STORE')
+        self.folder.Items = self.items
+        self.emailer = PyEmailer(display_window=False, send_emails=False, logger=MagicMock())
+        self.emailer.read_folder = self.folder
+
+    def test_iter_messages_walks_the_cursor_lazily(self):
+        messages = self.emailer.iter_messages()
+        self.assertEqual(self.items.reads, 0)
+        first = next(messages)
+        self.assertEqual(first.subject, 'subject 0')
+        self.assertEqual(self.items.reads, 1)
+        self.assertEqual(len(list(messages)), 99)
+
+    def test_get_messages_still_returns_a_list(self):
+        self.folder.Items = [SimpleNamespace(Subject='a'), SimpleNamespace(Subject='b')]
+        msgs = self.emailer.GetMessages()
+        self.assertIsInstance(msgs, list)
+        self.assertEqual([m.subject for m in msgs], ['a', 'b'])
+
+    def test_searcher_stops_at_max_results(self):
+        searcher = SearcherFactory.get_searcher('attribute', attribute='Subject',
+                                                py_emailer=self.emailer, logger=MagicMock())
+        found = searcher.fetch_matched_messages('subject 1', 'Subject', partial_match_ok=True, max_results=2)
+        self.assertEqual([m.Subject for m in found], ['subject 1', 'subject 10'])
+        self.assertEqual(self.items.reads, 11)
+
+    def test_default_searcher_streams(self):
+        self.emailer.searcher.fetch_matched_messages('subject 3', 'subject', max_results=1)
+        self.assertEqual(self.items.reads, 4)
+
+
+class TestContinuousMonitorIterMessages(unittest.TestCase):
+    def setUp(self) -> None:
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(MagicMock(), MagicMock(), MagicMock()))
+        self._init_email_patch.start()
+        self.addCleanup(self._init_email_patch.stop)
+        self.monitor = ContinuousMonitor(False, False, dev_mode=True, logger=MagicMock())
+        self.monitor.snooze_tracker = MagicMock()
+        self.items = CursorItems([SimpleNamespace(Subject=f'subject {i}', alert=i % 10 == 9) for i in range(50)])
+        self.monitor.read_folder = MagicMock(StoreID='STORE')
+        self.monitor.read_folder.Items = self.items
+        get_msg = patch.object(MsgFactory, 'get_msg',
+                               side_effect=lambda m, **kwargs: MagicMock(msg_alert=True, msg=m) if m().alert else None)
+        get_msg.start()
+        self.addCleanup(get_msg.stop)
+
+    def test_alert_messages_are_classified_as_they_are_read(self):
+        first_alert = next(self.monitor.iter_messages())
+        self.assertEqual(first_alert.msg.subject, 'subject 9')
+        self.assertEqual(self.items.reads, 10)
+        self.monitor.snooze_tracker.begin_cycle.assert_called_once()
+
+    def test_get_messages_returns_every_alert(self):
+        self.assertEqual(len(self.monitor.GetMessages()), 5)
+        self.assertEqual(self.items.reads, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from PyEmailerAJM.continuous_monitor import ContinuousMonitor
+from PyEmailerAJM.py_emailer_ajm import PyEmailer
+
+
+class TestLazyInit(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app, self.namespace, self.email = MagicMock(), MagicMock(), MagicMock()
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(self.app, self.namespace, self.email))
+        self.init_email = self._init_email_patch.start()
+        self.addCleanup(self._init_email_patch.stop)
+
+    def test_com_objects_are_created_on_first_use(self):
+        emailer = PyEmailer(display_window=False, send_emails=False, logger=MagicMock())
+        self.init_email.assert_not_called()
+        self.assertIs(emailer.namespace, self.namespace)
+        self.assertIs(emailer.email_app, self.app)
+        self.assertIs(emailer.email, self.email)
+        self.init_email.assert_called_once()
+
+    def test_set_values_are_not_replaced(self):
+        emailer = PyEmailer(display_window=False, send_emails=False, logger=MagicMock())
+        namespace = MagicMock()
+        emailer.namespace = namespace
+        self.assertIs(emailer.namespace, namespace)
+        self.init_email.assert_not_called()
+
+    def test_failed_initialization_is_retried(self):
+        emailer = PyEmailer(display_window=False, send_emails=False, logger=MagicMock())
+        self.init_email.side_effect = [RuntimeError('outlook not running'), (self.app, self.namespace, self.email)]
+        with self.assertRaises(RuntimeError):
+            _ = emailer.namespace
+        self.assertIs(emailer.namespace, self.namespace)
+
+    @patch('PyEmailerAJM.searchers.SearcherFactory.get_searcher')
+    def test_warm_up_creates_everything(self, get_searcher):
+        monitor = ContinuousMonitor(False, False, dev_mode=True, logger=MagicMock(),
+                                    sleep_timer=MagicMock(), snooze_tracker=MagicMock(), colorizer=MagicMock())
+        self.init_email.assert_not_called()
+        get_searcher.assert_not_called()
+        self.assertIsNone(monitor._sleep_timer)
+
+        self.assertIs(monitor.warm_up(), monitor)
+        self.init_email.assert_called_once()
+        get_searcher.assert_called_once()
+        self.assertIsNotNone(monitor._sleep_timer)
+        self.assertIs(monitor.searcher, get_searcher.return_value)
+
+    def test_helper_set_before_first_use_is_kept(self):
+        monitor = ContinuousMonitor(False, False, dev_mode=True, logger=MagicMock(),
+                                    sleep_timer=MagicMock(), snooze_tracker=MagicMock(), colorizer=MagicMock())
+        snooze_tracker = MagicMock()
+        monitor.snooze_tracker = snooze_tracker
+        self.assertIsNotNone(monitor.colorizer)
+        self.assertIs(monitor.snooze_tracker, snooze_tracker)
+
+
+if __name__ == '__main__':
+    unittest.main()
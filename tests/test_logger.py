@@ -1,8 +1,12 @@
+import tempfile
+import threading
 import unittest
+from pathlib import Path
+from time import monotonic, sleep
 from unittest.mock import patch, MagicMock
 import logging
 
-from PyEmailerAJM.backend.logger import PyEmailerLogger
+from PyEmailerAJM.backend.logger import PyEmailerLogger, DupeDebugFilter, BufferedHandler, ComThreadHandler
 
 
 # FIXME: some of these tests are flakey
@@ -30,7 +34,7 @@ class TestPyEmailerLogger(unittest.TestCase):
         handler.level = logging.WARNING  # Set a valid logging level
 
         self.logger._add_dupe_debug_to_handler(handler)
-        mock_dupe_debug_filter.assert_called_once()
+        mock_dupe_debug_filter.assert_called_once_with(cache=self.logger.dedupe_cache)
         handler.addFilter.assert_called_once_with(mock_dupe_debug_filter.return_value)
 
     @unittest.skip("Skipping this test because it's under development")
@@ -88,5 +92,150 @@ class TestPyEmailerLogger(unittest.TestCase):
         mock_stream_handler.assert_called_once()
 
 
+class RecordingHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.add(threading.current_thread().name)
+
+
+class TestPyEmailerLoggerAsync(unittest.TestCase):
+    def setUp(self) -> None:
+        from EasyLoggerAJM.easy_logger import EasyLogger
+        self._post_handler_patcher = patch.object(EasyLogger, 'post_handler_setup', autospec=True)
+        self._post_handler_patcher.start()
+        self.addCleanup(self._post_handler_patcher.stop)
+        self.logger = PyEmailerLogger()
+        self.logger.logger = logging.getLogger(self.id())
+        self.logger.logger.setLevel(logging.DEBUG)
+        self.logger.logger.propagate = False
+        self.handler = RecordingHandler(logging.INFO)
+        self.logger.logger.addHandler(self.handler)
+        self.addCleanup(self.logger.stop_async_logging)
+
+    def test_handlers_run_on_listener_thread_and_drain_on_stop(self):
+        self.logger.enable_async_logging()
+        self.assertTrue(self.logger.async_logging)
+        self.assertEqual(self.logger.logger.handlers, [self.logger.queue_handler])
+        for i in range(100):
+            self.logger.logger.info(f"record {i}")
+        self.logger.stop_async_logging()
+
+        self.assertEqual(len(self.handler.records), 100)
+        self.assertNotIn(threading.current_thread().name, self.handler.threads)
+        self.assertEqual(self.logger.logger.handlers, [self.handler])
+        self.assertEqual(self.logger.queue_metrics['enqueued'], 101)  # + the 'async logging enabled' debug record
+        self.assertGreaterEqual(self.logger.queue_metrics['max_depth'], 1)
+
+    def test_handlers_added_later_go_to_listener(self):
+        self.logger.enable_async_logging()
+        late_handler = RecordingHandler(logging.ERROR)
+        self.logger.add_handler(late_handler)
+        self.logger.logger.warning("not for the late handler")
+        self.logger.logger.error("for both")
+        self.logger.stop_async_logging()
+        self.assertEqual([r.getMessage() for r in late_handler.records], ["for both"])
+        self.assertIn(late_handler, self.logger.logger.handlers)
+
+    def test_file_handlers_are_buffered_and_flushed_on_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            file_handler = logging.FileHandler(Path(tmp, 'test.log'), delay=True)
+            file_handler.setLevel(logging.INFO)
+            self.logger.logger.addHandler(file_handler)
+            self.logger.enable_async_logging()
+            buffered = [h for h in self.logger.queue_listener.handlers if isinstance(h, BufferedHandler)]
+            self.assertEqual([h.target for h in buffered], [file_handler])
+
+            self.logger.logger.info("buffered")
+            self.logger.logger.error("flushes")
+            self.logger.stop_async_logging()
+            file_handler.close()
+            self.assertEqual(Path(tmp, 'test.log').read_text().splitlines(), ["buffered", "flushes"])
+
+
+    @patch('PyEmailerAJM.backend.logger.pythoncom')
+    def test_other_handlers_get_com_on_the_listener_thread(self, pythoncom):
+        self.logger.enable_async_logging()
+        wrapped = [h for h in self.logger.queue_listener.handlers if isinstance(h, ComThreadHandler)]
+        self.assertEqual([h.target for h in wrapped], [self.handler])
+        for _ in range(3):
+            self.logger.logger.info("record")
+        self.logger.stop_async_logging()
+        pythoncom.CoInitialize.assert_called_once()
+        self.assertEqual(len(self.handler.records), 3)
+
+    def test_buffer_is_flushed_on_the_interval_without_new_records(self):
+        target = RecordingHandler(logging.INFO)
+        buffered = BufferedHandler(100, target=target, flush_interval_seconds=0.05)
+        self.addCleanup(buffered.close)
+        buffered.handle(logging.LogRecord('test', logging.INFO, __file__, 1, 'quiet', None, None))
+        deadline = monotonic() + 2
+        while not target.records and monotonic() < deadline:
+            sleep(0.01)
+        self.assertEqual([r.getMessage() for r in target.records], ['quiet'])
+
+
+class TestDupeDebugFilter(unittest.TestCase):
+    def _filter(self, **kwargs):
+        return DupeDebugFilter(shared_cache_key=self.id(), **kwargs)
+
+    def tearDown(self) -> None:
+        DupeDebugFilter._shared_caches.pop(self.id(), None)
+
+    @staticmethod
+    def _record(msg, created=0.0, level=logging.DEBUG):
+        record = logging.LogRecord('test_dupe_debug', level, __file__, 1, msg, None, None)
+        record.created = created
+        return record
+
+    def test_drops_repeated_debug_messages(self):
+        dupe_filter = self._filter()
+        self.assertTrue(dupe_filter.filter(self._record('RE: hello')))
+        self.assertFalse(dupe_filter.filter(self._record('FW: hello')))
+        self.assertTrue(dupe_filter.filter(self._record('hello', level=logging.INFO)))
+
+    def test_filters_with_the_same_key_share_one_check_per_record(self):
+        first, second = self._filter(), self._filter()
+        self.assertIs(first.cache, second.cache)
+        record = self._record('hello')
+        self.assertTrue(first.filter(record))
+        # the same record going through the second handler is not a duplicate
+        self.assertTrue(second.filter(record))
+        self.assertFalse(second.filter(self._record('hello')))
+
+    def test_caches_are_not_shared_by_default(self):
+        self.assertIsNot(DupeDebugFilter().cache, DupeDebugFilter().cache)
+        first = DupeDebugFilter(capacity=2)
+        self.assertEqual(first.cache.capacity, 2)
+        self.assertIs(DupeDebugFilter(cache=first.cache).cache, first.cache)
+
+    def test_shared_cache_with_other_settings_raises(self):
+        self._filter(capacity=2)
+        self.assertEqual(self._filter().cache.capacity, 2)
+        with self.assertRaises(ValueError):
+            self._filter(capacity=3)
+
+    def test_capacity_and_ttl(self):
+        dupe_filter = self._filter(capacity=2, ttl_seconds=60)
+        for msg in ('a', 'b', 'c'):
+            dupe_filter.filter(self._record(msg))
+        self.assertEqual(len(dupe_filter.cache), 2)
+        self.assertTrue(dupe_filter.filter(self._record('a', created=1)))
+        self.assertFalse(dupe_filter.filter(self._record('c', created=59)))
+        self.assertTrue(dupe_filter.filter(self._record('c', created=61)))
+
+    def test_logs_suppressed_summary(self):
+        dupe_filter = self._filter(summary_interval_seconds=10)
+        with self.assertLogs('test_dupe_debug', level=logging.INFO) as logs:
+            for created in range(12):
+                dupe_filter.filter(self._record('hello', created=created))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('10 duplicate debug messages suppressed', logs.output[0])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from PyEmailerAJM.searchers import SearcherFactory, IndexSearcher, IndexUpdate, MailIndex
+
+START = datetime(2025, 10, 1, 9, 0)
+
+
+class FakeItems(list):
+    """Items collection evaluating the LastModificationTime watermark filter like the store (minute precision)."""
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.filters = []
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def Restrict(self, sql_filter):
+        self.filters.append(sql_filter)
+        watermark = datetime.strptime(sql_filter.split("'")[1], MailIndex.RESTRICT_DATE_FORMAT)
+        return [i for i in self if i.LastModificationTime >= watermark]
+
+
+def make_item(n, subject, body='', sender='Alice', minutes=0):
+    return SimpleNamespace(EntryID=f'id{n}', Subject=subject, Body=body, SenderName=sender,
+                           SenderEmailAddress=f'{sender.lower()}@example.com',
+                           LastModificationTime=START + timedelta(minutes=minutes),
+                           ReceivedTime=START, SentOn=START)
+
+
+class TestMailIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = MailIndex(':memory:')
+        self.addCleanup(self.index.close)
+        self.folder = SimpleNamespace(StoreID='store', EntryID='inbox', Items=FakeItems([
+            make_item(1, 'Quarterly report', 'numbers attached'),
+            make_item(2, 'RE: Lunch', 'the quarterly report is late', sender='Bob'),
+            make_item(3, 'Build failed', 'see the log')]))
+
+    def test_search_is_ranked_and_normalized(self):
+        self.assertEqual(self.index.update(self.folder), IndexUpdate(3, 0))
+        hits = self.index.search('Quarterly REPORT')
+        # a subject match outranks a body match
+        self.assertEqual([h.entry_id for h in hits], ['id1', 'id2'])
+        self.assertEqual([h.subject for h in self.index.search('lunch')], ['lunch'])
+        self.assertEqual([h.entry_id for h in self.index.search('bob@example')], ['id2'])
+        self.assertEqual([h.entry_id for h in self.index.search('quart', prefix=True, columns=['subject'])], ['id1'])
+        self.assertEqual(self.index.search('quart'), [])
+        with self.assertRaises(ValueError):
+            self.index.search('"*')
+
+    def test_updates_are_incremental(self):
+        self.index.update(self.folder)
+        self.assertEqual(self.folder.Items.filters, [])
+
+        changed = self.folder.Items[2]
+        changed.Subject, changed.LastModificationTime = 'Build fixed', START + timedelta(minutes=5)
+        self.folder.Items.append(make_item(4, 'New build', minutes=5))
+        self.assertEqual(self.index.update(self.folder), IndexUpdate(2, 0))
+        self.assertEqual(self.folder.Items.filters, ["[LastModificationTime] >= '10/01/2025 09:00 AM'"])
+        self.assertEqual(sorted(h.entry_id for h in self.index.search('build')), ['id3', 'id4'])
+        self.assertEqual(self.index.search('failed'), [])
+
+        # unchanged items in the watermark minute are skipped, removals are noticed
+        del self.folder.Items[0]
+        self.assertEqual(self.index.update(self.folder), IndexUpdate(0, 1))
+        self.assertEqual(self.folder.Items.filters[1], "[LastModificationTime] >= '10/01/2025 09:05 AM'")
+        self.assertEqual(len(self.index), 3)
+
+    def test_folder_key_is_stored_as_text(self):
+        self.assertEqual(MailIndex.folder_key(self.folder), 'store|inbox')
+
+    def test_index_persists(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index.sqlite3')
+            index = MailIndex(path)
+            index.update(self.folder)
+            index.close()
+            reopened = MailIndex(path)
+            self.assertEqual(reopened.update(self.folder), IndexUpdate(0, 0))
+            self.assertEqual(len(reopened.search('report')), 2)
+            reopened.close()
+
+    def test_db_path_is_required(self):
+        for db_path in (None, ''):
+            with self.subTest(db_path=db_path):
+                self.assertRaises(ValueError, MailIndex, db_path)
+
+
+class TestIndexSearcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = MailIndex(':memory:')
+        self.addCleanup(self.index.close)
+        self.items = FakeItems([make_item(1, 'Quarterly report'), make_item(2, 'Lunch', 'quarterly report')])
+        self.folder = SimpleNamespace(StoreID='store', EntryID='inbox', Items=self.items)
+        self.opened = {i.EntryID: i for i in self.items}
+
+    def get_item(self, entry_id, store_id):
+        self.assertEqual(store_id, 'store')
+        return self.opened[entry_id]
+
+    def test_hits_are_opened_by_entry_id(self):
+        emailer = MagicMock(_set_read_folder=lambda: self.folder, _open_item_by_entry_id=self.get_item)
+        searcher = SearcherFactory.get_searcher('index', py_emailer=emailer, logger=MagicMock(),
+                                                mail_index=self.index)
+        self.assertIsInstance(searcher, IndexSearcher)
+        self.assertEqual(searcher.find_messages_by_attribute('quarterly report'), list(self.items))
+        self.assertEqual(searcher.find_messages_by_attribute('quarterly', max_results=1), [self.items[0]])
+        emailer.GetMessages.assert_not_called()
+
+    def test_results_are_not_capped(self):
+        searcher = IndexSearcher(logger=MagicMock(), mail_index=self.index, get_item=self.get_item,
+                                 get_folder=lambda: self.folder)
+        with patch.object(MailIndex, 'DEFAULT_LIMIT', 1):
+            self.assertEqual(len(searcher.find_messages_by_attribute('report')), 2)
+            self.assertEqual(len(self.index.search('report')), 1)
+            self.assertEqual(len(self.index.search('report', limit=None)), 2)
+
+    def test_index_location_is_required(self):
+        with self.assertRaises(ValueError):
+            IndexSearcher(logger=MagicMock(), get_item=self.get_item)
+        with tempfile.TemporaryDirectory() as tmp:
+            searcher = IndexSearcher(logger=MagicMock(), index_path=os.path.join(tmp, 'index.sqlite3'))
+            searcher.mail_index.close()
+
+    def test_stale_hits_are_dropped(self):
+        searcher = IndexSearcher(logger=MagicMock(), mail_index=self.index, get_item=self.get_item,
+                                 get_folder=lambda: self.folder)
+        self.index.update(self.folder)
+        del self.opened['id1']
+        self.assertEqual(searcher.find_messages_by_attribute('report', update_index=False), [self.items[1]])
+        self.assertEqual(len(self.index), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
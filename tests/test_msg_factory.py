@@ -0,0 +1,139 @@
+import logging
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.backend import AlertTypes
+from PyEmailerAJM.continuous_monitor.backend import SnoozeTracking
+from PyEmailerAJM.msg import Msg, MsgFactory
+from PyEmailerAJM.msg.alert_messages import _WarningMsg, _CriticalWarningMsg, _OverDueMsg
+
+
+class CountingAlertItem:
+    """Outlook-like item that counts property reads (each one a COM round trip)."""
+
+    def __init__(self, subject='Training overdue', hours_old=30, unread=True):
+        self._values = {'Subject': subject, 'HTMLBody': '<p>body</p>', 'Attachments': [],
+                        'UnRead': unread, 'ReceivedTime': datetime.now() - timedelta(hours=hours_old),
+                        'EntryID': 'ID'}
+        self.reads = 0
+
+    def __getattr__(self, name):
+        values = self.__dict__.get('_values', {})
+        if name in values:
+            self.__dict__['reads'] += 1
+            return values[name]
+        raise AttributeError(name)
+
+
+class TestMsgFactoryClassify(unittest.TestCase):
+    def setUp(self):
+        self._old_keywords = MsgFactory.ALERT_SUBJECT_KEYWORDS
+        MsgFactory.ALERT_SUBJECT_KEYWORDS = ['training']
+        self.snooze_checker = MagicMock()
+        self.snooze_checker.read_entry.return_value = None
+
+    def tearDown(self):
+        MsgFactory.ALERT_SUBJECT_KEYWORDS = self._old_keywords
+
+    def test_age_maps_to_tier_with_strict_thresholds(self):
+        cases = [(1, None), (AlertTypes.WARNING.value, None), (5.5, _WarningMsg),
+                 (24.5, _CriticalWarningMsg), (100, _OverDueMsg), (float('inf'), _OverDueMsg)]
+        for age, expected in cases:
+            with self.subTest(age=age):
+                self.assertIs(MsgFactory.get_alert_class_for_age(age), expected)
+
+    def test_classify_builds_single_alert_of_the_right_tier(self):
+        alert = MsgFactory.classify(Msg(CountingAlertItem(hours_old=30)), snooze_checker=self.snooze_checker)
+        self.assertIsInstance(alert, _CriticalWarningMsg)
+        self.assertTrue(alert.msg_alert)
+        self.assertFalse(alert.msg_snoozed)
+        self.snooze_checker.read_entry.assert_called_once()
+
+    def test_read_recent_or_keywordless_messages_are_not_alerts(self):
+        self.assertIsNone(MsgFactory.classify(Msg(CountingAlertItem(unread=False)),
+                                              snooze_checker=self.snooze_checker))
+        self.assertIsNone(MsgFactory.classify(Msg(CountingAlertItem(hours_old=1)),
+                                              snooze_checker=self.snooze_checker))
+        self.assertIsNone(MsgFactory.classify(Msg(CountingAlertItem(subject='Lunch')),
+                                              snooze_checker=self.snooze_checker))
+        self.snooze_checker.read_entry.assert_not_called()
+
+    def test_snoozed_message_is_not_an_alert(self):
+        self.snooze_checker.read_entry.return_value = datetime.now()
+        self.snooze_checker.is_snoozed.return_value = True
+        self.assertIsNone(MsgFactory.classify(Msg(CountingAlertItem()), snooze_checker=self.snooze_checker))
+
+    def test_snooze_uses_the_trackers_expiration_limit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tracker = SnoozeTracking(Path(tmp) / 'snooze.json', logger=logging.getLogger('test_logger'),
+                                     snooze_expiration_limit_hours=2)
+            now = datetime.now()
+            tracker._json_loaded = {'Training overdue': (now - timedelta(hours=3)).isoformat(),
+                                    'Training late': (now - timedelta(hours=1)).isoformat()}
+            # past the 2 hour limit, although within TheSandman's default 24 hours
+            alert = MsgFactory.classify(Msg(CountingAlertItem()), snooze_checker=tracker, now=now)
+            self.assertIsInstance(alert, _CriticalWarningMsg)
+            self.assertFalse(alert.msg_snoozed)
+            self.assertIsNone(MsgFactory.classify(Msg(CountingAlertItem(subject='Training late')),
+                                                  snooze_checker=tracker, now=now))
+            self.assertEqual(tracker.next_expiry(after=now), now + timedelta(hours=1))
+
+    def test_get_msg_without_alert_level_uses_classify(self):
+        alert = MsgFactory.get_msg(Msg(CountingAlertItem(hours_old=60)), snooze_checker=self.snooze_checker)
+        self.assertIsInstance(alert, _OverDueMsg)
+
+    def test_classify_reads_fewer_properties_than_guess_and_check(self):
+        legacy_item = CountingAlertItem(hours_old=6)
+        legacy_msg = Msg(legacy_item)
+        winner = None
+        for msg_class in MsgFactory.MSG_CLASSES:
+            msg_class.ALERT_SUBJECT_KEYWORDS = MsgFactory.ALERT_SUBJECT_KEYWORDS
+            candidate = msg_class(legacy_msg, snooze_checker=self.snooze_checker)
+            # _alert_checked is None here, so this is the original full check
+            if candidate.msg_alert:
+                winner = candidate
+                break
+        self.assertTrue(winner.msg_alert)
+
+        item = CountingAlertItem(hours_old=6)
+        alert = MsgFactory.classify(Msg(item, snapshot=True), snooze_checker=self.snooze_checker)
+        self.assertTrue(alert.msg_alert)
+        self.assertIsInstance(alert, type(winner))
+        self.assertLess(item.reads, legacy_item.reads)
+
+
+class TestMsgFactoryCandidateFilter(unittest.TestCase):
+    def setUp(self):
+        self._old_keywords = MsgFactory.ALERT_SUBJECT_KEYWORDS
+        MsgFactory.ALERT_SUBJECT_KEYWORDS = ["o'clock", 'training']
+
+    def tearDown(self):
+        MsgFactory.ALERT_SUBJECT_KEYWORDS = self._old_keywords
+
+    def test_filter_requires_unread_and_utc_cutoff_of_lowest_threshold(self):
+        now = datetime(2025, 1, 2, 12, 0, tzinfo=timezone(timedelta(hours=-5)))
+        sql = MsgFactory.build_candidate_filter(now=now)
+        self.assertTrue(sql.startswith('@SQL='))
+        self.assertIn('"urn:schemas:httpmail:read" = 0', sql)
+        # 17:00 UTC minus the 5 hour WARNING threshold
+        self.assertIn('"urn:schemas:httpmail:datereceived" < \'01/02/2025 12:00 PM\'', sql)
+        self.assertNotIn('ci_phrasematch', sql)
+
+    def test_keyword_pushdown_is_opt_in_and_escaped(self):
+        sql = MsgFactory.build_candidate_filter(include_keywords=True)
+        self.assertEqual(sql.count('ci_phrasematch'), 4)
+        self.assertIn("ci_phrasematch 'o''clock'", sql)
+        self.assertIn('"urn:schemas:httpmail:textdescription" ci_phrasematch \'training\'', sql)
+
+    def test_pending_filter_uses_highest_threshold(self):
+        now = datetime(2025, 1, 3, 12, 0, tzinfo=timezone.utc)
+        sql = MsgFactory.build_pending_filter(now=now)
+        self.assertIn('"urn:schemas:httpmail:read" = 0', sql)
+        # 48 hours (OVERDUE) before now
+        self.assertIn('"urn:schemas:httpmail:datereceived" >= \'01/01/2025 12:00 PM\'', sql)
+
+if __name__ == '__main__':
+    unittest.main()
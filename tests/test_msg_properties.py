@@ -1,7 +1,8 @@
 import unittest
+from unittest.mock import MagicMock
 
 from PyEmailerAJM.backend.enums import EmailMsgImportanceLevel
-from PyEmailerAJM.msg.msg import Msg
+from PyEmailerAJM.msg.msg import Msg, MsgSnapshot
 
 
 class DummyExchangeUser:
@@ -32,6 +33,22 @@ class DummyEmailItem:
         self.Importance = EmailMsgImportanceLevel.NORMAL.value
 
 
+class CountingEmailItem(DummyEmailItem):
+    """Counts reads of each COM property, like cross-process round trips."""
+
+    def __init__(self):
+        super().__init__()
+        self.EntryID = 'ENTRY1'
+        self.UnRead = True
+        self.reads = {}
+
+    def __getattribute__(self, name):
+        if name[0].isupper():
+            reads = object.__getattribute__(self, 'reads')
+            reads[name] = reads.get(name, 0) + 1
+        return object.__getattribute__(self, name)
+
+
 class TestMsgBasicProperties(unittest.TestCase):
     def setUp(self):
         self.item = DummyEmailItem()
@@ -51,6 +68,10 @@ class TestMsgBasicProperties(unittest.TestCase):
         self.item.SenderEmailType = 'SMTP'
         self.assertEqual(self.msg.sender, 'sender@example.com')
 
+    def test_attachment_names_use_file_name(self):
+        self.item.Attachments = [MagicMock(FileName='alert report.pdf'), 'plain.txt']
+        self.assertEqual(self.msg.attachment_names, ['alert report.pdf', 'plain.txt'])
+
     def test_importance_setter_accepts_enum(self):
         self.msg.importance = EmailMsgImportanceLevel.HIGH
         self.assertEqual(self.item.Importance, EmailMsgImportanceLevel.HIGH.value)
@@ -68,5 +89,65 @@ class TestMsgBasicProperties(unittest.TestCase):
             self.msg.importance = 'INVALID'
 
 
+class TestMsgSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.item = CountingEmailItem()
+
+    def test_no_snapshot_reads_live_every_time(self):
+        msg = Msg(self.item)
+        _ = msg.subject
+        reads_per_access = self.item.reads['Subject']
+        for _ in range(2):
+            _ = msg.subject
+        self.assertEqual(self.item.reads['Subject'], 3 * reads_per_access)
+
+    def test_snapshot_memoizes_until_refresh(self):
+        msg = Msg(self.item, snapshot=True)
+        _ = msg.subject
+        reads_per_access = self.item.reads['Subject']
+        for _ in range(2):
+            _ = msg.subject
+        self.assertEqual(self.item.reads['Subject'], reads_per_access)
+        self.item.Subject = 'Changed'
+        self.assertEqual(msg.subject, 'Subject')
+        msg.refresh()
+        self.assertEqual(msg.subject, 'Changed')
+
+    def test_fields_not_in_snapshot_stay_live(self):
+        msg = Msg(self.item, snapshot_fields=['subject'])
+        _ = msg.to
+        reads_per_access = self.item.reads['To']
+        _ = msg.to
+        self.assertEqual(self.item.reads['To'], 2 * reads_per_access)
+
+    def test_unknown_snapshot_field_raises(self):
+        with self.assertRaises(ValueError):
+            MsgSnapshot(['not_a_field'])
+
+    def test_release_item_and_reopen_by_entry_id(self):
+        opener = MagicMock(return_value=self.item)
+        msg = Msg(self.item, item_opener=opener)
+        msg.refresh(release_item=True)
+        self.assertTrue(msg.item_released)
+        self.assertEqual(msg.subject, 'Subject')
+        self.assertTrue(msg.unread)
+        opener.assert_not_called()
+        self.assertIs(msg(), self.item)
+        opener.assert_called_once_with('ENTRY1')
+
+    def test_attachment_names_are_snapshotted(self):
+        self.item.Attachments = [MagicMock(FileName='alert.pdf')]
+        opener = MagicMock(return_value=self.item)
+        msg = Msg(self.item, item_opener=opener)
+        msg.refresh(release_item=True)
+        self.assertEqual(msg.attachment_names, ['alert.pdf'])
+        opener.assert_not_called()
+
+    def test_release_item_without_opener_keeps_item(self):
+        msg = Msg(self.item)
+        msg.refresh(release_item=True)
+        self.assertFalse(msg.item_released)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+# noinspection PyUnresolvedReferences
+from pywintypes import com_error
+
+from PyEmailerAJM.msg import MsgRow
+from PyEmailerAJM.py_emailer_ajm import PyEmailer
+
+
+class DummyColumns:
+    def __init__(self):
+        self.names = ['EntryID', 'Subject', 'CreationTime']
+
+    def RemoveAll(self):
+        self.names = []
+
+    def Add(self, name):
+        self.names.append(name)
+
+
+class DummyRow:
+    def __init__(self, values):
+        self._values = values
+
+    def Item(self, column):
+        return self._values[column]
+
+
+class DummyTable:
+    """Mimics the parts of the Outlook Table object model used by MsgRow."""
+
+    def __init__(self, items, supports_get_array=True):
+        self.items = items
+        self.Columns = DummyColumns()
+        self.supports_get_array = supports_get_array
+        self._position = 0
+        self.get_array_calls = 0
+
+    @property
+    def EndOfTable(self):
+        return self._position >= len(self.items)
+
+    def GetArray(self, max_rows):
+        if not self.supports_get_array:
+            raise AttributeError('GetArray')
+        self.get_array_calls += 1
+        batch = self.items[self._position:self._position + max_rows]
+        self._position += len(batch)
+        return tuple(tuple(i[c] for c in self.Columns.names) for i in batch)
+
+    def GetNextRow(self):
+        row = DummyRow(self.items[self._position])
+        self._position += 1
+        return row
+
+
+class DummyFolder:
+    def __init__(self, items, **kwargs):
+        self.StoreID = 'STORE'
+        self.table = DummyTable(items, **kwargs)
+        self.table_filter = None
+
+    def GetTable(self, table_filter=None):
+        self.table_filter = table_filter
+        return self.table
+
+
+def make_items(count=3):
+    return [{'EntryID': f'ID{i}', 'Subject': f'Subject {i}', 'ReceivedTime': datetime(2025, 1, 1, i),
+             'UnRead': bool(i % 2), 'SenderEmailAddress': f'sender{i}@example.com', 'MessageClass': 'IPM.Note'}
+            for i in range(count)]
+
+
+class TestMsgRow(unittest.TestCase):
+    def test_from_table_uses_get_array_batches(self):
+        table = DummyTable(make_items(5))
+        table.Columns.RemoveAll()
+        for c in MsgRow.DEFAULT_COLUMNS:
+            table.Columns.Add(c)
+        rows = list(MsgRow.from_table(table, MsgRow.DEFAULT_COLUMNS, batch_size=2))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(table.get_array_calls, 3)
+        self.assertEqual(rows[1].subject, 'Subject 1')
+        self.assertTrue(rows[1].unread)
+        self.assertEqual(rows[4].sender, 'sender4@example.com')
+
+    def test_from_table_falls_back_to_get_next_row(self):
+        table = DummyTable(make_items(3), supports_get_array=False)
+        rows = list(MsgRow.from_table(table, ('EntryID', 'Subject')))
+        self.assertEqual([r.entry_id for r in rows], ['ID0', 'ID1', 'ID2'])
+        self.assertEqual(rows[0].columns, ('EntryID', 'Subject'))
+        self.assertIsNone(rows[0].received_time)
+
+    def test_full_item_opened_lazily_and_once(self):
+        opener = MagicMock(return_value='FULL_ITEM')
+        row = MsgRow({'EntryID': 'ID0', 'Subject': 'S'}, item_opener=opener)
+        opener.assert_not_called()
+        self.assertEqual(row(), 'FULL_ITEM')
+        self.assertEqual(row(), 'FULL_ITEM')
+        opener.assert_called_once_with('ID0')
+
+    def test_open_without_entry_id_raises(self):
+        row = MsgRow({'Subject': 'S'}, item_opener=MagicMock())
+        with self.assertRaises(AttributeError):
+            row()
+
+
+class TestGetMessageRows(unittest.TestCase):
+    def setUp(self) -> None:
+        # Avoid actual COM/Outlook initialization
+        self._init_email_patch = patch(
+            'PyEmailerAJM.py_emailer_ajm.EmailerInitializer.initialize_email_item_app_and_namespace',
+            return_value=(None, None, MagicMock())
+        )
+        self._init_email_patch.start()
+        self.emailer = PyEmailer(display_window=False, send_emails=False, logger=MagicMock())
+        self.emailer.namespace = MagicMock()
+
+    def tearDown(self) -> None:
+        self._init_email_patch.stop()
+
+    def test_bulk_mode_adds_only_requested_columns(self):
+        folder = DummyFolder(make_items(4))
+        self.emailer.read_folder = folder
+        rows = self.emailer.GetMessages(bulk_mode=True, columns=['Subject', 'UnRead'])
+        self.assertEqual(folder.table.Columns.names, ['EntryID', 'Subject', 'UnRead'])
+        self.assertTrue(all(isinstance(r, MsgRow) for r in rows))
+        self.assertEqual([r.subject for r in rows], [f'Subject {i}' for i in range(4)])
+        self.emailer.namespace.GetItemFromID.assert_not_called()
+
+    def test_rows_open_full_item_by_entry_id_and_store_id(self):
+        folder = DummyFolder(make_items(2))
+        self.emailer.read_folder = folder
+        rows = self.emailer.GetMessageRows(table_filter="[UnRead] = True")
+        self.assertEqual(folder.table_filter, "[UnRead] = True")
+        rows[1]()
+        self.emailer.namespace.GetItemFromID.assert_called_once_with('ID1', 'STORE')
+
+    def test_item_filter_restricts_items(self):
+        folder = MagicMock()
+        folder.Items.Restrict.return_value = ['ITEM']
+        self.emailer.read_folder = folder
+        msgs = self.emailer.GetMessages(item_filter='@SQL=("urn:schemas:httpmail:read" = 0)')
+        folder.Items.Restrict.assert_called_once_with('@SQL=("urn:schemas:httpmail:read" = 0)')
+        self.assertEqual([m() for m in msgs], ['ITEM'])
+
+    def test_item_filter_falls_back_to_all_items_when_restrict_fails(self):
+        folder = MagicMock()
+        folder.Items.__iter__.return_value = iter(['A', 'B'])
+        folder.Items.Restrict.side_effect = com_error('bad filter')
+        self.emailer.read_folder = folder
+        msgs = self.emailer.GetMessages(item_filter='@SQL=broken')
+        self.assertEqual([m() for m in msgs], ['A', 'B'])
+        self.emailer.logger.warning.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
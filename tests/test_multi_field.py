@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.msg import Msg
+from PyEmailerAJM.searchers import SearcherFactory, MultiFieldSearcher, FieldMatch
+
+from fake_items import CursorItems
+
+SUBJECT = '"http://schemas.microsoft.com/mapi/proptag/0x0037001F"'
+BODY = '"http://schemas.microsoft.com/mapi/proptag/0x1000001F"'
+SENDER = '"http://schemas.microsoft.com/mapi/proptag/0x0C1A001F"'
+
+
+class CountingItem:
+    """Outlook-like item counting the reads of every property."""
+    def __init__(self, **fields):
+        self._fields = fields
+        self.reads = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self._fields:
+            raise AttributeError(name)
+        self.reads[name] = self.reads.get(name, 0) + 1
+        return self._fields[name]
+
+
+class TestMultiFieldSearcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.items = [CountingItem(Subject='Project X kickoff', Body='see attached', SenderName='Alice', To='Bob'),
+                      CountingItem(Subject='Lunch', Body='about project x', SenderName='Project X', To='Alice'),
+                      CountingItem(Subject='Lunch', Body='nothing', SenderName='Carol', To='Dave')]
+        self.get_messages = MagicMock(side_effect=lambda: [Msg(i) for i in self.items])
+        self.folder = MagicMock()
+        # a store that ignores the filter: the field matchers still decide
+        self.folder.Items.Restrict.side_effect = lambda sql: CursorItems(self.items)
+
+    def searcher(self, **kwargs):
+        return SearcherFactory.get_searcher('multi_field', logger=MagicMock(), get_messages=self.get_messages,
+                                            **kwargs)
+
+    def test_reports_the_matching_fields_reading_each_once(self):
+        searcher = self.searcher()
+        self.assertIsInstance(searcher, MultiFieldSearcher)
+        matches = searcher.find_matches('project x')
+        self.assertEqual(matches, [FieldMatch(self.items[0], ('Subject',)),
+                                   FieldMatch(self.items[1], ('Body', 'SenderName'))])
+        for item in self.items:
+            self.assertEqual(item.reads, {'Subject': 1, 'Body': 1, 'SenderName': 1, 'To': 1})
+
+    def test_per_field_match_modes(self):
+        searcher = self.searcher(fields={'subject': 'startswith', 'sender': 'exact'})
+        self.assertEqual(searcher.fields, {'Subject': 'startswith', 'SenderName': 'exact'})
+        self.assertEqual([m.fields for m in searcher.find_matches('project x')], [('Subject',), ('SenderName',)])
+        self.assertEqual(searcher.find_matches('project'), [FieldMatch(self.items[0], ('Subject',))])
+        self.assertEqual(searcher.find_messages_by_attribute('project', partial_match_ok=True),
+                         self.items[:2])
+
+    def test_one_restrict_for_all_fields(self):
+        searcher = self.searcher(fields=['Subject', 'Body', 'sender'], get_folder=lambda: self.folder)
+        matches = searcher.find_matches("bob's")
+        self.assertEqual(matches, [])
+        self.folder.Items.Restrict.assert_called_once_with(
+            f"@SQL=({SUBJECT} LIKE '%bob''s%') OR ({BODY} LIKE '%bob''s%') OR ({SENDER} LIKE '%bob''s%')")
+        self.get_messages.assert_not_called()
+
+    def test_fields_the_store_can_not_filter_scan(self):
+        searcher = self.searcher(fields=['Subject', 'Organizer'], get_folder=lambda: self.folder)
+        self.assertEqual(len(searcher.find_matches('lunch')), 2)
+        self.folder.Items.Restrict.assert_not_called()
+        self.get_messages.assert_called_once()
+
+    def test_invalid_fields_raise(self):
+        for fields in (['nope'], ['Size'], {'Subject': 'gt'}, []):
+            with self.subTest(fields=fields):
+                with self.assertRaises(ValueError):
+                    self.searcher(fields=fields)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from itertools import product
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.msg import Msg
+from PyEmailerAJM.searchers import SubjectSearcher
+from PyEmailerAJM.searchers.multi_pattern import AhoCorasick, ContainedInIndex
+
+
+class TestAutomaton(unittest.TestCase):
+    def test_finds_every_contained_pattern(self):
+        patterns = ['he', 'she', 'his', 'hers', '', 'report']
+        automaton = AhoCorasick(patterns)
+        self.assertEqual(automaton.matches('ushers'), {0, 1, 3})
+        self.assertEqual(automaton.matches('weekly report'), {5})
+        self.assertEqual(automaton.matches(''), set())
+
+    def test_contained_in(self):
+        index = ContainedInIndex(['weekly report', 'lunch', 'report'])
+        self.assertEqual(index.containing('report'), {0, 2})
+        self.assertEqual(index.containing('y r'), {0})
+        self.assertEqual(index.containing('report lunch'), set())
+        self.assertEqual(index.containing(''), set())
+
+
+class TestFindMessagesByAny(unittest.TestCase):
+    SUBJECTS = ['Weekly Report', 'RE: weekly report', 'FW: Lunch', 'FWD: lunch plans', 'Undeliverable: Invoice 42',
+                'RE:', 'Report', '']
+
+    def setUp(self) -> None:
+        self.items = [SimpleNamespace(Subject=s) for s in self.SUBJECTS]
+        self.searcher = SubjectSearcher(logger=MagicMock(),
+                                        get_messages=lambda: [Msg(i) for i in self.items])
+
+    def test_single_pass(self):
+        reads = []
+        searcher = SubjectSearcher(logger=MagicMock(), get_messages=MagicMock(),
+                                   iter_messages=lambda: (reads.append(1) or Msg(i) for i in self.items))
+        found = searcher.find_messages_by_any(['weekly report', 'lunch'])
+        self.assertEqual(len(reads), len(self.items))
+        self.assertEqual([i.Subject for i in found['weekly report']], ['Weekly Report', 'RE: weekly report'])
+        self.assertEqual([i.Subject for i in found['lunch']], ['FW: Lunch'])
+
+    def test_agrees_with_find_messages_by_subject(self):
+        patterns = ['weekly report', 'Lunch', 'report', 'lunch plans', 'invoice', 'week', 'RE: weekly report',
+                    'weekly report and more', 'nothing', '']
+        for partial, include_fw, include_re, reverse in product((False, True), repeat=4):
+            kwargs = dict(include_fw=include_fw, include_re=include_re, reverse_partial_match=reverse)
+            found = self.searcher.find_messages_by_any(patterns, partial_match_ok=partial, **kwargs)
+            for pattern in patterns:
+                with self.subTest(pattern=pattern, partial=partial, **kwargs):
+                    expected = self.searcher.find_messages_by_subject(pattern, partial_match_ok=partial,
+                                                                      no_fastpath_search=True, **kwargs)
+                    self.assertEqual(found[pattern], expected)
+
+    def test_duplicate_patterns_share_results(self):
+        found = self.searcher.find_messages_by_any(['Lunch', 'lunch '])
+        self.assertEqual(found['Lunch'], found['lunch '])
+        self.assertEqual(len(found['Lunch']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.searchers import Q, SearcherFactory, QuerySearcher, compile_query
+from PyEmailerAJM.searchers.query import compile_sql_shape
+
+from fake_items import CursorItems
+
+SUBJECT = '"http://schemas.microsoft.com/mapi/proptag/0x0037001F"'
+RECEIVED = '"urn:schemas:httpmail:datereceived"'
+READ = '"urn:schemas:httpmail:read"'
+SENDER = '"http://schemas.microsoft.com/mapi/proptag/0x0C1A001F"'
+UTC_NOON = datetime(2025, 10, 1, 12, 0, 30, tzinfo=timezone.utc)
+
+
+def make_items():
+    return [SimpleNamespace(Subject='Weekly Report', SenderName='Alice', UnRead=True, Size=10,
+                            ReceivedTime=UTC_NOON + timedelta(hours=1), Organizer=None),
+            SimpleNamespace(Subject='RE: weekly report', SenderName='Bob', UnRead=False, Size=20,
+                            ReceivedTime=UTC_NOON - timedelta(hours=1), Organizer=None),
+            SimpleNamespace(Subject='Lunch', SenderName='Carol', UnRead=False, Size=30,
+                            ReceivedTime=UTC_NOON + timedelta(hours=2), Organizer='Dora')]
+
+
+class TestQueryCompiler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.items = make_items()
+
+    def matches(self, query):
+        predicate = compile_query(query).predicate
+        return [i.SenderName for i in self.items if predicate(i)]
+
+    def test_sql_and_predicate_agree(self):
+        query = Q(subject__contains="week") & Q(received__gte=UTC_NOON) | ~Q(unread=True)
+        compiled = compile_query(query)
+        self.assertEqual(compiled.sql,
+                         f"@SQL=(({SUBJECT} LIKE '%week%') AND ({RECEIVED} >= '10/01/2025 12:00 PM')) "
+                         f"OR (NOT ({READ} = 0))")
+        self.assertEqual(self.matches(query), ['Alice', 'Bob', 'Carol'])
+        self.assertEqual(self.matches(Q(subject__contains="week") & Q(received__gte=UTC_NOON)), ['Alice'])
+
+    def test_lookups(self):
+        self.assertEqual(self.matches(Q(subject='weekly report')), ['Alice'])
+        self.assertEqual(self.matches(Q(subject__startswith='re:')), ['Bob'])
+        self.assertEqual(self.matches(Q(size__gt=10, size__lte=30)), ['Bob', 'Carol'])
+        self.assertEqual(self.matches(Q(sender__in=['alice', 'carol'])), ['Alice', 'Carol'])
+        self.assertEqual(self.matches(Q(received__lt=UTC_NOON.replace(tzinfo=None) + timedelta(days=1))),
+                         ['Alice', 'Bob', 'Carol'])
+
+    def test_dates_are_rounded_outwards(self):
+        self.assertEqual(compile_query(Q(received__lt=UTC_NOON)).sql, f"@SQL={RECEIVED} <= '10/01/2025 12:01 PM'")
+        # under a NOT the filter has to be a subset
+        self.assertEqual(compile_query(~Q(received__lt=UTC_NOON)).sql,
+                         f"@SQL=NOT ({RECEIVED} < '10/01/2025 12:00 PM')")
+
+    def test_text_filters_are_a_superset(self):
+        # the predicate ignores case and surrounding whitespace, the filter has to keep those items
+        self.items[0].Subject = '  Weekly Report '
+        for query, sql in ((Q(subject=' weekly report '), f"{SUBJECT} LIKE '%weekly report%'"),
+                           (Q(subject__startswith='weekly '), f"{SUBJECT} LIKE '%weekly%'"),
+                           (Q(subject__in=['lunch ', 'x']), f"({SUBJECT} LIKE '%lunch%') OR ({SUBJECT} LIKE '%x%')")):
+            with self.subTest(query=query):
+                self.assertEqual(compile_query(query).sql, '@SQL=' + sql)
+        self.assertEqual(self.matches(Q(subject=' weekly report ')), ['Alice'])
+        self.assertEqual(self.matches(Q(subject__startswith='weekly ')), ['Alice'])
+        # under a NOT a subset: '=' and 'value%'
+        self.assertEqual(compile_query(~Q(subject__startswith=' re:')).sql, f"@SQL=NOT ({SUBJECT} LIKE 're:%')")
+        self.assertEqual(compile_query(~Q(sender__in=['bob', 'carol'])).sql,
+                         f"@SQL=NOT (({SENDER} = 'bob') OR ({SENDER} = 'carol'))")
+
+    def test_empty_in_matches_nothing(self):
+        compiled = compile_query(Q(sender__in=[]))
+        self.assertTrue(compiled.matches_nothing)
+        self.assertIsNone(compiled.sql)
+        self.assertFalse(compile_query(~Q(sender__in=[])).matches_nothing)
+
+    def test_unsupported_parts_are_left_out(self):
+        self.assertEqual(compile_query(Q(organizer='dora') & Q(subject='lunch')).sql,
+                         f"@SQL={SUBJECT} LIKE '%lunch%'")
+        self.assertIsNone(compile_query(Q(organizer='dora') | Q(subject='lunch')).sql)
+        self.assertIsNone(compile_query(~Q(organizer='dora')).sql)
+        self.assertIsNone(compile_query(Q(subject__contains='100%')).sql)
+        self.assertEqual(self.matches(~Q(organizer='dora')), ['Alice', 'Bob'])
+
+    def test_invalid_queries_raise(self):
+        for query in (Q(nope='x'), Q(unread__contains='x'), Q(subject__gt='x'), Q(subject__regex='x')):
+            with self.subTest(query=query):
+                with self.assertRaises(ValueError):
+                    compile_query(query)
+
+    def test_compiled_form_is_cached_by_shape(self):
+        compile_sql_shape.cache_clear()
+        first = compile_query(Q(subject__contains='a') | Q(size__gt=1))
+        second = compile_query(Q(subject__contains='b') | Q(size__gt=2))
+        self.assertEqual(compile_sql_shape.cache_info().hits, 1)
+        self.assertIn("'%b%'", second.sql)
+        self.assertIn("'%a%'", first.sql)
+
+    def test_factory_exposes_the_compiler(self):
+        self.assertEqual(SearcherFactory.compile_query(Q(subject='x')).sql, f"@SQL={SUBJECT} LIKE '%x%'")
+        self.assertIn('query', SearcherFactory.available_types())
+
+
+class TestQuerySearcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.items = make_items()
+        self.folder = MagicMock()
+        # a store that ignores the filter: the predicate still decides
+        self.folder.Items.Restrict.side_effect = lambda sql: CursorItems(self.items)
+        self.msgs = [MagicMock(return_value=i, spec=[]) for i in self.items]
+        self.get_messages = MagicMock(side_effect=lambda: list(self.msgs))
+
+    def searcher(self, **kwargs):
+        return SearcherFactory.get_searcher('query', logger=MagicMock(), get_messages=self.get_messages, **kwargs)
+
+    def test_query_is_restricted_server_side(self):
+        searcher = self.searcher(get_folder=lambda: self.folder)
+        self.assertIsInstance(searcher, QuerySearcher)
+        found = searcher.find_messages(Q(subject__contains='weekly') & ~Q(sender='bob'))
+        self.assertEqual([i.SenderName for i in found], ['Alice'])
+        self.folder.Items.Restrict.assert_called_once()
+        self.get_messages.assert_not_called()
+
+    def test_both_paths_log_the_result_count(self):
+        for kwargs in ({}, {'no_fastpath_search': True}):
+            with self.subTest(**kwargs):
+                searcher = self.searcher(get_folder=lambda: self.folder)
+                found = searcher.find_messages(Q(subject__contains='weekly'), **kwargs)
+                logged = [c.args[0] for c in searcher.logger.info.call_args_list]
+                self.assertTrue(any(x.startswith(f"{len(found)} messages found") for x in logged), logged)
+
+    def test_empty_in_does_not_search(self):
+        searcher = self.searcher(get_folder=lambda: self.folder)
+        self.assertEqual(searcher.find_messages(Q(sender__in=[]) & Q(subject__contains='weekly')), [])
+        self.folder.Items.Restrict.assert_not_called()
+        self.get_messages.assert_not_called()
+
+    def test_fallback_scan_uses_the_predicate(self):
+        found = self.searcher().find_messages(Q(size__gte=20), max_results=1)
+        self.assertEqual([i.SenderName for i in found], ['Bob'])
+
+        self.folder.Items.Restrict.side_effect = ValueError('rejected')
+        found = self.searcher(get_folder=lambda: self.folder).find_messages_by_attribute('lunch')
+        self.assertEqual([i.SenderName for i in found], ['Carol'])
+
+
+if __name__ == '__main__':
+    unittest.main()
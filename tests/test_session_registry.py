@@ -0,0 +1,138 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from PyEmailerAJM.backend import SessionRegistry
+from PyEmailerAJM.backend.logger import PyEmailerLogger
+from PyEmailerAJM.py_emailer_ajm import PyEmailer
+from PyEmailerAJM.searchers import SubjectSearcher
+
+
+class TestSessionRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dispatch = MagicMock(side_effect=lambda name: MagicMock(name=name))
+        self.registry = SessionRegistry(dispatch=self.dispatch)
+
+    def test_sessions_are_shared_per_thread(self):
+        first = self.registry.acquire_session('Outlook.Application', 'MAPI')
+        second = self.registry.acquire_session('outlook.application', 'mapi')
+        self.assertIs(first, second)
+        self.assertEqual(first.ref_count, 2)
+        self.dispatch.assert_called_once_with('Outlook.Application')
+
+        other_thread = []
+        thread = threading.Thread(target=lambda: other_thread.append(
+            self.registry.acquire_session('outlook.application', 'MAPI')))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other_thread[0], first)
+        self.assertEqual(len(self.registry.sessions), 2)
+
+    def test_last_release_closes_the_session(self):
+        first = self.registry.acquire_session('outlook.application', 'MAPI')
+        self.registry.acquire_session('outlook.application', 'MAPI')
+        self.registry.release_session(first)
+        self.assertFalse(first.closed)
+        self.registry.release_session(first)
+        self.assertTrue(first.closed)
+        self.assertEqual(self.registry.sessions, {})
+        # released again by mistake: ignored
+        self.registry.release_session(first)
+        self.assertIsNot(self.registry.acquire_session('outlook.application', 'MAPI'), first)
+
+    @patch('PyEmailerAJM.backend.logger.PyEmailerLogger')
+    def test_loggers_are_shared_per_project(self, py_emailer_logger):
+        py_emailer_logger.side_effect = lambda **kwargs: MagicMock()
+        py_emailer_logger.logger_kwargs.side_effect = PyEmailerLogger.logger_kwargs
+        first = self.registry.acquire_logger(project_name='proj')
+        self.assertIs(self.registry.acquire_logger(project_name='proj'), first)
+        self.assertIsNot(self.registry.acquire_logger(project_name='other'), first)
+        # same project, other settings: not shared
+        self.assertIsNot(self.registry.acquire_logger(project_name='proj', async_logging=True), first)
+        self.assertEqual(py_emailer_logger.call_count, 3)
+
+        self.registry.release_logger(first)
+        first.stop_async_logging.assert_not_called()
+        self.registry.release_logger(first)
+        first.stop_async_logging.assert_called_once()
+
+    @patch('PyEmailerAJM.backend.logger.PyEmailerLogger')
+    def test_only_logger_kwargs_are_used(self, py_emailer_logger):
+        py_emailer_logger.side_effect = lambda **kwargs: MagicMock()
+        py_emailer_logger.logger_kwargs.side_effect = PyEmailerLogger.logger_kwargs
+        first = self.registry.acquire_logger(project_name='proj', get_folder=lambda: None, fields=['subject'])
+        self.assertIs(self.registry.acquire_logger(project_name='proj', mail_index=MagicMock()), first)
+        py_emailer_logger.assert_called_once_with(project_name='proj')
+
+    @patch('PyEmailerAJM.backend.logger.PyEmailerLogger')
+    def test_searcher_close_releases_its_logger(self, py_emailer_logger):
+        py_emailer_logger.side_effect = lambda **kwargs: MagicMock()
+        py_emailer_logger.logger_kwargs.side_effect = PyEmailerLogger.logger_kwargs
+        searchers = [SubjectSearcher(session_registry=self.registry, get_messages=list) for _ in range(2)]
+        shared = searchers[0]._elog
+        self.assertIs(searchers[1]._elog, shared)
+        for searcher in searchers:
+            searcher.close()
+        shared.stop_async_logging.assert_called_once()
+        # closed again by mistake: ignored
+        searchers[0].close()
+        shared.stop_async_logging.assert_called_once()
+
+    def test_emailer_close_closes_its_searcher(self):
+        emailer = PyEmailer(False, False, logger=MagicMock(), session_registry=self.registry)
+        searcher = emailer.searcher = MagicMock()
+        emailer.close()
+        searcher.close.assert_called_once()
+        self.assertIsNot(emailer.searcher, searcher)
+
+    @patch('PyEmailerAJM.py_emailer_ajm.PyEmailerLogger')
+    @patch.object(SessionRegistry, 'default')
+    def test_default_registry_is_only_used_when_sharing(self, default, _):
+        emailer = PyEmailer(False, False)
+        with patch('PyEmailerAJM.py_emailer_ajm.win32.Dispatch'):
+            _ = emailer.namespace
+        emailer.close()
+        default.assert_not_called()
+
+        emailer = PyEmailer(False, False, logger=MagicMock(), share_session=True)
+        _ = emailer.namespace
+        default.assert_called_once()
+        default.return_value.acquire_session.assert_called_once()
+
+    def test_emailers_share_one_dispatch(self):
+        emailers = [PyEmailer(False, False, logger=MagicMock(), session_registry=self.registry, share_session=True)
+                    for _ in range(3)]
+        namespaces = {id(e.namespace) for e in emailers}
+        self.assertEqual(len(namespaces), 1)
+        self.dispatch.assert_called_once()
+        # each emailer still gets its own draft email
+        self.assertEqual(len({id(e.email) for e in emailers}), 3)
+
+        for emailer in emailers:
+            emailer.close()
+        self.assertEqual(self.registry.sessions, {})
+
+    def test_share_session_off_dispatches_per_emailer(self):
+        with patch('PyEmailerAJM.py_emailer_ajm.win32.Dispatch') as dispatch:
+            # off by default
+            emailer = PyEmailer(False, False, logger=MagicMock(), session_registry=self.registry)
+            _ = emailer.namespace
+        dispatch.assert_called_once()
+        self.assertEqual(self.registry.sessions, {})
+
+    @patch('PyEmailerAJM.py_emailer_ajm.PyEmailerLogger')
+    @patch('PyEmailerAJM.backend.logger.PyEmailerLogger')
+    def test_monitor_logger_is_not_shared(self, shared_logger, private_logger):
+        from PyEmailerAJM.continuous_monitor import ContinuousMonitor
+        shared_logger.side_effect = private_logger.side_effect = lambda **kwargs: MagicMock()
+        shared_logger.logger_kwargs.side_effect = PyEmailerLogger.logger_kwargs
+        emailer = PyEmailer(False, False, session_registry=self.registry, share_session=True)
+        monitor = ContinuousMonitor(False, False, dev_mode=True, session_registry=self.registry,
+                                    share_session=True)
+        shared_logger.assert_called_once()
+        private_logger.assert_called_once()
+        self.assertIsNot(monitor.logger_class, emailer.logger_class)
+
+
+if __name__ == '__main__':
+    unittest.main()
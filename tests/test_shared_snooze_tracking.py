@@ -0,0 +1,94 @@
+import logging
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+
+from PyEmailerAJM.continuous_monitor.backend import SharedSnoozeTracking, SqliteSnoozeTracking
+
+
+def make_msg(subject, snoozed=False):
+    msg = Mock()
+    msg.subject = subject
+    msg.msg_snoozed = snoozed
+    msg.msg_snoozed_time = datetime.now()
+    return msg
+
+
+class TestSharedSnoozeTracking(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp.name) / 'snooze_tracker.sqlite3'
+        self.logger = logging.getLogger('test_logger')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _tracker(self, **kwargs):
+        tracker = SharedSnoozeTracking(self.db_path, logger=self.logger, **kwargs)
+        self.addCleanup(tracker.close)
+        return tracker
+
+    def test_sees_writes_of_other_processes(self):
+        first, second = self._tracker(), self._tracker()
+        self.assertEqual(len(second.json_loaded), 0)
+        first.snooze_msgs([make_msg('from first')])
+        second.snooze_msgs([make_msg('from second')])
+
+        first.begin_cycle()
+        self.assertEqual(set(first.json_loaded), {'from first', 'from second'})
+        self.assertTrue(first.is_snoozed('from second'))
+        self.assertEqual(set(second.json_loaded), {'from first', 'from second'})
+
+    def test_refresh_only_reads_new_rows(self):
+        first, second = self._tracker(), self._tracker()
+        first.snooze_msgs([make_msg(f'subject {i}') for i in range(20)])
+        self.assertEqual(len(second.json_loaded), 20)
+
+        statements = []
+        second.connection.set_trace_callback(statements.append)
+        self.assertEqual(second.refresh(), 0)
+        self.assertFalse([x for x in statements if 'FROM snooze ' in x])
+
+        first.snooze_msgs([make_msg('late')])
+        self.assertEqual(second.refresh(), 1)
+        self.assertIn('late', second.json_loaded)
+
+    def test_newest_snooze_time_wins(self):
+        now = datetime.now().replace(microsecond=0)
+        first, second = self._tracker(), self._tracker()
+        self.assertEqual(len(second.json_loaded), 0)
+        first.write_entry('subject', now)
+        second.write_entry('subject', now - timedelta(hours=1))
+        self.assertEqual(self._tracker().read_entry('subject'), now)
+        second.refresh()
+        self.assertEqual(second.read_entry('subject'), now)
+
+    def test_prune_makes_other_processes_reload(self):
+        limit = timedelta(hours=24)
+        old = datetime.now() - limit - timedelta(hours=1)
+        first, second = self._tracker(auto_prune=False), self._tracker(auto_prune=False)
+        first.write_entry('expired', old)
+        first.write_entry('current', datetime.now())
+        self.assertEqual(len(second.json_loaded), 2)
+
+        self.assertEqual(first.prune_expired(), 1)
+        self.assertEqual(second.refresh(), 1)
+        self.assertEqual(list(second.json_loaded), ['current'])
+
+    def test_adds_seq_column_to_existing_database(self):
+        old_tracker = SqliteSnoozeTracking(self.db_path, logger=self.logger)
+        old_tracker.write_entry('subject', datetime.now())
+        old_tracker.close()
+
+        tracker = self._tracker()
+        columns = [r[1] for r in tracker.connection.execute("PRAGMA table_info(snooze)")]
+        self.assertIn('seq', columns)
+        self.assertIn('subject', tracker.json_loaded)
+        self.assertEqual(tracker.connection.execute("PRAGMA busy_timeout").fetchone()[0],
+                         SharedSnoozeTracking.DEFAULT_BUSY_TIMEOUT_SECONDS * 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -88,6 +88,57 @@ class TestSnoozeTracking(unittest.TestCase):
         self.assertEqual(output_msg_list, msg_list, 'Should return the same list')
         self.assertTrue(output_msg_list[0].msg_snoozed, 'Non-snoozed message should be marked as snoozed')
 
+    def test_next_expiry(self):
+        base = datetime(2025, 1, 1, 9, 0)
+        self.snooze_tracking._json_loaded = {'a': base.isoformat(),
+                                             'b': (base + timedelta(hours=2)).isoformat()}
+        self.assertEqual(self.snooze_tracking.next_expiry(24), base + timedelta(hours=24))
+        self.assertEqual(self.snooze_tracking.next_expiry(24, after=base + timedelta(hours=25)),
+                         base + timedelta(hours=26))
+        self.assertIsNone(self.snooze_tracking.next_expiry(24, after=base + timedelta(days=2)))
+
+    def test_is_snoozed_uses_reference_time(self):
+        base = datetime(2025, 1, 1, 9, 0)
+        self.snooze_tracking.snooze_expiration_limit_hours = 24
+        self.snooze_tracking._json_loaded = {'a': base.isoformat()}
+        self.assertTrue(self.snooze_tracking.is_snoozed('a', base + timedelta(hours=23)))
+        self.assertFalse(self.snooze_tracking.is_snoozed('a', base + timedelta(hours=24)))
+        self.assertFalse(self.snooze_tracking.is_snoozed('missing', base))
+
+    def test_begin_cycle_evicts_expired(self):
+        base = datetime(2025, 1, 1, 9, 0)
+        self.snooze_tracking.snooze_expiration_limit_hours = 24
+        self.snooze_tracking._json_loaded = {'old': base.isoformat(),
+                                             'new': (base + timedelta(hours=12)).isoformat()}
+        reference_time = base + timedelta(hours=30)
+        self.assertEqual(self.snooze_tracking.begin_cycle(reference_time), reference_time)
+        self.assertEqual(self.snooze_tracking.reference_time, reference_time)
+        self.assertEqual(list(self.snooze_tracking.snooze_index), ['new'])
+        self.assertTrue(self.snooze_tracking.is_snoozed('new'))
+        # the file contents are only changed by prune_expired
+        self.assertIn('old', self.snooze_tracking.json_loaded)
+
+    def test_rewritten_entry_is_not_evicted_by_stale_heap_item(self):
+        base = datetime(2025, 1, 1, 9, 0)
+        self.snooze_tracking.snooze_expiration_limit_hours = 24
+        self.snooze_tracking._json_loaded = {'a': base.isoformat()}
+        with self.snooze_tracking.batch():
+            self.snooze_tracking.write_entry('a', base + timedelta(hours=20))
+        self.assertEqual(self.snooze_tracking.evict_expired(base + timedelta(hours=25)), [])
+        self.assertEqual(self.snooze_tracking.read_entry('a'), base + timedelta(hours=20))
+        self.assertEqual(self.snooze_tracking.evict_expired(base + timedelta(hours=44)), ['a'])
+
+    @patch('json.dump')
+    @patch('builtins.open')
+    def test_prune_expired(self, mock_open, mock_json_dump):
+        base = datetime(2025, 1, 1, 9, 0)
+        self.snooze_tracking.snooze_expiration_limit_hours = 24
+        self.snooze_tracking._json_loaded = {'old': base.isoformat(),
+                                             'new': (base + timedelta(hours=12)).isoformat()}
+        self.assertEqual(self.snooze_tracking.prune_expired(base + timedelta(hours=30)), 1)
+        self.assertEqual(list(self.snooze_tracking.json_loaded), ['new'])
+        mock_json_dump.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+import json
+import logging
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import Mock
+
+from PyEmailerAJM.continuous_monitor.backend import SnoozeTracking, SqliteSnoozeTracking
+
+
+def make_msg(subject, snoozed=False):
+    msg = Mock()
+    msg.subject = subject
+    msg.msg_snoozed = snoozed
+    msg.msg_snoozed_time = datetime.now()
+    return msg
+
+
+class TestSqliteSnoozeTracking(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.json_path = Path(self._tmp.name) / 'snooze_tracker.json'
+        self.logger = logging.getLogger('test_logger')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _tracker(self, **kwargs):
+        tracker = SqliteSnoozeTracking(self.json_path, logger=self.logger, **kwargs)
+        self.addCleanup(tracker.close)
+        return tracker
+
+    def test_uses_wal_and_a_keyed_table(self):
+        tracker = self._tracker()
+        self.assertEqual(tracker.db_path, self.json_path.with_suffix('.sqlite3'))
+        self.assertEqual(tracker.connection.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        indexes = [r[1] for r in tracker.connection.execute("PRAGMA index_list(snooze)")]
+        self.assertTrue(any('autoindex' in x for x in indexes))
+
+    def test_write_and_read_entries_persist(self):
+        snooze_time = datetime.now().replace(microsecond=0)
+        tracker = self._tracker()
+        tracker.write_entry('subject', snooze_time)
+        tracker.write_entry('subject', snooze_time - timedelta(hours=1))  # older, ignored
+        tracker.close()
+
+        reopened = self._tracker()
+        self.assertEqual(reopened.read_entry('subject'), snooze_time)
+        self.assertIsNone(reopened.read_entry('missing'))
+
+    def test_snooze_msgs_commits_once_per_cycle(self):
+        tracker = self._tracker()
+        statements = []
+        tracker.connection.set_trace_callback(statements.append)
+        tracker.snooze_msgs([make_msg(f'subject {i}') for i in range(50)] + [make_msg('done', snoozed=True)])
+        self.assertEqual([x for x in statements if x.upper() == 'COMMIT'], ['COMMIT'])
+        self.assertEqual(len(tracker.json_loaded), 50)
+
+    def test_failed_cycle_is_rolled_back(self):
+        tracker = self._tracker()
+        broken = object()
+        with self.assertRaises(AttributeError):
+            tracker.snooze_msgs([make_msg('first'), broken])
+        self.assertIsNone(tracker.read_entry('first'))
+        self.assertEqual(tracker.connection.execute("SELECT COUNT(*) FROM snooze").fetchone()[0], 0)
+
+    def test_expired_entries_are_pruned(self):
+        tracker = self._tracker()
+        tracker.write_entry('old', datetime.now() - timedelta(hours=30))
+        tracker.write_entry('new', datetime.now())
+        tracker.snooze_msgs([])
+        self.assertEqual(list(tracker.json_loaded), ['new'])
+
+    def test_json_is_migrated_once(self):
+        snooze_time = datetime.now().replace(microsecond=0)
+        self.json_path.write_text(json.dumps({'from json': snooze_time.isoformat()}))
+        tracker = self._tracker()
+        self.assertEqual(tracker.read_entry('from json'), snooze_time)
+        self.assertFalse(self.json_path.exists())
+        self.assertTrue(self.json_path.with_name('snooze_tracker.json.migrated').exists())
+        tracker.close()
+        with sqlite3.connect(str(tracker.db_path)) as connection:
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM snooze").fetchone()[0], 1)
+
+
+class TestSnoozeTrackingBatch(unittest.TestCase):
+    def test_snooze_msgs_saves_json_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tracker = SnoozeTracking(Path(tmp) / 'snooze.json', logger=logging.getLogger('test_logger'))
+            tracker.save_json = Mock()
+            tracker.snooze_msgs([make_msg(f'subject {i}') for i in range(10)])
+            tracker.save_json.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
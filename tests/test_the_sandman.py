@@ -0,0 +1,122 @@
+import threading
+import unittest
+from datetime import datetime, timedelta
+from time import monotonic
+from unittest.mock import MagicMock
+
+from PyEmailerAJM.backend import TheSandman
+
+# generous upper bound for a wake up, the sleeps below are many times longer
+MAX_WAKE_LATENCY_SECONDS = 0.5
+
+
+class TestTheSandmanWait(unittest.TestCase):
+    def setUp(self):
+        self.sandman = TheSandman(sleep_time_seconds=30, use_visual_sleep=False, logger=MagicMock())
+
+    def _timed(self, func, *args, **kwargs):
+        start = monotonic()
+        result = func(*args, **kwargs)
+        return result, monotonic() - start
+
+    def test_wait_times_out(self):
+        reason, elapsed = self._timed(self.sandman.wait, 0.05)
+        self.assertEqual(reason, TheSandman.WAKE_TIMEOUT)
+        self.assertGreaterEqual(elapsed, 0.05)
+
+    def test_request_stop_wakes_immediately(self):
+        threading.Timer(0.05, self.sandman.request_stop).start()
+        reason, elapsed = self._timed(self.sandman.wait, 30)
+        self.assertEqual(reason, TheSandman.WAKE_STOP)
+        self.assertLess(elapsed, 0.05 + MAX_WAKE_LATENCY_SECONDS)
+        # stays stopped until cleared
+        self.assertEqual(self.sandman.wait(30), TheSandman.WAKE_STOP)
+        self.sandman.clear_stop()
+        self.assertEqual(self.sandman.wait(0.01), TheSandman.WAKE_TIMEOUT)
+
+    def test_new_mail_wakes_immediately(self):
+        threading.Timer(0.05, self.sandman.notify_new_mail).start()
+        reason, elapsed = self._timed(self.sandman.wait, 30)
+        self.assertEqual(reason, TheSandman.WAKE_NEW_MAIL)
+        self.assertLess(elapsed, 0.05 + MAX_WAKE_LATENCY_SECONDS)
+
+    def test_notification_before_wait_is_not_lost(self):
+        self.sandman.notify_new_mail()
+        reason, elapsed = self._timed(self.sandman.wait, 30)
+        self.assertEqual(reason, TheSandman.WAKE_NEW_MAIL)
+        self.assertLess(elapsed, MAX_WAKE_LATENCY_SECONDS)
+
+    def test_wait_runs_the_pump(self):
+        start = monotonic()
+        # stands in for an event source that only delivers events while pumped
+        self.sandman.pump = lambda: monotonic() - start > 0.05 and self.sandman.notify_new_mail()
+        self.sandman.pump_interval = 0.01
+        reason, elapsed = self._timed(self.sandman.wait, 30)
+        self.assertEqual(reason, TheSandman.WAKE_NEW_MAIL)
+        self.assertLess(elapsed, 0.05 + MAX_WAKE_LATENCY_SECONDS)
+
+    def test_deadline_ends_the_wait(self):
+        deadline = datetime.now() + timedelta(seconds=0.1)
+        reason, elapsed = self._timed(self.sandman.wait, 30, deadline=deadline)
+        self.assertEqual(reason, TheSandman.WAKE_DEADLINE)
+        self.assertLess(elapsed, 0.1 + MAX_WAKE_LATENCY_SECONDS)
+        self.assertEqual(self.sandman.wait(0.01, deadline=datetime.now() + timedelta(hours=1)),
+                         TheSandman.WAKE_TIMEOUT)
+
+    def test_progress_is_reported_at_the_coarse_interval(self):
+        self.sandman.progress_interval = 0.05
+        progress = []
+        self.sandman.wait(0.22, on_progress=progress.append)
+        self.assertLessEqual(len(progress), 5)
+        self.assertGreaterEqual(len(progress), 4)
+
+    def test_sleep_in_rounds_skips_remaining_rounds_when_woken(self):
+        self.sandman.sleep = MagicMock(return_value=TheSandman.WAKE_STOP)
+        self.assertEqual(self.sandman.sleep_in_rounds(rounds=3), TheSandman.WAKE_STOP)
+        self.sandman.sleep.assert_called_once()
+
+
+class TestTheSandmanScheduler(unittest.TestCase):
+    def setUp(self):
+        self.sandman = TheSandman(sleep_time_seconds=600, use_visual_sleep=False, logger=MagicMock(),
+                                  min_sleep_time_seconds=60, max_sleep_time_seconds=3600,
+                                  jitter_fraction=0.1, jitter_seed=1)
+        self.now = datetime.now()
+
+    def test_next_threshold_crossing_uses_alert_type_hours(self):
+        received = [self.now - timedelta(hours=4, minutes=30),  # crosses WARNING in 30 minutes
+                    self.now - timedelta(hours=23),  # crosses CRITICAL_WARNING in 1 hour
+                    self.now - timedelta(hours=100), None]  # past every threshold / missing
+        crossing = TheSandman.next_threshold_crossing(received)
+        self.assertAlmostEqual((crossing - self.now).total_seconds(), 30 * 60, delta=5)
+        self.assertIsNone(TheSandman.next_threshold_crossing([self.now - timedelta(hours=100)]))
+        crossing = TheSandman.next_threshold_crossing(received[:1], thresholds_hours=[6])
+        self.assertAlmostEqual((crossing - self.now).total_seconds(), 90 * 60, delta=5)
+
+    def test_idle_interval_backs_off_up_to_max_and_resets_on_activity(self):
+        intervals = []
+        for _ in range(6):
+            self.sandman.record_activity(False)
+            intervals.append(self.sandman.next_wake_seconds(now=self.now))
+        self.assertGreater(intervals[1], intervals[0])
+        self.assertTrue(3600 * 0.9 <= intervals[-1] <= 3600)
+        self.sandman.record_activity(True)
+        self.assertAlmostEqual(self.sandman.next_wake_seconds(now=self.now), 600, delta=60)
+
+    def test_jitter_stays_within_fraction(self):
+        waits = [self.sandman.next_wake_seconds(now=self.now) for _ in range(50)]
+        self.assertTrue(all(540 <= x <= 660 for x in waits))
+        self.assertGreater(len(set(waits)), 1)
+
+    def test_deadlines_and_crossings_pull_the_wake_forward(self):
+        deadline = self.now + timedelta(seconds=300)
+        self.assertEqual(self.sandman.next_wake_seconds(deadlines=[None, deadline], now=self.now), 300)
+        received = [datetime.now() - timedelta(hours=5) + timedelta(seconds=200)]
+        self.assertAlmostEqual(self.sandman.next_wake_seconds(received_times=received), 200, delta=5)
+        # but never below the minimum
+        self.assertEqual(self.sandman.next_wake_seconds(deadlines=[self.now + timedelta(seconds=5)],
+                                                        now=self.now), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()